@@ -0,0 +1,128 @@
+"""Cost of encrypting the records at rest.
+
+Writes records of graded sizes with `record_writer`, then loads them through
+`record_cache`, once plain and once encrypted with `record_cipher`. For each size
+the script reports the median persist and load times, their throughput, and the
+encryption overhead as a ratio of the plain times. Reading a single chunk of an
+encrypted record with `read_chunk` is timed too.
+
+The default sizes run in seconds, `--full` goes up to 1 GB records.
+
+Usage: python benchmarks/bench_crypt.py [--full] [--rounds N] [--output FILE]
+"""
+
+# IMPORT STANDARD
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from common import write_result
+from pytest_recorder.record_cache import record_cache
+from pytest_recorder.record_crypt import record_cipher
+from pytest_recorder.record_io import record_writer
+
+DEFAULT_SIZE_LIST = ["1KB", "1MB", "64MB"]
+FULL_SIZE_LIST = ["1KB", "1MB", "64MB", "256MB", "1GB"]
+SIZE_UNIT_MAP = {"KB": 1024, "MB": 1024**2, "GB": 1024**3, "B": 1}
+
+
+def parse_size(value: str) -> int:
+    for unit, factor in SIZE_UNIT_MAP.items():
+        if value.upper().endswith(unit):
+            return int(float(value[: -len(unit)]) * factor)
+
+    return int(value)
+
+
+def median_seconds(function: Callable[[], None], rounds: int) -> float:
+    second_list = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        second_list.append(time.perf_counter() - start)
+
+    return statistics.median(second_list)
+
+
+def measure(
+    record_file_path: Path, data: bytes, encrypt: bool, rounds: int
+) -> Dict[str, float]:
+    record_cipher.configure(key=os.urandom(32) if encrypt else None, encrypt=encrypt)
+
+    def persist() -> None:
+        # Removed first, so an unchanged record isn't skipped
+        record_file_path.unlink(missing_ok=True)
+        record_writer.write(record_file_path=record_file_path, data=data)
+
+    persist_seconds = median_seconds(persist, rounds=rounds)
+    load_seconds = median_seconds(
+        lambda: record_cache.load(record_file_path=record_file_path, parse=len),
+        rounds=rounds,
+    )
+    result = {
+        "persist_seconds": persist_seconds,
+        "load_seconds": load_seconds,
+        "persist_mb_per_second": len(data) / 1024**2 / persist_seconds,
+        "load_mb_per_second": len(data) / 1024**2 / load_seconds,
+    }
+    if encrypt:
+
+        def read_chunk() -> None:
+            with record_file_path.open(mode="rb") as file:
+                record_cipher.read_chunk(file, index=0)
+
+        result["read_chunk_seconds"] = median_seconds(read_chunk, rounds=rounds)
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    record_writer.configure()
+    record_cache.configure(max_bytes=0)
+    case_list: List[Dict] = []
+    with tempfile.TemporaryDirectory() as folder:
+        for size in FULL_SIZE_LIST if args.full else DEFAULT_SIZE_LIST:
+            # Text-like content : the records are YAML or JSON
+            data = (b"interactions: - response: 0123456789abcdef\n" * 2) * (
+                parse_size(size) // 88 + 1
+            )
+            data = data[: parse_size(size)]
+            record_file_path = Path(folder) / f"test_{size}.yaml"
+            plain = measure(record_file_path, data, encrypt=False, rounds=args.rounds)
+            encrypted = measure(
+                record_file_path, data, encrypt=True, rounds=args.rounds
+            )
+            case_list.append(
+                {
+                    "size": size,
+                    "plain": plain,
+                    "encrypted": encrypted,
+                    "persist_overhead_ratio": encrypted["persist_seconds"]
+                    / plain["persist_seconds"],
+                    "load_overhead_ratio": encrypted["load_seconds"]
+                    / plain["load_seconds"],
+                }
+            )
+    record_cipher.configure()
+
+    write_result(
+        result={"benchmark": "crypt", "rounds": args.rounds, "cases": case_list},
+        output=args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""Record and replay cost of every recorder on synthetic data of graded sizes.
+
+Each recorder fixture is driven directly, outside of pytest, against offline stand-ins :
+a local HTTP server for `record_http` and `record_curl`, a fake `urlopen` for the
+`ftp://` URLs of `FTPCassette`, generated rows for `ObjectCollectorHandler`, generated
+screen output for `CaptureResultHandler` and a plain call for `TravelHandler`.
+
+Two axes are graded : the number of interactions with 1 KB bodies and the body size
+with a single interaction (rows for the object recorder). For each case the script
+reports the median wall time of the fixture, from setup to teardown, the throughput
+and the peak memory traced by `tracemalloc` during a separate, untimed run.
+
+The default grades run in a couple of minutes, `--full` uses the large ones : up to 10k
+interactions, 500 MB bodies and millions of rows. Tracing memory is by far the
+slowest part of a run, `--no-memory` skips it.
+
+Usage: python benchmarks/bench_recorders.py [--recorders http,curl,...] [--full] [--no-memory] [--rounds N] [--output FILE]
+"""
+
+# IMPORT STANDARD
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import patch
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from common import write_result
+from stand_ins import BenchRequest, ftp_urlopen, local_http_server, run_fixture
+
+RECORDER_LIST = ["http", "curl", "curl_no_vcr", "ftp", "object", "screen", "time"]
+
+DEFAULT_GRADE_MAP = {
+    "interactions": [1, 100],
+    "body_sizes": ["1KB", "100KB"],
+    "rows": [1000, 100000],
+}
+FULL_GRADE_MAP = {
+    "interactions": [1, 10, 100, 1000, 10000],
+    "body_sizes": ["1KB", "1MB", "10MB", "100MB", "500MB"],
+    "rows": [1000, 100000, 1000000, 3000000],
+}
+INTERACTION_BODY_SIZE = 1024
+SIZE_UNIT_MAP = {"KB": 1024, "MB": 1024**2, "GB": 1024**3, "B": 1}
+
+
+def parse_size(value: str) -> int:
+    for unit, factor in SIZE_UNIT_MAP.items():
+        if value.upper().endswith(unit):
+            return int(float(value[: -len(unit)]) * factor)
+
+    return int(value)
+
+
+def parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class Case:
+    """One recorder exercised with a given load."""
+
+    def __init__(
+        self,
+        recorder: str,
+        axis: str,
+        grade: int,
+        fixture_function: Callable,
+        marker: str,
+        body: Callable[[Any], None],
+        interactions: int,
+        payload_bytes: int,
+        fixture_kwargs: Optional[Dict[str, Any]] = None,
+        record_context: Callable = contextlib.nullcontext,
+        marker_kwargs: Optional[Dict[str, Any]] = None,
+        record_type: Optional[str] = None,
+    ) -> None:
+        self.recorder = recorder
+        self.axis = axis
+        self.grade = grade
+        self.fixture_function = fixture_function
+        self.marker = marker
+        self.body = body
+        self.interactions = interactions
+        self.payload_bytes = payload_bytes
+        self.fixture_kwargs = fixture_kwargs or {}
+        self.record_context = record_context
+        self.marker_kwargs = marker_kwargs
+        self.record_type = record_type or recorder
+
+    @property
+    def name(self) -> str:
+        return f"test_{self.recorder}_{self.axis}_{self.grade}"
+
+    def run(self, test_module_path: Path, record: bool) -> None:
+        request = BenchRequest(
+            name=self.name,
+            fspath=test_module_path,
+            marker_list=[self.marker],
+            record=[self.record_type] if record else ["none"],
+            marker_kwargs=self.marker_kwargs,
+        )
+        context = self.record_context() if record else contextlib.nullcontext()
+
+        # The screen recorder prints the records it persists
+        with context, contextlib.redirect_stdout(io.StringIO()):
+            run_fixture(
+                self.fixture_function, request, self.body, **self.fixture_kwargs
+            )
+
+
+def http_case_list(base_url: str, grade_map: Dict[str, List]) -> List[Case]:
+    import urllib3  # pylint: disable=import-outside-toplevel
+
+    from pytest_recorder.record_http import (  # pylint: disable=import-outside-toplevel
+        record_http_context_manager,
+    )
+
+    def make_body(count: int, size: int) -> Callable[[Any], None]:
+        def body(_):
+            pool_manager = urllib3.PoolManager()
+            for index in range(count):
+                pool_manager.request("GET", f"{base_url}/blob/{size}/{index}")
+
+        return body
+
+    return load_case_list(
+        recorder="http",
+        grade_map=grade_map,
+        make_body=make_body,
+        fixture_function=record_http_context_manager,
+        marker="record_http",
+        fixture_kwargs={"vcr_config": {}},
+    )
+
+
+def curl_case_list(
+    base_url: str, grade_map: Dict[str, List], vcr: bool = True
+) -> List[Case]:
+    # pylint: disable=import-outside-toplevel
+    import curl_cffi.requests
+
+    from pytest_recorder.record_curl import record_curl_context_manager
+
+    def make_body(count: int, size: int) -> Callable[[Any], None]:
+        def body(_):
+            for index in range(count):
+                # Looked up on each call since the recorder patches the module
+                curl_cffi.requests.get(f"{base_url}/blob/{size}/{index}")
+
+        return body
+
+    return load_case_list(
+        recorder="curl" if vcr else "curl_no_vcr",
+        grade_map=grade_map,
+        make_body=make_body,
+        fixture_function=record_curl_context_manager,
+        marker="record_curl",
+        fixture_kwargs={"vcr_config": {}},
+        marker_kwargs={"vcr": vcr},
+        record_type="curl",
+    )
+
+
+def ftp_case_list(grade_map: Dict[str, List]) -> List[Case]:
+    from pytest_recorder.record_ftp import (  # pylint: disable=import-outside-toplevel
+        record_ftp_context_manager,
+    )
+
+    def make_body(count: int, size: int) -> Callable[[Any], None]:
+        def body(_):
+            for index in range(count):
+                urllib.request.urlopen(
+                    f"ftp://bench.invalid/blob/{size}/{index}"
+                ).read()
+
+        return body
+
+    return load_case_list(
+        recorder="ftp",
+        grade_map=grade_map,
+        make_body=make_body,
+        fixture_function=record_ftp_context_manager,
+        marker="record_ftp",
+        # `FTPCassette` keeps the `urlopen` found when it is created as the real one
+        record_context=lambda: patch("urllib.request.urlopen", ftp_urlopen),
+    )
+
+
+def load_case_list(
+    recorder: str,
+    grade_map: Dict[str, List],
+    make_body: Callable[[int, int], Callable[[Any], None]],
+    **kwargs,
+) -> List[Case]:
+    case_list = []
+    for count in grade_map["interactions"]:
+        case_list.append(
+            Case(
+                recorder=recorder,
+                axis="interactions",
+                grade=count,
+                body=make_body(count, INTERACTION_BODY_SIZE),
+                interactions=count,
+                payload_bytes=count * INTERACTION_BODY_SIZE,
+                **kwargs,
+            )
+        )
+    for size in map(parse_size, grade_map["body_sizes"]):
+        case_list.append(
+            Case(
+                recorder=recorder,
+                axis="body_bytes",
+                grade=size,
+                body=make_body(1, size),
+                interactions=1,
+                payload_bytes=size,
+                **kwargs,
+            )
+        )
+
+    return case_list
+
+
+def object_case_list(grade_map: Dict[str, List]) -> List[Case]:
+    from pytest_recorder.record_verify_object import (  # pylint: disable=import-outside-toplevel
+        record_context_manager,
+    )
+
+    case_list = []
+    for rows in grade_map["rows"]:
+        row_list = [
+            {"id": index, "name": f"row {index}", "value": index * 0.5}
+            for index in range(rows)
+        ]
+        case_list.append(
+            Case(
+                recorder="object",
+                axis="rows",
+                grade=rows,
+                fixture_function=record_context_manager,
+                marker="record",
+                body=lambda record, row_list=row_list: record.add_verify(row_list),
+                interactions=rows,
+                payload_bytes=sum(len(str(row)) for row in row_list),
+            )
+        )
+
+    return case_list
+
+
+def screen_case_list(grade_map: Dict[str, List]) -> List[Case]:
+    from pytest_recorder.record_verify_screen import (  # pylint: disable=import-outside-toplevel
+        record_screen_context_manager,
+    )
+
+    case_list = []
+    for size in map(parse_size, grade_map["body_sizes"]):
+        text = ("screen line\n" * (size // 12 + 1))[:size]
+        case_list.append(
+            Case(
+                recorder="screen",
+                axis="body_bytes",
+                grade=size,
+                fixture_function=record_screen_context_manager,
+                marker="record_verify_screen",
+                body=lambda _, text=text: sys.stdout.write(text),
+                interactions=1,
+                payload_bytes=size,
+            )
+        )
+
+    return case_list
+
+
+def time_case_list() -> List[Case]:
+    from pytest_recorder.record_time import (  # pylint: disable=import-outside-toplevel
+        record_time_context_manager,
+    )
+
+    return [
+        Case(
+            recorder="time",
+            axis="interactions",
+            grade=1,
+            fixture_function=record_time_context_manager,
+            marker="record_time",
+            body=lambda _: time.time(),
+            interactions=1,
+            payload_bytes=0,
+        )
+    ]
+
+
+def measure(
+    case: Case, test_module_path: Path, record: bool, rounds: int, memory: bool
+) -> Dict[str, Any]:
+    second_list = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        case.run(test_module_path=test_module_path, record=record)
+        second_list.append(time.perf_counter() - start)
+
+    # Tracing slows the run down a lot, so it is never timed
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            case.run(test_module_path=test_module_path, record=record)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    seconds = statistics.median(second_list)
+    return {
+        "seconds": seconds,
+        "interactions_per_second": case.interactions / seconds,
+        "bytes_per_second": case.payload_bytes / seconds,
+        "peak_memory_bytes": peak,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recorders", type=parse_list, default=RECORDER_LIST)
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--interactions", type=parse_list, default=None)
+    parser.add_argument("--body-sizes", type=parse_list, default=None)
+    parser.add_argument("--rows", type=parse_list, default=None)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    grade_map = dict(FULL_GRADE_MAP if args.full else DEFAULT_GRADE_MAP)
+    if args.interactions:
+        grade_map["interactions"] = [int(value) for value in args.interactions]
+    if args.body_sizes:
+        grade_map["body_sizes"] = args.body_sizes
+    if args.rows:
+        grade_map["rows"] = [int(value) for value in args.rows]
+
+    result_list = []
+    with local_http_server() as base_url, tempfile.TemporaryDirectory() as folder:
+        test_module_path = Path(folder) / "test_bench.py"
+
+        case_list = []
+        if "http" in args.recorders:
+            case_list += http_case_list(base_url=base_url, grade_map=grade_map)
+        if "curl" in args.recorders:
+            case_list += curl_case_list(base_url=base_url, grade_map=grade_map)
+        if "curl_no_vcr" in args.recorders:
+            case_list += curl_case_list(
+                base_url=base_url, grade_map=grade_map, vcr=False
+            )
+        if "ftp" in args.recorders:
+            case_list += ftp_case_list(grade_map=grade_map)
+        if "object" in args.recorders:
+            case_list += object_case_list(grade_map=grade_map)
+        if "screen" in args.recorders:
+            case_list += screen_case_list(grade_map=grade_map)
+        if "time" in args.recorders:
+            case_list += time_case_list()
+
+        for case in case_list:
+            print(f"{case.name} ...", file=sys.stderr)
+            result_list.append(
+                {
+                    "recorder": case.recorder,
+                    "axis": case.axis,
+                    "grade": case.grade,
+                    "record": measure(
+                        case,
+                        test_module_path,
+                        record=True,
+                        rounds=args.rounds,
+                        memory=not args.no_memory,
+                    ),
+                    "replay": measure(
+                        case,
+                        test_module_path,
+                        record=False,
+                        rounds=args.rounds,
+                        memory=not args.no_memory,
+                    ),
+                }
+            )
+
+    result = {
+        "benchmark": "recorders",
+        "rounds": args.rounds,
+        "grades": grade_map,
+        "cases": result_list,
+    }
+
+    write_result(result=result, output=args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Startup cost of the pytest_recorder plugins.
+
+Measures, in fresh interpreters :
+- the cumulative import time of every plugin module reported by `-X importtime`,
+  pytest being imported beforehand so only the recorder's own cost is counted ;
+- the wall time of `pytest --collect-only` on a small test module, with the
+  recorder plugins and with them disabled.
+
+Usage: python benchmarks/bench_startup.py [--rounds N] [--output FILE]
+"""
+
+# IMPORT STANDARD
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from common import RECORDER_PLUGIN_LIST, write_result
+
+PLUGIN_MODULE_LIST = [
+    "pytest_recorder.plugin",
+    "pytest_recorder.record_http",
+    "pytest_recorder.record_curl",
+    "pytest_recorder.record_time",
+    "pytest_recorder.record_verify_object",
+    "pytest_recorder.record_verify_screen",
+    "pytest_recorder.record_ftp",
+]
+
+
+def measure_import_time(module: str) -> Dict[str, int]:
+    """Top-level imports done by `module` once pytest is loaded, with their cumulative time in us."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import pytest; import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    # Lines look like : "import time:   self [us] | cumulative | imported package"
+    cumulative_map = {}
+    after_pytest = False
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are printed before their parent with a deeper indentation
+        top_level = len(name) - len(name.lstrip()) == 1
+        name = name.strip()
+        if after_pytest and top_level:
+            cumulative_map[name] = int(cumulative)
+        if name == "pytest" and top_level:
+            after_pytest = True
+
+    return cumulative_map
+
+
+def measure_collect_only(test_module_path: Path, disable_recorder: bool) -> float:
+    command = [
+        sys.executable,
+        "-m",
+        "pytest",
+        "--collect-only",
+        "-q",
+        "-p",
+        "no:cacheprovider",
+        str(test_module_path),
+    ]
+    if disable_recorder:
+        for plugin in RECORDER_PLUGIN_LIST:
+            command += ["-p", f"no:{plugin}"]
+
+    start = time.perf_counter()
+    subprocess.run(
+        command, check=True, capture_output=True, cwd=test_module_path.parent
+    )
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    import_time_map = {}
+    for module in PLUGIN_MODULE_LIST:
+        round_list = [measure_import_time(module) for _ in range(args.rounds)]
+        import_time_map[module] = statistics.median(
+            sum(cumulative_map.values()) for cumulative_map in round_list
+        )
+
+    with tempfile.TemporaryDirectory() as folder:
+        test_module_path = Path(folder) / "test_startup.py"
+        test_module_path.write_text("def test_startup():\n    pass\n", encoding="utf-8")
+
+        baseline_list = []
+        recorder_list = []
+        for _ in range(args.rounds):
+            baseline_list.append(
+                measure_collect_only(test_module_path, disable_recorder=True)
+            )
+            recorder_list.append(
+                measure_collect_only(test_module_path, disable_recorder=False)
+            )
+
+    baseline = statistics.median(baseline_list)
+    recorder = statistics.median(recorder_list)
+    result = {
+        "benchmark": "startup",
+        "rounds": args.rounds,
+        "import_time_us": import_time_map,
+        "import_time_total_us": sum(import_time_map.values()),
+        "collect_only_baseline_seconds": baseline,
+        "collect_only_recorder_seconds": recorder,
+        "collect_only_overhead_seconds": recorder - baseline,
+    }
+
+    write_result(result=result, output=args.output)
+
+
+if __name__ == "__main__":
+    main()
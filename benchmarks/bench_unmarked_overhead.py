@@ -0,0 +1,88 @@
+"""Per-test overhead of pytest_recorder on unmarked tests.
+
+Generates a test module with unmarked tests and runs it in a subprocess, once with
+the recorder plugins and once with them disabled. The difference of the median
+wall times divided by the number of tests is the per-test overhead.
+
+Usage: python benchmarks/bench_unmarked_overhead.py [--tests N] [--rounds N] [--output FILE]
+"""
+
+# IMPORT STANDARD
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from common import RECORDER_PLUGIN_LIST, write_result
+
+
+def write_test_module(folder_path: Path, test_count: int) -> Path:
+    test_module_path = folder_path / "test_unmarked.py"
+    test_module_path.write_text(
+        "".join(f"def test_{index}():\n    pass\n\n\n" for index in range(test_count)),
+        encoding="utf-8",
+    )
+
+    return test_module_path
+
+
+def run_pytest(test_module_path: Path, disable_recorder: bool) -> float:
+    command = [
+        sys.executable,
+        "-m",
+        "pytest",
+        "-q",
+        "-p",
+        "no:cacheprovider",
+        str(test_module_path),
+    ]
+    if disable_recorder:
+        for plugin in RECORDER_PLUGIN_LIST:
+            command += ["-p", f"no:{plugin}"]
+
+    start = time.perf_counter()
+    subprocess.run(
+        command, check=True, capture_output=True, cwd=test_module_path.parent
+    )
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        test_module_path = write_test_module(Path(folder), args.tests)
+
+        baseline_list = []
+        recorder_list = []
+        for _ in range(args.rounds):
+            baseline_list.append(run_pytest(test_module_path, disable_recorder=True))
+            recorder_list.append(run_pytest(test_module_path, disable_recorder=False))
+
+    baseline = statistics.median(baseline_list)
+    recorder = statistics.median(recorder_list)
+    result = {
+        "benchmark": "unmarked_overhead",
+        "tests": args.tests,
+        "rounds": args.rounds,
+        "baseline_seconds": baseline,
+        "recorder_seconds": recorder,
+        "overhead_per_test_us": (recorder - baseline) / args.tests * 1e6,
+    }
+
+    write_result(result=result, output=args.output)
+
+
+if __name__ == "__main__":
+    main()
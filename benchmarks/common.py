@@ -0,0 +1,28 @@
+"""Helpers shared by the benchmark scripts."""
+
+# IMPORT STANDARD
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+# Names of the `pytest11` entry points, as used with `-p no:<name>`.
+RECORDER_PLUGIN_LIST = [
+    "pytest_recorder_plugin",
+    "pytest_recorder_record_http",
+    "pytest_recorder_record_curl",
+    "pytest_recorder_record_time",
+    "pytest_recorder_record_verify_object",
+    "pytest_recorder_record_verify_screen",
+    "pytest_recorder_record_ftp",
+]
+
+
+def write_result(result: Dict[str, Any], output: Optional[Path]) -> None:
+    data = json.dumps(result, indent=2)
+    if output:
+        output.write_text(data, encoding="utf-8")
+    print(data)
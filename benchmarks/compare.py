@@ -0,0 +1,56 @@
+"""Compares two `bench_recorders.py` results, typically from two commits.
+
+Prints, for each case found in both files, the record and replay times and their
+ratio (new / old). Ratios above `--threshold` are flagged as regressions and make
+the script exit with status 1.
+
+Usage: python benchmarks/compare.py OLD.json NEW.json [--threshold 1.2]
+"""
+
+# IMPORT STANDARD
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+
+def load_case_map(path: Path) -> Dict[Tuple[str, str, int], Dict[str, Any]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+
+    return {
+        (case["recorder"], case["axis"], case["grade"]): case for case in data["cases"]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    old_case_map = load_case_map(args.old)
+    new_case_map = load_case_map(args.new)
+
+    regression = False
+    print(f"{'case':<36}{'mode':<8}{'old (s)':>12}{'new (s)':>12}{'ratio':>8}")
+    for key in sorted(old_case_map.keys() & new_case_map.keys()):
+        for mode in ("record", "replay"):
+            old = old_case_map[key][mode]["seconds"]
+            new = new_case_map[key][mode]["seconds"]
+            ratio = new / old if old else float("inf")
+            flag = " !" if ratio > args.threshold else ""
+            regression = regression or bool(flag)
+            name = "/".join(map(str, key))
+            print(f"{name:<36}{mode:<8}{old:>12.4f}{new:>12.4f}{ratio:>8.2f}{flag}")
+
+    sys.exit(1 if regression else 0)
+
+
+if __name__ == "__main__":
+    main()
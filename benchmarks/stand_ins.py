@@ -0,0 +1,179 @@
+"""Offline stand-ins used to drive the recorder fixtures outside of a pytest run."""
+
+# IMPORT STANDARD
+import contextlib
+import http.server
+import io
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_io import FsyncPolicy
+
+
+def make_body(size: int) -> bytes:
+    """Printable payload of `size` bytes, so it is stored as text by every recorder."""
+
+    pattern = b"pytest_recorder benchmark payload\n"
+    return (pattern * (size // len(pattern) + 1))[:size]
+
+
+def body_size_from_path(path: str) -> int:
+    # Paths look like : /blob/<size>/<index>
+    return int(path.split("/")[2])
+
+
+class BlobRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are sent separately, Nagle would delay the body on keep-alive
+    disable_nagle_algorithm = True
+    body_cache: Dict[int, bytes] = {}
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        size = body_size_from_path(self.path)
+        if size not in self.body_cache:
+            self.body_cache[size] = make_body(size)
+        body = self.body_cache[size]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@contextlib.contextmanager
+def local_http_server() -> Iterator[str]:
+    """Serves `/blob/<size>/<index>` with a `size` bytes body, yields the base URL."""
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), BlobRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+        BlobRequestHandler.body_cache.clear()
+
+
+def ftp_urlopen(url, *args, **kwargs) -> io.BytesIO:
+    """Stands for `urllib.request.urlopen` on `ftp://<host>/blob/<size>/<index>` URLs."""
+
+    return io.BytesIO(make_body(body_size_from_path(urlparse(str(url)).path)))
+
+
+class BenchNode:
+    def __init__(
+        self,
+        name: str,
+        fspath: Path,
+        marker_list: List[str],
+        marker_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.name = name
+        self.fspath = fspath
+        self._marker_map = {
+            marker: getattr(pytest.mark, marker)(**(marker_kwargs or {})).mark
+            for marker in marker_list
+        }
+
+    def get_closest_marker(self, name: str):
+        return self._marker_map.get(name)
+
+
+class BenchConfig:
+    def __init__(self, option_map: Dict[str, Any]) -> None:
+        self._option_map = option_map
+
+    def getoption(self, name: str, default: Any = None) -> Any:
+        return self._option_map.get(name, default)
+
+
+class BenchRequest:
+    """The few `SubRequest` attributes the recorder fixtures read."""
+
+    def __init__(
+        self,
+        name: str,
+        fspath: Path,
+        marker_list: List[str],
+        record: List[str],
+        capture: str = "no",
+        marker_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.node = BenchNode(
+            name=name,
+            fspath=fspath,
+            marker_list=marker_list,
+            marker_kwargs=marker_kwargs,
+        )
+        self.config = BenchConfig(
+            {
+                "--capture": capture,
+                "--record": record,
+                "--record-no-hash": False,
+                "--record-no-overwrite": False,
+                # Defaults of the options the fixtures read, as in `pytest_addoption`
+                "--record-no-dedup": False,
+                "--record-strict": False,
+                "--record-curl-no-vcr": False,
+                "--record-new-episodes": False,
+                "--record-encrypt": False,
+                "--record-key-file": None,
+                "--record-timing": False,
+                "--record-latency": 0.0,
+                "--record-rate-limit": [],
+                "--record-rate-limit-dir": None,
+                "--record-retries": 0,
+                "--record-retry-backoff": 0.5,
+                "--record-retry-max-delay": 30.0,
+                "--record-cache-size": None,
+                "--record-dist": False,
+                "--record-write-behind": False,
+                "--record-write-workers": 4,
+                "--record-fsync": FsyncPolicy.none,
+                "--record-store": None,
+                "--record-store-push": False,
+                "--record-store-manifest": None,
+                "--record-store-cache-dir": None,
+                "--record-store-cache-size": 1024,
+                "--record-store-workers": 8,
+                "--record-stats": False,
+                "--record-stats-json": None,
+                "--record-stats-top": 5,
+                "--record-profile": False,
+                "--record-profile-body": False,
+                "--record-profile-dir": None,
+                "--record-profile-top": 10,
+            }
+        )
+        self.fixturenames: List[str] = []
+
+    def getfixturevalue(self, name: str) -> Any:
+        raise LookupError(f"No fixture {name!r} in benchmarks")
+
+
+def run_fixture(
+    fixture_function: Callable,
+    request: BenchRequest,
+    body: Callable[[Any], None],
+    **kwargs,
+) -> Optional[Any]:
+    """Runs the setup, `body` with the fixture value, then the teardown of a generator fixture."""
+
+    generator = fixture_function(request, **kwargs)
+    value = next(generator)
+    body(value)
+    with contextlib.suppress(StopIteration):
+        next(generator)
+
+    return value
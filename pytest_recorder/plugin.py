@@ -1,11 +1,48 @@
 # IMPORT STANDARD
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+from typing import List
 
 # IMPORT THIRD-PARTY
+import pytest
+from _pytest.config import Config
 from _pytest.config.argparsing import Parser
+from _pytest.fixtures import FixtureDef, SubRequest
+from _pytest.main import Session
+from _pytest.nodes import Item
+from _pytest.python import Function
+from _pytest.terminal import TerminalReporter
 
 # IMPORT INTERNAL
+from pytest_recorder.record_cache import record_cache
+from pytest_recorder.record_dedup import record_dedup
+from pytest_recorder.record_crypt import KEY_ENV_VAR, key_of, record_cipher
+from pytest_recorder.record_episode import episode_counter
+from pytest_recorder.record_io import FsyncPolicy, RecordWriteStatus, record_writer
+from pytest_recorder.record_latency import ReplayLatency
+from pytest_recorder.record_profile import record_profiler
+from pytest_recorder.record_schedule import make_record_scheduler
+from pytest_recorder.record_stats import record_stats
+from pytest_recorder.record_store import record_store
+from pytest_recorder.record_throttle import record_throttle
 from pytest_recorder.record_type import RecordType
 
+WRITE_ERROR_LIST_KEY = pytest.StashKey[list]()
+STORE_ERROR_LIST_KEY = pytest.StashKey[list]()
+STORE_MODULE_PATH_LIST_KEY = pytest.StashKey[List[Path]]()
+
+# Recorder fixtures requested by their marker, in their setup order.
+MARKER_FIXTURE_LIST = [
+    "record_http",
+    "record_curl",
+    "record_time",
+    "record_verify_screen",
+    "record_ftp",
+]
+RECORDER_FIXTURE_SET = {"record", *MARKER_FIXTURE_LIST}
+
 
 def pytest_addoption(parser: Parser) -> None:
     group = parser.getgroup("recorder")
@@ -28,3 +65,515 @@ def pytest_addoption(parser: Parser) -> None:
         default=False,
         help="Avoid rewriting existing records, apply to : http, object, screen, time.",
     )
+    group.addoption(
+        "--record-no-dedup",
+        action="store_true",
+        default=False,
+        help="Avoid collapsing the repeated interactions of the records, apply to : curl, ftp, http.",
+    )
+    group.addoption(
+        "--record-strict",
+        action="store_true",
+        default=False,
+        help="In replay, block the network and fail at once on the requests missing from the records, apply to : curl, ftp, http.",
+    )
+    group.addoption(
+        "--record-curl-no-vcr",
+        action="store_true",
+        default=False,
+        help="Record the curl requests without VCR, which also records the urllib3 requests of the tests, apply to : curl.",
+    )
+    group.addoption(
+        "--record-new-episodes",
+        action="store_true",
+        default=False,
+        help="Replay the interactions already in the records and only record the missing ones, apply to : curl, ftp, http.",
+    )
+    group.addoption(
+        "--record-encrypt",
+        action="store_true",
+        default=False,
+        help=(
+            "Encrypt the written records with AES-GCM, the key is read from --record-key-file"
+            f" or {KEY_ENV_VAR}, apply to : curl, ftp, http, object, screen, time."
+        ),
+    )
+    group.addoption(
+        "--record-key-file",
+        action="store",
+        default=None,
+        type=Path,
+        help=f"File holding the base64 or hexadecimal AES key of the encrypted records (default: the {KEY_ENV_VAR} environment variable).",
+    )
+    group.addoption(
+        "--record-timing",
+        action="store_true",
+        default=False,
+        help="Record the time to first byte and the duration of each interaction, apply to : curl, ftp, http.",
+    )
+    group.addoption(
+        "--record-latency",
+        action="store",
+        default=0.0,
+        type=float,
+        metavar="FACTOR",
+        help=(
+            "In replay, wait for the recorded timing of the interactions multiplied by FACTOR,"
+            " apply to : curl, ftp, http (default: 0, no wait)."
+        ),
+    )
+    group.addoption(
+        "--record-rate-limit",
+        action="append",
+        default=[],
+        metavar="HOST=RATE[/BURST]",
+        help="Limit the requests sent to HOST while recording to RATE per second, '*' for any host, apply to : curl, ftp, http.",
+    )
+    group.addoption(
+        "--record-rate-limit-dir",
+        action="store",
+        default=None,
+        type=Path,
+        help="Folder of the rate limit state shared by the processes of the session (default: a folder of the temporary directory).",
+    )
+    group.addoption(
+        "--record-retries",
+        action="store",
+        default=0,
+        type=int,
+        help="Send again the requests failing with a transient error while recording, apply to : curl, ftp, http (default: 0).",
+    )
+    group.addoption(
+        "--record-retry-backoff",
+        action="store",
+        default=0.5,
+        type=float,
+        help="Seconds waited before the first retry, doubled at each retry (default: 0.5).",
+    )
+    group.addoption(
+        "--record-retry-max-delay",
+        action="store",
+        default=30.0,
+        type=float,
+        help="Maximum seconds waited before a retry, Retry-After included (default: 30).",
+    )
+    group.addoption(
+        "--record-cache-size",
+        action="store",
+        default=None,
+        type=int,
+        help=(
+            "Megabytes of parsed cassettes kept in memory by each process, apply to : curl, ftp,"
+            " http (default: 256 with --record-dist, else 0)."
+        ),
+    )
+    group.addoption(
+        "--record-dist",
+        action="store_true",
+        default=False,
+        help="With pytest-xdist, run the tests sharing record files on the same worker.",
+    )
+    group.addoption(
+        "--record-write-behind",
+        action="store_true",
+        default=False,
+        help="Write the records from a background pool, drained at the end of the session.",
+    )
+    group.addoption(
+        "--record-write-workers",
+        action="store",
+        default=4,
+        type=int,
+        help="Number of background writers used by --record-write-behind (default: 4).",
+    )
+    group.addoption(
+        "--record-fsync",
+        action="store",
+        default=FsyncPolicy.none,
+        choices=[item.name for item in FsyncPolicy],
+        help="Flush the records to disk before replacing them (default: none).",
+    )
+    group.addoption(
+        "--record-store",
+        action="store",
+        default=None,
+        metavar="URL",
+        help="Fetch the records listed in the record manifest from this content-addressed store before the tests run.",
+    )
+    group.addoption(
+        "--record-store-push",
+        action="store_true",
+        default=False,
+        help="Upload the records of the tested modules to the --record-store and update the record manifest.",
+    )
+    group.addoption(
+        "--record-store-manifest",
+        action="store",
+        default=None,
+        type=Path,
+        help="Manifest mapping the records to their digest (default: <rootdir>/record_manifest.json).",
+    )
+    group.addoption(
+        "--record-store-cache-dir",
+        action="store",
+        default=None,
+        type=Path,
+        help="Folder of the records fetched from the --record-store (default: <rootdir>/.record_store).",
+    )
+    group.addoption(
+        "--record-store-cache-size",
+        action="store",
+        default=1024,
+        type=int,
+        help="Megabytes of fetched records kept in the cache folder, the least recently used are removed (default: 1024).",
+    )
+    group.addoption(
+        "--record-store-workers",
+        action="store",
+        default=8,
+        type=int,
+        help="Number of parallel transfers with the --record-store (default: 8).",
+    )
+    group.addoption(
+        "--record-stats",
+        action="store_true",
+        default=False,
+        help="Show the time spent by each recorder phase in the terminal summary.",
+    )
+    group.addoption(
+        "--record-stats-json",
+        action="store",
+        default=None,
+        type=Path,
+        help="Write the recorder phase timings to this JSON file, implies --record-stats.",
+    )
+    group.addoption(
+        "--record-stats-top",
+        action="store",
+        default=5,
+        type=int,
+        help="Number of slowest tests shown per recorder phase (default: 5).",
+    )
+    group.addoption(
+        "--record-profile",
+        action="store_true",
+        default=False,
+        help="Profile the setup and teardown of the recorder fixtures with cProfile and tracemalloc.",
+    )
+    group.addoption(
+        "--record-profile-body",
+        action="store_true",
+        default=False,
+        help="Also profile the body of the tests using a recorder, with --record-profile.",
+    )
+    group.addoption(
+        "--record-profile-dir",
+        action="store",
+        default=None,
+        type=Path,
+        help="Folder of the profiles written by --record-profile (default: <rootdir>/.record_profile).",
+    )
+    group.addoption(
+        "--record-profile-top",
+        action="store",
+        default=10,
+        type=int,
+        help="Number of allocation sites listed per profile (default: 10).",
+    )
+
+
+def rate_limit_folder_path(config: Config) -> Path:
+    """Same folder for every process of the session, xdist workers included."""
+
+    digest = hashlib.sha256(str(config.rootpath).encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"pytest_recorder_throttle_{digest}"
+
+
+def pytest_configure(config: Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "record_server(paths, latency): Cassettes served by the record_server fixture.",
+    )
+    config.stash[WRITE_ERROR_LIST_KEY] = []
+    config.stash[STORE_ERROR_LIST_KEY] = []
+    config.stash[STORE_MODULE_PATH_LIST_KEY] = []
+    record_writer.configure(
+        write_behind=config.getoption("--record-write-behind"),
+        workers=config.getoption("--record-write-workers"),
+        fsync=FsyncPolicy(config.getoption("--record-fsync")),
+    )
+    record_cipher.configure(
+        key=key_of(key_file_path=config.getoption("--record-key-file")),
+        encrypt=config.getoption("--record-encrypt"),
+    )
+    episode_counter.configure(enabled=config.getoption("--record-new-episodes"))
+    record_dedup.configure(enabled=not config.getoption("--record-no-dedup"))
+    record_cache_size = config.getoption("--record-cache-size")
+    if record_cache_size is None:
+        record_cache_size = 256 if config.getoption("--record-dist") else 0
+    record_cache.configure(max_bytes=record_cache_size * 1024**2)
+    record_throttle.configure(
+        rate_limit_list=config.getoption("--record-rate-limit"),
+        folder_path=config.getoption("--record-rate-limit-dir")
+        or rate_limit_folder_path(config=config),
+        retries=config.getoption("--record-retries"),
+        backoff=config.getoption("--record-retry-backoff"),
+        max_delay=config.getoption("--record-retry-max-delay"),
+    )
+    record_store.configure(
+        url=config.getoption("--record-store"),
+        manifest_path=config.getoption("--record-store-manifest")
+        or config.rootpath / "record_manifest.json",
+        cache_folder_path=config.getoption("--record-store-cache-dir")
+        or config.rootpath / ".record_store",
+        cache_max_bytes=config.getoption("--record-store-cache-size") * 1024**2,
+        workers=config.getoption("--record-store-workers"),
+        push=config.getoption("--record-store-push"),
+    )
+    record_stats.configure(
+        enabled=config.getoption("--record-stats")
+        or config.getoption("--record-stats-json") is not None,
+    )
+    record_profiler.configure(
+        enabled=config.getoption("--record-profile"),
+        folder_path=config.getoption("--record-profile-dir")
+        or config.rootpath / ".record_profile",
+        top=config.getoption("--record-profile-top"),
+    )
+
+
+@pytest.fixture(name="record_server")
+def record_server_fixture(request: SubRequest):
+    """
+    Local HTTP server replaying the curl and http cassettes of the test module.
+
+    `@pytest.mark.record_server(paths=[...])` serves other cassettes or folders,
+    `latency=FACTOR` waits for their recorded timing, as --record-latency does.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from pytest_recorder.record_server import RecordServer, record_path_list_of
+
+    marker = request.node.get_closest_marker("record_server")
+    kwargs = marker.kwargs if marker else {}
+    path_list = kwargs.get("paths") or record_path_list_of(
+        test_module_path=Path(request.node.fspath)
+    )
+    latency = ReplayLatency(
+        factor=kwargs.get("latency", request.config.getoption("--record-latency"))
+    )
+
+    with RecordServer(path_list=path_list, latency=latency) as server:
+        yield server
+
+
+def pytest_collection_modifyitems(items: List[Item]) -> None:
+    """
+    Requests the recorder fixtures of the marked items only.
+
+    Unmarked items don't pay for the recorder fixtures, neither their setup and
+    teardown nor the marker lookups.
+    """
+
+    for item in items:
+        fixturenames = getattr(item, "fixturenames", None)
+        if fixturenames is None:
+            continue
+
+        marker_name_set = {marker.name for marker in item.iter_markers()}
+        fixture_list = [
+            name
+            for name in MARKER_FIXTURE_LIST
+            if name in marker_name_set and name not in fixturenames
+        ]
+        fixturenames[:0] = fixture_list
+
+
+def module_path_list_of(items: List[Item]) -> List[Path]:
+    return list(dict.fromkeys(Path(item.fspath) for item in items))
+
+
+def fetch_records(config: Config, module_path_list: List[Path]) -> None:
+    """Fetches the stored records of the test modules, pushed back at the end of the session."""
+
+    config.stash[STORE_MODULE_PATH_LIST_KEY] = module_path_list
+    error_list = record_store.fetch(module_path_list=module_path_list)
+    config.stash[STORE_ERROR_LIST_KEY].extend(error_list)
+
+
+def pytest_collection_finish(session: Session) -> None:
+    """Fetches the stored records of the collected test modules, before they run."""
+
+    # With pytest-xdist the controller fetches them, for every worker
+    if record_store.enabled and not hasattr(session.config, "workerinput"):
+        fetch_records(
+            config=session.config,
+            module_path_list=module_path_list_of(items=session.items),
+        )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_node_collection_finished(node, ids: List[str]) -> None:
+    """Fetches the stored records once the first worker collected the tests, before they run."""
+
+    config = node.config
+    if not record_store.enabled or config.stash[STORE_MODULE_PATH_LIST_KEY]:
+        return
+
+    fetch_records(
+        config=config,
+        module_path_list=list(
+            dict.fromkeys(config.rootpath / nodeid.split("::")[0] for nodeid in ids)
+        ),
+    )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config: Config, log):
+    if not config.getoption("--record-dist"):
+        return None
+
+    return make_record_scheduler(config=config, log=log)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node) -> None:
+    workeroutput = getattr(node, "workeroutput", None) or {}
+    record_cache.merge(workeroutput.get("record_cache"))
+    record_stats.merge(workeroutput.get("record_stats"))
+
+
+def pytest_runtest_logstart(nodeid: str) -> None:
+    record_stats.nodeid = nodeid
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef: FixtureDef):
+    if not record_profiler.enabled or fixturedef.argname not in RECORDER_FIXTURE_SET:
+        yield
+        return
+
+    record_profiler.start()
+    try:
+        yield
+    finally:
+        record_profiler.stop()
+
+    # Finalizers run last in first out : this one runs just before the fixture's
+    # teardown, `pytest_fixture_post_finalizer` just after it.
+    fixturedef.addfinalizer(record_profiler.start)
+
+
+def pytest_fixture_post_finalizer(fixturedef: FixtureDef) -> None:
+    if record_profiler.enabled and fixturedef.argname in RECORDER_FIXTURE_SET:
+        record_profiler.stop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_pyfunc_call(pyfuncitem: Function):
+    profile_body = (
+        record_profiler.enabled
+        and pyfuncitem.config.getoption("--record-profile-body")
+        and not RECORDER_FIXTURE_SET.isdisjoint(pyfuncitem.fixturenames)
+    )
+    if not profile_body:
+        yield
+        return
+
+    record_profiler.start()
+    try:
+        yield
+    finally:
+        record_profiler.stop()
+
+
+def pytest_runtest_logfinish(nodeid: str) -> None:
+    record_profiler.finish_test(nodeid)
+
+
+def pytest_sessionfinish(session: Session) -> None:
+    error_list = record_writer.drain()
+    session.config.stash[WRITE_ERROR_LIST_KEY].extend(error_list)
+
+    # With pytest-xdist the controller pushes the records, once every worker is down
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if record_store.push_enabled and workeroutput is None:
+        module_path_list = session.config.stash[STORE_MODULE_PATH_LIST_KEY]
+        session.config.stash[STORE_ERROR_LIST_KEY].extend(
+            record_store.push(module_path_list=module_path_list)
+        )
+        record_store.write_manifest()
+
+    if error_list or session.config.stash[STORE_ERROR_LIST_KEY]:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+    # With pytest-xdist the controller writes the stats of every worker
+    record_stats_json = session.config.getoption("--record-stats-json")
+    if record_stats_json is not None and workeroutput is None:
+        data = record_stats.to_dict(top=session.config.getoption("--record-stats-top"))
+        data["cache"] = record_cache.to_dict()
+        record_stats_json.parent.mkdir(parents=True, exist_ok=True)
+        record_stats_json.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    record_profiler.finish_session()
+
+    if workeroutput is not None:
+        workeroutput["record_cache"] = record_cache.to_dict()
+        if record_stats.enabled:
+            workeroutput["record_stats"] = record_stats.to_dict(top=0)
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter) -> None:
+    status_count = record_writer.status_count
+    if status_count:
+        summary = ", ".join(
+            f"{status_count.get(status, 0)} {status.value}"
+            for status in RecordWriteStatus
+        )
+        terminalreporter.write_sep("-", f"records : {summary}")
+
+    if episode_counter.enabled and episode_counter.count_map():
+        terminalreporter.write_sep("-", episode_counter.summary())
+
+    if record_store.enabled:
+        terminalreporter.write_sep("-", record_store.summary())
+
+    if record_stats.enabled:
+        terminalreporter.section("recorder stats")
+        top = terminalreporter.config.getoption("--record-stats-top")
+        for line in record_stats.summary_line_list(top=top):
+            terminalreporter.line(line)
+        terminalreporter.line(record_cache.summary())
+
+    if record_profiler.enabled:
+        terminalreporter.section("recorder profile")
+        for line in record_profiler.summary_line_list():
+            terminalreporter.line(line)
+
+    error_list = terminalreporter.config.stash[WRITE_ERROR_LIST_KEY]
+
+    if error_list:
+        terminalreporter.section("record write errors", red=True)
+        for record_file_path, error in error_list:
+            terminalreporter.line(f"{record_file_path} : {error!r}")
+
+    store_error_list = terminalreporter.config.stash[STORE_ERROR_LIST_KEY]
+
+    if store_error_list:
+        terminalreporter.section("record store errors", red=True)
+        for record_file_path, error in store_error_list:
+            terminalreporter.line(f"{record_file_path} : {error!r}")
+
+
+def pytest_unconfigure() -> None:
+    # Back to their defaults : a later session of the process, like an in-process
+    # pytester run, starts from a clean state.
+    record_writer.configure()
+    record_store.configure()
+    record_cipher.configure()
+    episode_counter.configure()
+    record_dedup.configure()
+    record_cache.configure()
+    record_throttle.configure()
+    record_stats.configure()
+    record_profiler.configure()
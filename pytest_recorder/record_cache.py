@@ -0,0 +1,108 @@
+# IMPORT STANDARD
+import copy
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_crypt import record_cipher
+
+CacheKey = Tuple[str, str, int, int]
+
+
+class RecordCache:
+    """
+    Parsed records kept in memory for the rest of the session.
+
+    A record is parsed once per process, the tests replaying it again share the
+    parsed content : callers only read it, unless they load it `mutable`, then they
+    get a deep copy they can alter without reaching the other tests.
+    Entries are keyed by path, modification time and size : a record written
+    again during the session is parsed again.
+
+    The least recently used records are dropped once the files of the cached
+    records weigh more than `max_bytes`.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    def __init__(self) -> None:
+        self._max_bytes = 0
+        self._byte_count = 0
+        self._entry_map: "OrderedDict[CacheKey, Tuple[int, Any]]" = OrderedDict()
+        self._count_map: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.configure()
+
+    def configure(self, max_bytes: int = 0) -> None:
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._byte_count = 0
+            self._entry_map.clear()
+            self._count_map = {"hits": 0, "misses": 0, "parsed_bytes": 0}
+
+    def load(
+        self,
+        record_file_path: Path,
+        parse: Callable[[str], Any],
+        kind: str = "",
+        mutable: bool = False,
+    ) -> Any:
+        """Returns the content of the record parsed by `parse`, `kind` tells parsers apart."""
+
+        def result_of(data: Any) -> Any:
+            return copy.deepcopy(data) if mutable else data
+
+        stat = record_file_path.stat()
+        key = (kind, str(record_file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entry_map.get(key)
+            if entry is not None:
+                self._entry_map.move_to_end(key)
+                self._count_map["hits"] += 1
+                return result_of(entry[1])
+
+        data = parse(record_cipher.read_text(record_file_path))
+
+        with self._lock:
+            self._count_map["misses"] += 1
+            self._count_map["parsed_bytes"] += stat.st_size
+            if not self.enabled or stat.st_size > self._max_bytes:
+                return data
+            if key in self._entry_map:
+                return data
+
+            self._entry_map[key] = (stat.st_size, data)
+            self._byte_count += stat.st_size
+            while self._byte_count > self._max_bytes:
+                size, _ = self._entry_map.popitem(last=False)[1]
+                self._byte_count -= size
+
+        return result_of(data)
+
+    def to_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._count_map)
+
+    def merge(self, count_map: Optional[Dict[str, int]]) -> None:
+        """Adds the counts of another process, a pytest-xdist worker for instance."""
+
+        with self._lock:
+            for name, count in (count_map or {}).items():
+                self._count_map[name] = self._count_map.get(name, 0) + count
+
+    def summary(self) -> str:
+        count_map = self.to_dict()
+        return (
+            f"record cache : {count_map['hits']} hits, {count_map['misses']} parsed "
+            f"({count_map['parsed_bytes'] / 1024 ** 2:.2f} MB)"
+        )
+
+
+record_cache = RecordCache()
@@ -0,0 +1,229 @@
+# IMPORT STANDARD
+import base64
+import binascii
+import io
+import os
+import struct
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional, Tuple
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+KEY_ENV_VAR = "PYTEST_RECORDER_KEY"
+KEY_SIZE_SET = {16, 24, 32}
+
+# `<magic><version><chunk size><nonce prefix>`, authenticated with every chunk.
+MAGIC = b"PYRECGCM"
+VERSION = 1
+NONCE_PREFIX_SIZE = 7
+HEADER_STRUCT = struct.Struct(f">{len(MAGIC)}sBI{NONCE_PREFIX_SIZE}s")
+HEADER_SIZE = HEADER_STRUCT.size
+# Chunk number and last chunk flag, completing the nonce prefix to 12 bytes.
+NONCE_SUFFIX_STRUCT = struct.Struct(">IB")
+TAG_SIZE = 16
+CHUNK_SIZE = 65536
+
+
+def parse_key(value: str) -> bytes:
+    """AES key from its base64 or hexadecimal form."""
+
+    value = value.strip()
+    for decode in (
+        bytes.fromhex,
+        lambda text: base64.b64decode(text, validate=True),
+        lambda text: base64.b64decode(text, altchars=b"-_", validate=True),
+    ):
+        try:
+            key = decode(value)
+        except (ValueError, binascii.Error):
+            continue
+        if len(key) in KEY_SIZE_SET:
+            return key
+
+    raise AttributeError(
+        "The record key should be 16, 24 or 32 bytes, written in base64 or hexadecimal."
+    )
+
+
+def key_of(key_file_path: Optional[Path] = None) -> Optional[bytes]:
+    """Record key from the key file, else from the environment variable."""
+
+    if key_file_path is not None:
+        return parse_key(Path(key_file_path).read_text(encoding="utf-8"))
+
+    value = os.environ.get(KEY_ENV_VAR)
+    return parse_key(value) if value else None
+
+
+class RecordCipher:
+    """
+    Encrypts the record files at rest with AES-GCM, in chunks.
+
+    The plain content is cut into `chunk_size` chunks, each encrypted on its own
+    with a nonce made of a random prefix, the chunk number and a last chunk flag,
+    and the file header as associated data. Chunks can't be reordered, dropped or
+    truncated without failing their authentication, and a record is decrypted one
+    chunk at a time : `iter_decrypt` streams it, `read_chunk` reads any chunk.
+
+    Records are encrypted when written with `encrypt` enabled. They are decrypted
+    when read whenever they start with the header, whatever `encrypt` : plain and
+    encrypted records can be mixed.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return self._encrypt
+
+    def __init__(self) -> None:
+        self._aesgcm: Any = None
+        self.configure()
+
+    def configure(
+        self,
+        key: Optional[bytes] = None,
+        encrypt: bool = False,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        if encrypt and key is None:
+            raise AttributeError(
+                f"Encrypting the records needs a key : set {KEY_ENV_VAR} or --record-key-file."
+            )
+        self._key = key
+        self._encrypt = encrypt
+        self._chunk_size = chunk_size
+        self._aesgcm = None
+
+    def _cipher(self) -> Any:
+        if self._key is None:
+            raise RuntimeError(
+                f"Decrypting the records needs a key : set {KEY_ENV_VAR} or --record-key-file."
+            )
+        if self._aesgcm is None:
+            # pylint: disable=import-outside-toplevel
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+            self._aesgcm = AESGCM(self._key)
+        return self._aesgcm
+
+    @staticmethod
+    def is_encrypted(data: bytes) -> bool:
+        return data[: len(MAGIC)] == MAGIC
+
+    def encrypt(self, data: bytes) -> bytes:
+        aesgcm = self._cipher()
+        chunk_size = self._chunk_size
+        nonce_prefix = os.urandom(NONCE_PREFIX_SIZE)
+        header = HEADER_STRUCT.pack(MAGIC, VERSION, chunk_size, nonce_prefix)
+
+        view = memoryview(data)
+        chunk_count = max(1, -(-len(view) // chunk_size))
+        part_list = [header]
+        for index in range(chunk_count):
+            nonce = nonce_prefix + NONCE_SUFFIX_STRUCT.pack(
+                index, index == chunk_count - 1
+            )
+            part_list.append(
+                aesgcm.encrypt(
+                    nonce, view[index * chunk_size : (index + 1) * chunk_size], header
+                )
+            )
+
+        return b"".join(part_list)
+
+    def _decrypt_chunk(
+        self, header: bytes, index: int, is_last: bool, chunk: bytes
+    ) -> bytes:
+        # pylint: disable=import-outside-toplevel
+        from cryptography.exceptions import InvalidTag
+
+        nonce_prefix = HEADER_STRUCT.unpack(header)[3]
+        nonce = nonce_prefix + NONCE_SUFFIX_STRUCT.pack(index, is_last)
+        try:
+            return self._cipher().decrypt(nonce, chunk, header)
+        except InvalidTag as error:
+            raise RuntimeError(
+                f"Cannot decrypt the record chunk {index} : wrong key, or altered record."
+            ) from error
+
+    @staticmethod
+    def _layout_of(file: IO[bytes]) -> Tuple[bytes, int, int]:
+        """Header, size of the encrypted chunks and number of chunks of a record."""
+
+        file.seek(0)
+        header = file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or not RecordCipher.is_encrypted(header):
+            raise RuntimeError("The record isn't encrypted.")
+        _, version, chunk_size, _ = HEADER_STRUCT.unpack(header)
+        if version != VERSION:
+            raise RuntimeError(f"Unsupported record encryption version : {version}")
+
+        encrypted_size = os.fstat(file.fileno()).st_size - HEADER_SIZE
+        sealed_size = chunk_size + TAG_SIZE
+        chunk_count = -(-encrypted_size // sealed_size)
+        if encrypted_size < TAG_SIZE or 0 < encrypted_size % sealed_size < TAG_SIZE:
+            raise RuntimeError("The encrypted record is truncated.")
+
+        return header, sealed_size, chunk_count
+
+    def iter_decrypt(self, file: IO[bytes]) -> Iterator[bytes]:
+        """Plain chunks of an encrypted record file, opened in binary mode."""
+
+        header, sealed_size, chunk_count = self._layout_of(file)
+        for index in range(chunk_count):
+            chunk = file.read(sealed_size)
+            yield self._decrypt_chunk(
+                header=header,
+                index=index,
+                is_last=index == chunk_count - 1,
+                chunk=chunk,
+            )
+
+    def read_chunk(self, file: IO[bytes], index: int) -> bytes:
+        """Plain chunk `index` of an encrypted record file, without reading the others."""
+
+        header, sealed_size, chunk_count = self._layout_of(file)
+        if not 0 <= index < chunk_count:
+            raise IndexError(f"No chunk {index} in a record of {chunk_count} chunks.")
+
+        file.seek(HEADER_SIZE + index * sealed_size)
+        return self._decrypt_chunk(
+            header=header,
+            index=index,
+            is_last=index == chunk_count - 1,
+            chunk=file.read(sealed_size),
+        )
+
+    def iter_plain(self, file: IO[bytes]) -> Iterator[bytes]:
+        """Plain content of a record file, encrypted or not, in chunks."""
+
+        if self.is_encrypted(file.read(len(MAGIC))):
+            yield from self.iter_decrypt(file)
+            return
+
+        file.seek(0)
+        yield from iter(lambda: file.read(1 << 20), b"")
+
+    def read_bytes(self, record_file_path: Path) -> bytes:
+        with record_file_path.open(mode="rb") as file:
+            if not self.is_encrypted(file.read(len(MAGIC))):
+                file.seek(0)
+                return file.read()
+            return b"".join(self.iter_decrypt(file))
+
+    def read_text(self, record_file_path: Path, newline: Optional[str] = None) -> str:
+        """Content of a record file, as `open(..., encoding="utf-8", newline=newline)` reads it."""
+
+        with record_file_path.open(mode="rb") as file:
+            if not self.is_encrypted(file.read(len(MAGIC))):
+                file.seek(0)
+                return io.TextIOWrapper(file, encoding="utf-8", newline=newline).read()
+            data = b"".join(self.iter_decrypt(file))
+
+        return io.TextIOWrapper(
+            io.BytesIO(data), encoding="utf-8", newline=newline
+        ).read()
+
+
+record_cipher = RecordCipher()
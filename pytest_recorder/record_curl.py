@@ -1,42 +1,74 @@
 """Pytest configuration and fixtures for YFinance tests."""
 
+import contextlib
+import functools
+import importlib
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Optional, Tuple, Type
 from io import BytesIO
-import yaml
 import pytest
-import vcr
 from _pytest.fixtures import SubRequest
-from vcr.persisters.filesystem import FilesystemPersister, serialize
 
+from pytest_recorder.record_cache import record_cache
+from pytest_recorder.record_curl_dispatch import (
+    CURL_ORIGINAL_MAP,
+    CurlInterceptor,
+    intercept_curl,
+    uninstall_curl_interceptors,
+)
+from pytest_recorder.record_curl_library import curl_libraries
+from pytest_recorder.record_curl_response import (
+    MockPycurlCurl,
+    MockPycurlCurlMulti,
+    MockResponse,
+    replay_pycurl_response,
+)
+from pytest_recorder.record_dedup import record_dedup
+from pytest_recorder.record_episode import episode_counter
+from pytest_recorder.record_filter import record_filter_of, vcr_config_of
+from pytest_recorder.record_guard import (
+    RecordNetworkError,
+    is_strict,
+    replay_guard,
+)
+from pytest_recorder.record_io import record_writer
+from pytest_recorder.record_latency import (
+    TIMING_KEY,
+    ReplayLatency,
+    Timer,
+    is_timed,
+    latency_factor_of,
+    timing_of,
+)
+from pytest_recorder.record_match import (
+    CaptureList,
+    RequestIndex,
+    loose_match_on_of,
+    match_on_of,
+)
+from pytest_recorder.record_module import (
+    check_module_recording,
+    module_record,
+    record_name_of,
+    record_scope_of,
+)
+from pytest_recorder.record_stats import RecordPhase, record_stats
+from pytest_recorder.record_throttle import host_of, record_throttle
 from pytest_recorder.record_type import RecordType
 
-# Try importing all CURL libraries with fallback
-HAS_CURL_CFFI_SYNC = False
-HAS_CURL_CFFI_ASYNC = False
-HAS_PYCURL = False
+# vcr is only imported once a test is marked with `record_curl`.
+LAZY_ATTRIBUTE_MAP = {
+    "VCRFilesystemPersister": "pytest_recorder.vcr_persister",
+    "VCRRecordingPersister": "pytest_recorder.vcr_persister",
+}
 
-try:
-    import curl_cffi.requests  # noqa: F401
-    from curl_cffi.requests import Session as CurlCffiSession
 
-    HAS_CURL_CFFI_SYNC = True
-except ImportError:
-    CurlCffiSession = None  # type: ignore
+def __getattr__(name: str) -> Any:
+    if name in LAZY_ATTRIBUTE_MAP:
+        module = importlib.import_module(LAZY_ATTRIBUTE_MAP[name])
+        return getattr(module, name)
 
-try:
-    from curl_cffi.requests import AsyncSession as CurlCffiAsyncSession
-
-    HAS_CURL_CFFI_ASYNC = True
-except ImportError:
-    CurlCffiAsyncSession = None  # type: ignore
-
-try:
-    import pycurl  # noqa: F401
-
-    HAS_PYCURL = True
-except ImportError:
-    pycurl = None  # type: ignore
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @pytest.fixture(name="vcr_config")
@@ -51,17 +83,8 @@ def pytest_configure(config):
     )
 
 
-class VCRFilesystemPersister(FilesystemPersister):
-    """Persister for curl cassettes."""
-
-    @staticmethod
-    def save_cassette(cassette_path, cassette_dict, serializer):
-        data = serialize(cassette_dict, serializer)
-        cassette_path = Path(cassette_path).resolve()
-        cassette_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with cassette_path.open("w", encoding="utf-8", newline="\n") as f:
-            f.write(data)
+def pytest_unconfigure():
+    uninstall_curl_interceptors()
 
 
 class CurlRecordFilePathBuilder:
@@ -81,16 +104,89 @@ class CurlRecordFilePathBuilder:
         return record_file_path
 
 
+def request_body_of(kwargs: dict[str, Any]) -> Any:
+    """Body of a curl_cffi request, as stored in the cassettes."""
+    return kwargs.get("data") or kwargs.get("json") or kwargs.get("content")
+
+
+def request_entry_of(method: str, url: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Request of a curl_cffi call, as matched against the cassettes."""
+    return {
+        "method": method,
+        "uri": str(url),
+        "headers": dict(kwargs.get("headers") or {}),
+        "body": request_body_of(kwargs),
+    }
+
+
+def normalize_cassette_entry(
+    source_type: str, request_data: dict[str, Any], response_data: Any
+) -> dict[str, Any]:
+    """Normalize request/response data from different sources to unified cassette format."""
+    # Normalize request
+    if source_type in ["curl_cffi_sync", "curl_cffi_async"]:
+        # Direct curl_cffi uses kwargs
+        request_entry = {
+            "method": request_data.get("method", "GET"),
+            "uri": str(request_data.get("url", "")),
+            "headers": dict(request_data.get("headers", {})),
+            "body": request_body_of(request_data),
+        }
+    elif source_type == "pycurl":
+        # pycurl uses tracked state dict
+        request_entry = {
+            "method": request_data.get("method", "GET"),
+            "uri": request_data.get("url", ""),
+            "headers": request_data.get("headers", {}),
+            "body": request_data.get("body"),
+        }
+    else:
+        request_entry = {}
+
+    # Normalize response
+    if hasattr(response_data, "status_code"):
+        # Response object (curl_cffi)
+        response_entry = {
+            "status": {
+                "code": response_data.status_code,
+                "message": getattr(response_data, "reason", "OK"),
+            },
+            "headers": dict(response_data.headers),
+            "body": {
+                "string": (
+                    response_data.content if response_data.status_code == 200 else None
+                ),
+                "encoding": "utf-8",
+            },
+        }
+    else:
+        # Dict format (pycurl or pre-built)
+        response_entry = response_data
+
+    return {
+        "request": request_entry,
+        "response": response_entry,
+        "source_type": source_type,
+    }
+
+
 class PycurlWrapper:
     """Wrapper for pycurl.Curl that tracks requests for recording."""
 
     def __init__(
-        self, captured_requests, original_curl_class, vcr_config, apply_vcr_filters_func
+        self,
+        capture_list,
+        original_curl_class,
+        record_filter,
+        find_episode_func=None,
+        timed=False,
     ):
-        self._captured_requests = captured_requests
+        self._capture_list = capture_list
+        self._timed = timed
+        self._find_episode = find_episode_func
+        self._episode = None
         self._curl = original_curl_class()
-        self._vcr_config = vcr_config
-        self._apply_vcr_filters = apply_vcr_filters_func
+        self._record_filter = record_filter
         self._request_data = {
             "url": None,
             "method": "GET",
@@ -99,70 +195,139 @@ class PycurlWrapper:
         }
         self._response_body = BytesIO()
         self._response_headers = BytesIO()
+        self._redactor = None
         self._user_write_function = None
         self._user_write_data = None
+        self._user_header_function = None
+        self._sequence = None
+
+    @property
+    def curl_handle(self):
+        """The wrapped curl object, which performs the transfer."""
+        return self._curl
 
     def setopt(self, option, value):
         """Track request configuration via setopt calls."""
-        if HAS_PYCURL:
+        pycurl = curl_libraries.pycurl
+        if pycurl is not None:
             # Track URL
-            if option == pycurl.URL:  # type: ignore[attr-defined]
+            if option == pycurl.URL:
                 self._request_data["url"] = value
             # Track HTTP method
-            elif option == pycurl.CUSTOMREQUEST:  # type: ignore[attr-defined]
+            elif option == pycurl.CUSTOMREQUEST:
                 self._request_data["method"] = value
             # Track headers (format: ["Key: Value"])
-            elif option == pycurl.HTTPHEADER:  # type: ignore[attr-defined]
+            elif option == pycurl.HTTPHEADER:
                 for header in value:
                     if ":" in header:
                         key, val = header.split(":", 1)
                         self._request_data["headers"][key.strip()] = val.strip()
             # Track POST data
-            elif option == pycurl.POSTFIELDS:  # type: ignore[attr-defined]
+            elif option == pycurl.POSTFIELDS:
                 self._request_data["body"] = value
                 if self._request_data["method"] == "GET":
                     self._request_data["method"] = "POST"
             # Track user's write callbacks
-            elif option == pycurl.WRITEFUNCTION:  # type: ignore[attr-defined]
+            elif option == pycurl.WRITEFUNCTION:
                 self._user_write_function = value
-            elif option == pycurl.WRITEDATA:  # type: ignore[attr-defined]
+            elif option == pycurl.WRITEDATA:
                 self._user_write_data = value
+            elif option == pycurl.HEADERFUNCTION:
+                self._user_header_function = value
 
         return self._curl.setopt(option, value)
 
     def perform(self):
         """Execute request and capture response."""
-        if HAS_PYCURL:
+        if self.start_transfer():
+            return None
+
+        result = self._curl.perform()
+        self.finish_transfer()
+
+        return result
+
+    def start_transfer(self) -> bool:
+        """
+        Replays the episode of the request and returns True, or sets the callbacks
+        capturing the response of the transfer about to be performed.
+        """
+        self._sequence = sequence = self._capture_list.reserve()
+        if self._find_episode is not None:
+            self._episode = self._find_episode(
+                {
+                    "method": self._request_data["method"],
+                    "uri": self._request_data["url"],
+                    "headers": self._request_data["headers"],
+                    "body": self._request_data["body"],
+                },
+                sequence,
+            )
+            if self._episode is not None:
+                # Replayed from the existing cassette, no request is sent
+                replay_pycurl_response(
+                    self._episode,
+                    write_function=self._user_write_function,
+                    write_data=self._user_write_data,
+                    header_function=self._user_header_function,
+                )
+                return True
+
+        pycurl = curl_libraries.pycurl
+        if pycurl is not None:
+            # The body is redacted as libcurl writes it, the user gets it as is
+            self._redactor = self._record_filter.redactor()
+
             # Always chain to capture response body
             if self._user_write_function:
                 # Chain user's callback function
                 def chained_write_func(data):
-                    self._response_body.write(data)
+                    self._capture_body(data)
                     return self._user_write_function(data)  # type: ignore[attr-defined]
 
-                self._curl.setopt(pycurl.WRITEFUNCTION, chained_write_func)  # type: ignore[attr-defined]
+                self._curl.setopt(pycurl.WRITEFUNCTION, chained_write_func)
             elif self._user_write_data:
                 # Chain user's write data buffer
                 def chained_write_data(data):
-                    self._response_body.write(data)
+                    self._capture_body(data)
                     return self._user_write_data.write(data)
 
-                self._curl.setopt(pycurl.WRITEFUNCTION, chained_write_data)  # type: ignore[attr-defined]
+                self._curl.setopt(pycurl.WRITEFUNCTION, chained_write_data)
+            elif self._redactor is not None:
+                self._curl.setopt(pycurl.WRITEFUNCTION, self._capture_body)
             else:
                 # No user callback, use our buffer
-                self._curl.setopt(pycurl.WRITEDATA, self._response_body)  # type: ignore[attr-defined]
+                self._curl.setopt(pycurl.WRITEDATA, self._response_body)
 
             # Capture headers
-            self._curl.setopt(
-                pycurl.HEADERFUNCTION, lambda x: self._response_headers.write(x)  # type: ignore[attr-defined]
-            )
+            def chained_header_func(data):
+                self._response_headers.write(data)
+                if self._user_header_function:
+                    return self._user_header_function(data)
+                return None
 
-        # Perform the actual request
-        result = self._curl.perform()
+            self._curl.setopt(pycurl.HEADERFUNCTION, chained_header_func)
+
+        # Only rate limited : a retry would feed the user's write callbacks with
+        # the failed response too
+        record_throttle.acquire(host_of(self._request_data["url"]))
+
+        return False
+
+    def _capture_body(self, data) -> None:
+        if self._redactor is not None:
+            data = self._redactor.feed(data)
+        self._response_body.write(data)
+
+    def finish_transfer(self) -> None:
+        """Captures the response of the performed transfer."""
+        pycurl = curl_libraries.pycurl
+        if pycurl is not None:
+            if self._redactor is not None:
+                self._response_body.write(self._redactor.finish())
 
-        if HAS_PYCURL:
             # Extract response data
-            status_code = self._curl.getinfo(pycurl.RESPONSE_CODE)  # type: ignore[attr-defined]
+            status_code = self._curl.getinfo(pycurl.RESPONSE_CODE)
 
             # Parse headers from raw HTTP format
             headers_raw = self._response_headers.getvalue().decode(
@@ -175,7 +340,7 @@ class PycurlWrapper:
                     headers[key.strip()] = val.strip()
 
             # Build cassette entry
-            cassette_entry = {
+            cassette_entry: Dict[str, Any] = {
                 "request": {
                     "method": self._request_data["method"],
                     "uri": self._request_data["url"],
@@ -195,19 +360,29 @@ class PycurlWrapper:
                 },
                 "source_type": "pycurl",
             }
+            if self._timed:
+                # libcurl's own timing, unaffected by the polling of a CurlMulti
+                cassette_entry["response"][TIMING_KEY] = timing_of(
+                    ttfb=self._curl.getinfo(pycurl.STARTTRANSFER_TIME),
+                    duration=self._curl.getinfo(pycurl.TOTAL_TIME),
+                )
 
             # Apply filters only for 200 responses
             if int(status_code) == 200:
-                cassette_entry = self._apply_vcr_filters(
-                    cassette_entry, self._vcr_config
+                filtered_entry = self._record_filter.filter_entry(
+                    cassette_entry, redacted=self._redactor is not None
                 )
-                if cassette_entry is not None:
-                    self._captured_requests.append(cassette_entry)
-
-        return result
+                if filtered_entry is not None:
+                    self._capture_list.add(self._sequence, filtered_entry)
 
     def getinfo(self, option):
         """Pass through getinfo calls."""
+        if (
+            self._episode is not None
+            and curl_libraries.has_pycurl
+            and option == curl_libraries.pycurl.RESPONSE_CODE
+        ):
+            return self._episode["response"]["status"]["code"]
         return self._curl.getinfo(option)
 
     def close(self):
@@ -224,6 +399,11 @@ class PycurlWrapper:
         }
         self._response_body = BytesIO()
         self._response_headers = BytesIO()
+        self._redactor = None
+        self._user_write_function = None
+        self._user_write_data = None
+        self._user_header_function = None
+        self._episode = None
         return self._curl.reset()
 
     def __getattr__(self, name):
@@ -231,499 +411,529 @@ class PycurlWrapper:
         return getattr(self._curl, name)
 
 
+class PycurlMultiWrapper:
+    """Wrapper for pycurl.CurlMulti running the transfers of `PycurlWrapper` handles."""
+
+    def __init__(self, original_multi_class):
+        self._multi = original_multi_class()
+        # Wrappers of the handles added to the multi, by id of their curl handle
+        self._wrapper_map = {}
+        # Handles replayed from the cassette, reported by the next `info_read`
+        self._replayed_list = []
+
+    def add_handle(self, handle):
+        if not isinstance(handle, PycurlWrapper):
+            return self._multi.add_handle(handle)
+
+        if handle.start_transfer():
+            self._replayed_list.append(handle)
+            return None
+
+        self._wrapper_map[id(handle.curl_handle)] = handle
+        return self._multi.add_handle(handle.curl_handle)
+
+    def remove_handle(self, handle):
+        if not isinstance(handle, PycurlWrapper):
+            return self._multi.remove_handle(handle)
+
+        if self._wrapper_map.pop(id(handle.curl_handle), None) is None:
+            if handle in self._replayed_list:
+                self._replayed_list.remove(handle)
+            return None
+
+        return self._multi.remove_handle(handle.curl_handle)
+
+    def info_read(self, *args):
+        """Captures the responses of the completed transfers, reported with their wrappers."""
+        num_q, ok_list, err_list = self._multi.info_read(*args)
+
+        wrapper_ok_list, self._replayed_list = self._replayed_list, []
+        for curl in ok_list:
+            wrapper = self._wrapper_map.get(id(curl))
+            if wrapper is None:
+                wrapper_ok_list.append(curl)
+                continue
+            wrapper.finish_transfer()
+            wrapper_ok_list.append(wrapper)
+
+        wrapper_err_list = [
+            (self._wrapper_map.get(id(curl), curl), errno, errmsg)
+            for curl, errno, errmsg in err_list
+        ]
+
+        return num_q, wrapper_ok_list, wrapper_err_list
+
+    def __getattr__(self, name):
+        """Pass through all other attributes to the wrapped multi object."""
+        return getattr(self._multi, name)
+
+
 # pylint: disable=R0915
-def record_curl_context_manager(
+def record_curl_interactions(
+    *,
     request: SubRequest,
     vcr_config: dict[str, Any],
+    marker: Any,
+    record_scope: str,
+    record_file_path: Path,
+    record_new_episodes: bool,
 ):
-    """Context manager for curl recording."""
-    marker = request.node.get_closest_marker("record_curl")
+    """Records the curl requests of the test, yields the VCR cassette if any."""
+    # pylint: disable=import-outside-toplevel
+    import yaml
+
+    record_filter = record_filter_of(vcr_config)
+
+    check_module_recording(request=request, scope=record_scope)
+    # VCR also records the urllib3 requests of the test, in the same file,
+    # it is skipped with `vcr=False` when only curl traffic is expected
+    if marker.kwargs.get(
+        "vcr",
+        not request.config.getoption("--record-curl-no-vcr", default=False),
+    ):
+        # pylint: disable=import-outside-toplevel
+        import vcr
 
-    if marker:
-        record_no_overwrite = request.config.getoption(
-            "--record-no-overwrite", default=False
+        from pytest_recorder.vcr_persister import VCRRecordingPersister
+
+        # Create VCR config without custom filters that VCR doesn't recognize,
+        # the urllib3 responses are only redacted
+        vcr_config_clean = vcr_config_of(
+            {
+                k: v
+                for k, v in vcr_config.items()
+                if k not in ["before_record_response", "allow_playback_repeats"]
+            }
         )
-        record_type = request.config.getoption("--record", default="none")
-        test_function = request.node.name
-        test_module_path = Path(request.node.fspath)
 
-        record_file_path = CurlRecordFilePathBuilder.build(
-            test_module_path=test_module_path,
-            test_function=test_function,
+        # Create VCR object for recording
+        vcr_object = vcr.VCR(
+            cassette_library_dir=str(record_file_path.parent),
+            record_mode="once",  # type: ignore[attr-defined]
+            **vcr_config_clean,
+        )
+        vcr_object.register_persister(
+            VCRRecordingPersister(recorder=RecordType.curl.name)
         )
 
-        def normalize_cassette_entry(source_type, request_data, response_data):
-            """Normalize request/response data from different sources to unified cassette format."""
-            # Normalize request
-            if source_type in [
-                "curl_cffi_sync",
-                "curl_cffi_async",
-                "curl_cffi_module",
-            ]:
-                # Direct curl_cffi uses kwargs
-                request_entry = {
-                    "method": request_data.get("method", "GET"),
-                    "uri": str(request_data.get("url", "")),
-                    "headers": dict(request_data.get("headers", {})),
-                    "body": request_data.get("data")
-                    or request_data.get("json")
-                    or request_data.get("content"),
-                }
-            elif source_type == "pycurl":
-                # pycurl uses tracked state dict
-                request_entry = {
-                    "method": request_data.get("method", "GET"),
-                    "uri": request_data.get("url", ""),
-                    "headers": request_data.get("headers", {}),
-                    "body": request_data.get("body"),
-                }
-            else:
-                request_entry = {}
+        def use_cassette():
+            return vcr_object.use_cassette(record_file_path.name)
 
-            # Normalize response
-            if hasattr(response_data, "status_code"):
-                # Response object (curl_cffi)
-                response_entry = {
-                    "status": {
-                        "code": response_data.status_code,
-                        "message": getattr(response_data, "reason", "OK"),
-                    },
-                    "headers": dict(response_data.headers),
-                    "body": {
-                        "string": (
-                            response_data.content
-                            if response_data.status_code == 200
-                            else None
-                        ),
-                        "encoding": "utf-8",
-                    },
-                }
-            else:
-                # Dict format (pycurl or pre-built)
-                response_entry = response_data
+    else:
+        use_cassette = contextlib.nullcontext
+
+    def save_captured_requests(captured_requests):
+        cassette_data = {"interactions": record_dedup.collapse(captured_requests)}
+        with record_stats.measure(RecordType.curl.name, RecordPhase.serialize):
+            data = yaml.dump(cassette_data, default_flow_style=False)
+        with record_stats.measure(RecordType.curl.name, RecordPhase.persist):
+            record_writer.write(record_file_path=record_file_path, data=data)
+
+    def save_module_requests(captured_requests):
+        if captured_requests:
+            save_captured_requests(captured_requests)
+        else:
+            record_writer.remove(record_file_path=record_file_path)
+
+    # Unified captured_requests list for all CURL sources, shared by the
+    # tests of the module with the module scope
+    if record_scope == "module":
+        captured_requests = module_record(
+            request=request,
+            recorder=RecordType.curl.name,
+            record_file_path=record_file_path,
+            load=list,
+            save=save_module_requests,
+        )
+    else:
+        captured_requests = []
+    # Interactions recorded by the previous tests of the module
+    module_request_count = len(captured_requests)
+
+    # With --record-new-episodes the interactions of the existing cassette
+    # are replayed, only the missing ones go to the network.
+    match_on = match_on_of(vcr_config=vcr_config)
+    module_index = RequestIndex(
+        captured_requests[:module_request_count],
+        match_on_list=[match_on],
+        allow_playback_repeats=True,
+    )
+    episode_index: Optional[RequestIndex] = None
+    if record_new_episodes and record_file_path.exists():
+        with record_stats.measure(RecordType.curl.name, RecordPhase.load):
+            episode_list = record_dedup.expand(
+                (
+                    record_cache.load(
+                        record_file_path=record_file_path, parse=yaml.safe_load
+                    )
+                    or {}
+                ).get("interactions", [])
+            )
 
-            return {
-                "request": request_entry,
-                "response": response_entry,
-                "source_type": source_type,
-            }
+        episode_index = RequestIndex(episode_list, match_on_list=[match_on])
 
-        def apply_vcr_filters(cassette_entry, vcr_config):
-            """Apply VCR config filters to cassette entry."""
-            # Filter headers
-            if "filter_headers" in vcr_config:
-                for header_name, replacement in vcr_config["filter_headers"]:
-                    if header_name in cassette_entry["request"]["headers"]:
-                        if replacement is None:
-                            del cassette_entry["request"]["headers"][header_name]
-                        else:
-                            cassette_entry["request"]["headers"][
-                                header_name
-                            ] = replacement
-                    if header_name in cassette_entry["response"]["headers"]:
-                        if replacement is None:
-                            del cassette_entry["response"]["headers"][header_name]
-                        else:
-                            cassette_entry["response"]["headers"][
-                                header_name
-                            ] = replacement
-
-            # Filter query parameters
-            if "filter_query_parameters" in vcr_config:
-                # pylint: disable=import-outside-toplevel
-                from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-
-                parsed_url = urlparse(cassette_entry["request"]["uri"])
-                query_params = parse_qs(parsed_url.query)
-
-                for param_name, replacement in vcr_config["filter_query_parameters"]:
-                    if param_name in query_params:
-                        query_params[param_name] = [replacement]
-
-                # Rebuild URL with filtered parameters
-                new_query = urlencode(query_params, doseq=True)
-                new_parsed = parsed_url._replace(query=new_query)
-                cassette_entry["request"]["uri"] = urlunparse(new_parsed)
-
-            # Handle before_record_response function
-            if "before_record_response" in vcr_config:
-                for filter_func in vcr_config["before_record_response"]:
-                    filtered_response = filter_func(cassette_entry["response"])
-
-                    # If filter returns None, don't record this request at all
-                    if filtered_response is None:
-                        return None  # Don't record this request
-
-                    # Apply the filtered response back to the cassette entry
-                    cassette_entry["response"] = filtered_response
-
-            return cassette_entry
+    # Captures of the test, added to captured_requests once it is over
+    capture_list = CaptureList()
+    timed = is_timed(request=request)
 
-        # Determine if we should record and create VCR object
-        if (RecordType.all in record_type or RecordType.curl in record_type) and not (
-            record_file_path.exists() and record_no_overwrite
-        ):
-            record_file_path.unlink(missing_ok=True)
+    def find_episode(request_entry, sequence):
+        """Captures and returns the first unused interaction matching the request."""
+        interaction = module_index.find(request_entry)
+        if interaction is not None or episode_index is None:
+            return interaction
 
-            # Create VCR config without custom filters that VCR doesn't recognize
-            vcr_config_clean = {
-                k: v
-                for k, v in vcr_config.items()
-                if k not in ["before_record_response", "allow_playback_repeats"]
-            }
+        interaction = episode_index.find(request_entry)
+        if interaction is not None:
+            capture_list.add(sequence, interaction)
+            episode_counter.add(recorder=RecordType.curl.name, replayed=True)
 
-            # Create VCR object for recording
-            vcr_object = vcr.VCR(
-                cassette_library_dir=str(record_file_path.parent),
-                record_mode="once",  # type: ignore[attr-defined]
-                **vcr_config_clean,
+        return interaction
+
+    # Rate limited and retried at the Session level, which the module-level
+    # functions go through.
+    curl_error_types: Tuple[Type[BaseException], ...] = ()
+    if curl_libraries.has_session:
+        # pylint: disable=import-outside-toplevel
+        from curl_cffi.requests.exceptions import (
+            ConnectionError as CurlConnectionError,
+        )
+        from curl_cffi.requests.exceptions import Timeout as CurlTimeout
+
+        curl_error_types = (CurlConnectionError, CurlTimeout)
+
+    def curl_status_of(response):
+        return response.status_code, response.headers
+
+    def capture_entry(
+        sequence, source_type, request_data, response, timer, content=None
+    ):
+        """`content` : the body of a streamed response, already redacted."""
+        cassette_entry = normalize_cassette_entry(source_type, request_data, response)
+
+        if cassette_entry["response"]["status"]["code"] == 200:
+            if content is not None:
+                cassette_entry["response"]["body"]["string"] = content
+            if timed:
+                cassette_entry["response"][TIMING_KEY] = timer.timing()
+            cassette_entry = record_filter.filter_entry(
+                cassette_entry, redacted=content is not None
+            )
+            if cassette_entry is not None:
+                capture_list.add(sequence, cassette_entry)
+
+    def capture_response(sequence, source_type, request_data, response, timer):
+        """Captures the response, once its content is consumed when streamed."""
+        if not request_data.get("stream"):
+            capture_entry(sequence, source_type, request_data, response, timer)
+            return
+
+        # The headers are received, the body is read by the caller
+        timer.mark_first_byte()
+
+        # The content of a streamed response is only known once the caller
+        # iterated it, a stream left unconsumed isn't recorded. It is kept
+        # redacted chunk by chunk, the caller gets the chunks as is.
+        chunk_list = []
+        redactor = record_filter.redactor()
+        iter_content = response.iter_content
+        aiter_content = response.aiter_content
+
+        def keep_chunk(chunk):
+            chunk_list.append(chunk if redactor is None else redactor.feed(chunk))
+
+        def capture_content():
+            if redactor is not None:
+                chunk_list.append(redactor.finish())
+            capture_entry(
+                sequence,
+                source_type,
+                request_data,
+                response,
+                timer,
+                content=b"".join(chunk_list),
             )
-            vcr_object.register_persister(VCRFilesystemPersister)
-
-            # Unified captured_requests list for all CURL sources
-            captured_requests = []
-
-            # Save originals
-            originals = {}
-            if HAS_CURL_CFFI_SYNC:
-                originals["session_request"] = CurlCffiSession.request  # type: ignore[attr-defined]
-                # Module-level functions
-                originals["module_request"] = curl_cffi.requests.request
-                originals["module_get"] = curl_cffi.requests.get
-                originals["module_post"] = curl_cffi.requests.post
-                originals["module_put"] = curl_cffi.requests.put
-                originals["module_delete"] = curl_cffi.requests.delete
-                originals["module_head"] = curl_cffi.requests.head
-                originals["module_options"] = curl_cffi.requests.options
-                originals["module_patch"] = curl_cffi.requests.patch
-            if HAS_CURL_CFFI_ASYNC:
-                originals["async_session_request"] = CurlCffiAsyncSession.request  # type: ignore[attr-defined]
-            if HAS_PYCURL:
-                originals["pycurl_curl"] = pycurl.Curl  # type: ignore[attr-defined]
-
-            # Patch 1: curl_cffi.requests.Session
-            def capture_session_request(self, method, url, **kwargs):
-                response = originals["session_request"](self, method, url, **kwargs)
-                request_data = {"method": method, "url": url, **kwargs}
-                cassette_entry = normalize_cassette_entry(
-                    "curl_cffi_sync", request_data, response
-                )
 
-                if cassette_entry["response"]["status"]["code"] == 200:
-                    cassette_entry = apply_vcr_filters(cassette_entry, vcr_config)
-                    if cassette_entry is not None:
-                        captured_requests.append(cassette_entry)
-                return response
+        def tee_iter_content(*args, **kwargs):
+            for chunk in iter_content(*args, **kwargs):
+                keep_chunk(chunk)
+                yield chunk
+            capture_content()
+
+        async def tee_aiter_content(*args, **kwargs):
+            async for chunk in aiter_content(*args, **kwargs):
+                keep_chunk(chunk)
+                yield chunk
+            capture_content()
+
+        response.iter_content = tee_iter_content
+        response.aiter_content = tee_aiter_content
+
+    # Patch 1: curl_cffi.requests.Session
+    def capture_session_request(self, method, url, **kwargs):
+        sequence = capture_list.reserve()
+        interaction = find_episode(request_entry_of(method, url, kwargs), sequence)
+        if interaction is not None:
+            return MockResponse(interaction)
+
+        timer = Timer()
+
+        def send():
+            # Timed from the last attempt
+            timer.restart()
+            return CURL_ORIGINAL_MAP["session_request"](self, method, url, **kwargs)
+
+        response = record_throttle.send(
+            url,
+            send,
+            status_of=curl_status_of,
+            error_types=curl_error_types,
+        )
+        request_data = {"method": method, "url": url, **kwargs}
+        capture_response(sequence, "curl_cffi_sync", request_data, response, timer)
+        return response
+
+    # Patch 2: curl_cffi.requests.AsyncSession (async-aware)
+    async def capture_async_session_request(self, method, url, **kwargs):
+        sequence = capture_list.reserve()
+        interaction = find_episode(request_entry_of(method, url, kwargs), sequence)
+        if interaction is not None:
+            return MockResponse(interaction)
+
+        timer = Timer()
+
+        def send():
+            # Timed from the last attempt
+            timer.restart()
+            return CURL_ORIGINAL_MAP["async_session_request"](
+                self, method, url, **kwargs
+            )
 
-            # Patch 2: curl_cffi.requests.AsyncSession (async-aware)
-            async def capture_async_session_request(self, method, url, **kwargs):
-                response = await originals["async_session_request"](
-                    self, method, url, **kwargs
-                )
-                request_data = {"method": method, "url": url, **kwargs}
-                cassette_entry = normalize_cassette_entry(
-                    "curl_cffi_async", request_data, response
-                )
+        response = await record_throttle.send_async(
+            url,
+            send,
+            status_of=curl_status_of,
+            error_types=curl_error_types,
+        )
+        request_data = {"method": method, "url": url, **kwargs}
+        capture_response(sequence, "curl_cffi_async", request_data, response, timer)
+        return response
+
+    # Patch 3: pycurl.Curl and pycurl.CurlMulti constructor wrappers
+    def pycurl_curl_wrapper():
+        return PycurlWrapper(
+            capture_list,
+            CURL_ORIGINAL_MAP["pycurl_curl"],
+            record_filter,
+            (
+                find_episode
+                if episode_index is not None or module_request_count
+                else None
+            ),
+            timed=timed,
+        )
 
-                if cassette_entry["response"]["status"]["code"] == 200:
-                    cassette_entry = apply_vcr_filters(cassette_entry, vcr_config)
-                    if cassette_entry is not None:
-                        captured_requests.append(cassette_entry)
-                return response
-
-            # Patch 4: curl_cffi module-level functions
-            def create_module_wrapper(original_func, method_name):
-                def wrapper(url, **kwargs):
-                    response = original_func(url, **kwargs)
-                    request_data = {"method": method_name.upper(), "url": url, **kwargs}
-                    cassette_entry = normalize_cassette_entry(
-                        "curl_cffi_module", request_data, response
-                    )
+    interceptor = CurlInterceptor(
+        session_request=capture_session_request,
+        async_session_request=capture_async_session_request,
+        curl=pycurl_curl_wrapper,
+        curl_multi=lambda: PycurlMultiWrapper(CURL_ORIGINAL_MAP["pycurl_curl_multi"]),
+    )
 
-                    if cassette_entry["response"]["status"]["code"] == 200:
-                        cassette_entry = apply_vcr_filters(cassette_entry, vcr_config)
-                        if cassette_entry is not None:
-                            captured_requests.append(cassette_entry)
-                    return response
+    # Run test with the curl calls dispatched to the interceptor
+    with intercept_curl(interceptor=interceptor), use_cassette() as cassette:
+        try:
+            yield cassette
+        finally:
+            captured_requests.extend(capture_list.entry_list())
+
+    if episode_index is not None:
+        episode_counter.add(
+            recorder=RecordType.curl.name,
+            replayed=False,
+            count=len(captured_requests)
+            - module_request_count
+            - episode_index.used_count,
+        )
 
-                return wrapper
+    # Save the captured curl requests separately (after test completes),
+    # after the last test of the module with the module scope
+    if record_scope == "function":
+        if captured_requests:
+            save_captured_requests(captured_requests)
+        elif cassette is None or not cassette.data:
+            # Nothing was recorded, drop the outdated cassette
+            record_writer.remove(record_file_path=record_file_path)
 
-            def create_module_request_wrapper(original_func):
-                def wrapper(method, url, **kwargs):
-                    response = original_func(method, url, **kwargs)
-                    request_data = {"method": method, "url": url, **kwargs}
-                    cassette_entry = normalize_cassette_entry(
-                        "curl_cffi_module", request_data, response
-                    )
 
-                    if cassette_entry["response"]["status"]["code"] == 200:
-                        cassette_entry = apply_vcr_filters(cassette_entry, vcr_config)
-                        if cassette_entry is not None:
-                            captured_requests.append(cassette_entry)
-                    return response
-
-                return wrapper
-
-            # Patch 3: pycurl.Curl constructor wrapper
-            def pycurl_curl_wrapper():
-                return PycurlWrapper(
-                    captured_requests,
-                    originals["pycurl_curl"],
-                    vcr_config,
-                    apply_vcr_filters,
-                )
+def replay_curl_interactions(
+    *,
+    request: SubRequest,
+    vcr_config: dict[str, Any],
+    marker: Any,
+    record_scope: str,
+    record_file_path: Path,
+):
+    """Replays the curl requests of the test from the existing cassette."""
+    # pylint: disable=import-outside-toplevel
+    import yaml
+
+    def load_interactions():
+        with record_stats.measure(RecordType.curl.name, RecordPhase.load):
+            cassette_data = record_cache.load(
+                record_file_path=record_file_path, parse=yaml.safe_load
+            )
+        return record_dedup.expand(cassette_data.get("interactions", []))
+
+    # With the module scope the interactions are loaded once for the module
+    # and every test can replay them.
+    if record_scope == "module":
+        interactions = module_record(
+            request=request,
+            recorder=RecordType.curl.name,
+            record_file_path=record_file_path,
+            load=load_interactions,
+            save=lambda interactions: None,
+        )
+    else:
+        interactions = load_interactions()
 
-            # Apply all patches
-            try:
-                if HAS_CURL_CFFI_SYNC:
-                    CurlCffiSession.request = capture_session_request  # type: ignore[attr-defined]
-                    curl_cffi.requests.request = create_module_request_wrapper(
-                        originals["module_request"]
-                    )
-                    curl_cffi.requests.get = create_module_wrapper(
-                        originals["module_get"], "get"
-                    )
-                    curl_cffi.requests.post = create_module_wrapper(
-                        originals["module_post"], "post"
-                    )
-                    curl_cffi.requests.put = create_module_wrapper(
-                        originals["module_put"], "put"
-                    )
-                    curl_cffi.requests.delete = create_module_wrapper(
-                        originals["module_delete"], "delete"
-                    )
-                    curl_cffi.requests.head = create_module_wrapper(
-                        originals["module_head"], "head"
-                    )
-                    curl_cffi.requests.options = create_module_wrapper(
-                        originals["module_options"], "options"
-                    )
-                    curl_cffi.requests.patch = create_module_wrapper(
-                        originals["module_patch"], "patch"
-                    )
-                if HAS_CURL_CFFI_ASYNC:
-                    CurlCffiAsyncSession.request = capture_async_session_request  # type: ignore[attr-defined]
-                if HAS_PYCURL:
-                    pycurl.Curl = pycurl_curl_wrapper  # type: ignore[attr-defined]
-
-                # Run test with all patches active
-                with vcr_object.use_cassette(record_file_path.name) as cassette:  # type: ignore[attr-defined]
-                    yield cassette
-
-                # Save the captured curl requests separately (after test completes)
-                if captured_requests:
-                    cassette_data = {"interactions": captured_requests}
-                    record_file_path.parent.mkdir(parents=True, exist_ok=True)
-                    with record_file_path.open("w", encoding="utf-8") as f:
-                        yaml.dump(cassette_data, f, default_flow_style=False)
-
-            finally:
-                # Restore all originals
-
-                if HAS_CURL_CFFI_SYNC:
-                    CurlCffiSession.request = originals["session_request"]  # type: ignore[attr-defined]
-                    curl_cffi.requests.request = originals["module_request"]
-                    curl_cffi.requests.get = originals["module_get"]
-                    curl_cffi.requests.post = originals["module_post"]
-                    curl_cffi.requests.put = originals["module_put"]
-                    curl_cffi.requests.delete = originals["module_delete"]
-                    curl_cffi.requests.head = originals["module_head"]
-                    curl_cffi.requests.options = originals["module_options"]
-                    curl_cffi.requests.patch = originals["module_patch"]
-                if HAS_CURL_CFFI_ASYNC:
-                    CurlCffiAsyncSession.request = originals["async_session_request"]  # type: ignore[attr-defined]
-                if HAS_PYCURL:
-                    pycurl.Curl = originals["pycurl_curl"]  # type: ignore[attr-defined]
+    # Check if playback repeats are allowed (interactions can be reused)
+    allow_playback_repeats = record_scope == "module" or vcr_config.get(
+        "allow_playback_repeats", False
+    )
+
+    # Requests matched on `match_on`, then ignoring the query which may have
+    # been filtered, then on the url alone unless strict
+    strict = is_strict(request=request, marker=marker)
+    match_on = match_on_of(vcr_config=vcr_config)
+    match_on_list = [match_on, loose_match_on_of(match_on=match_on)]
+    if not strict:
+        match_on_list += [("uri",), ("scheme", "host", "port", "path")]
+    with record_stats.measure(RecordType.curl.name, RecordPhase.match):
+        request_index = RequestIndex(
+            interactions,
+            match_on_list=match_on_list,
+            allow_playback_repeats=allow_playback_repeats,
+        )
+
+    def find_matching_interaction(request_entry):
+        """Find an interaction matching the given request."""
+        interaction = request_index.find(request_entry)
+        if interaction is not None:
+            return interaction
+
+        if strict:
+            raise RecordNetworkError(
+                f"No recorded interaction matching {request_entry['method']} "
+                f"{request_entry['uri']} in the curl cassette {record_file_path}."
+            )
+
+        # Last resort: return first unused interaction, or any if repeats allowed
+        interaction = request_index.next_unused()
+        if interaction is not None:
+            return interaction
+        if allow_playback_repeats and interactions:
+            return interactions[0]
+
+        raise RuntimeError(
+            f"Cassette {record_file_path.name} has no more unused interactions. "
+            f"Total interactions: {len(interactions)}, all have been used."
+        )
+
+    find_matching_interaction = record_stats.wrap(
+        RecordType.curl.name, RecordPhase.match, find_matching_interaction
+    )
+
+    # With a latency factor the responses take their recorded time : a
+    # streamed response waits for its first byte, then paces its chunks
+    latency = ReplayLatency(factor=latency_factor_of(request=request, marker=marker))
+
+    # curl_cffi requests are answered with mock responses
+    def mock_session_request(_session, method, url, **kwargs):
+        interaction = find_matching_interaction(request_entry_of(method, url, kwargs))
+        timing = interaction["response"].get(TIMING_KEY)
+        if kwargs.get("stream"):
+            latency.wait_first_byte(timing)
+            return MockResponse(interaction, latency=latency)
+
+        latency.wait(timing)
+        return MockResponse(interaction)
+
+    async def mock_async_session_request(_session, method, url, **kwargs):
+        interaction = find_matching_interaction(request_entry_of(method, url, kwargs))
+        timing = interaction["response"].get(TIMING_KEY)
+        if kwargs.get("stream"):
+            await latency.wait_first_byte_async(timing)
+            return MockResponse(interaction, latency=latency)
+
+        await latency.wait_async(timing)
+        return MockResponse(interaction)
+
+    interceptor = CurlInterceptor(
+        session_request=mock_session_request,
+        async_session_request=mock_async_session_request,
+        curl=functools.partial(MockPycurlCurl, find_matching_interaction, latency),
+        curl_multi=functools.partial(MockPycurlCurlMulti, latency),
+    )
+
+    with intercept_curl(interceptor=interceptor), replay_guard(
+        request=request,
+        marker=marker,
+        recorder=RecordType.curl.name,
+        record_file_path=record_file_path,
+        vcr_config=vcr_config,
+    ):
+        yield None  # No cassette object in playback mode
+
+
+def record_curl_context_manager(
+    request: SubRequest,
+    vcr_config: dict[str, Any],
+):
+    """Context manager for curl recording."""
+    marker = request.node.get_closest_marker("record_curl")
+
+    if marker:
+        curl_libraries.load()
+
+        record_new_episodes = request.config.getoption(
+            "--record-new-episodes", default=False
+        )
+        record_no_overwrite = request.config.getoption(
+            "--record-no-overwrite", default=False
+        )
+        record_type = request.config.getoption("--record", default="none")
+        record_scope = record_scope_of(marker=marker)
+        test_function = record_name_of(request=request, scope=record_scope)
+        test_module_path = Path(request.node.fspath)
+
+        with record_stats.measure(RecordType.curl.name, RecordPhase.path):
+            record_file_path = CurlRecordFilePathBuilder.build(
+                test_module_path=test_module_path,
+                test_function=test_function,
+            )
 
+        # Determine if we should record and create VCR object
+        if (RecordType.all in record_type or RecordType.curl in record_type) and not (
+            record_file_path.exists() and record_no_overwrite
+        ):
+            yield from record_curl_interactions(
+                request=request,
+                vcr_config=vcr_config,
+                marker=marker,
+                record_scope=record_scope,
+                record_file_path=record_file_path,
+                record_new_episodes=record_new_episodes,
+            )
         elif record_file_path.exists():
             # Playback mode: Use existing cassette
-            # Load the cassette data directly
-            with open(record_file_path, "r") as f:
-                cassette_data = yaml.safe_load(f)
-            interactions = cassette_data.get("interactions", [])
-
-            # Check if playback repeats are allowed (interactions can be reused)
-            allow_playback_repeats = vcr_config.get("allow_playback_repeats", False)
-
-            # Track used interactions to handle multiple requests to same URL
-            used_interactions = []
-
-            def find_matching_interaction(url):
-                """Find an interaction matching the given URL."""
-                # Try to find a matching interaction (unused first, then any if repeats allowed)
-                for i, interaction in enumerate(interactions):
-                    if interaction["request"]["uri"] == url:
-                        if i not in used_interactions:
-                            used_interactions.append(i)
-                            return interaction
-                        elif allow_playback_repeats:
-                            # Allow reusing this interaction
-                            return interaction
-
-                # If no exact match found, try matching without query parameters
-                from urllib.parse import urlparse
-
-                parsed_url = urlparse(url)
-                base_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
-
-                for i, interaction in enumerate(interactions):
-                    interaction_url = interaction["request"]["uri"]
-                    parsed_interaction = urlparse(interaction_url)
-                    interaction_base = f"{parsed_interaction.scheme}://{parsed_interaction.netloc}{parsed_interaction.path}"
-                    if base_url == interaction_base:
-                        if i not in used_interactions:
-                            used_interactions.append(i)
-                            return interaction
-                        elif allow_playback_repeats:
-                            # Allow reusing this interaction
-                            return interaction
-
-                # Last resort: return first unused interaction, or any if repeats allowed
-                for i, interaction in enumerate(interactions):
-                    if i not in used_interactions:
-                        used_interactions.append(i)
-                        return interaction
-
-                # If repeats allowed and we have interactions, return the first one
-                if allow_playback_repeats and interactions:
-                    return interactions[0]
-
-                raise RuntimeError(
-                    f"Cassette {record_file_path.name} has no more unused interactions. "
-                    f"Total interactions: {len(interactions)}, all have been used."
-                )
-
-            # Save originals for restoration
-            originals = {}
-            if HAS_CURL_CFFI_SYNC:
-                originals["session_request"] = CurlCffiSession.request
-                originals["module_request"] = curl_cffi.requests.request
-                originals["module_get"] = curl_cffi.requests.get
-                originals["module_post"] = curl_cffi.requests.post
-                originals["module_put"] = curl_cffi.requests.put
-                originals["module_delete"] = curl_cffi.requests.delete
-                originals["module_head"] = curl_cffi.requests.head
-                originals["module_options"] = curl_cffi.requests.options
-                originals["module_patch"] = curl_cffi.requests.patch
-            if HAS_CURL_CFFI_ASYNC:
-                originals["async_session_request"] = CurlCffiAsyncSession.request
-            if HAS_PYCURL:
-                originals["pycurl_curl"] = pycurl.Curl
-
-            # Create mock response class that mimics curl_cffi.requests.Response
-            class MockResponse:
-                def __init__(self, interaction):
-                    self.status_code = interaction["response"]["status"]["code"]
-                    self.reason = interaction["response"]["status"]["message"]
-                    self.headers = interaction["response"]["headers"]
-                    body_data = interaction["response"]["body"]["string"]
-                    self.content = body_data if isinstance(body_data, bytes) else b""
-                    self.text = (
-                        body_data.decode("utf-8")
-                        if isinstance(body_data, bytes)
-                        else ""
-                    )
-                    self.url = interaction["request"]["uri"]
-
-                def raise_for_status(self):
-                    """Raise an exception if the response status indicates an error."""
-                    if 400 <= self.status_code < 600:
-                        raise Exception(f"HTTP {self.status_code}: {self.reason}")
-
-                def json(self):
-                    """Parse response content as JSON."""
-                    import json
-
-                    return json.loads(self.text)
-
-            # Patch curl_cffi functions to return mock responses
-            def mock_session_request(self, method, url, **kwargs):
-                interaction = find_matching_interaction(url)
-                return MockResponse(interaction)
-
-            async def mock_async_session_request(self, method, url, **kwargs):
-                interaction = find_matching_interaction(url)
-                return MockResponse(interaction)
-
-            def create_mock_module_wrapper(http_method):
-                def wrapper(url, **kwargs):
-                    interaction = find_matching_interaction(url)
-                    return MockResponse(interaction)
-
-                return wrapper
-
-            def mock_module_request(method, url, **kwargs):
-                interaction = find_matching_interaction(url)
-                return MockResponse(interaction)
-
-            # Patch pycurl
-            class MockPycurlCurl:
-                def __init__(self):
-                    self._url = None
-                    self._write_data = None
-                    self._interaction = None
-
-                def setopt(self, option, value):
-                    if HAS_PYCURL and option == pycurl.URL:
-                        self._url = value
-                    elif HAS_PYCURL and option == pycurl.WRITEDATA:
-                        self._write_data = value
-
-                def perform(self):
-                    if self._url:
-                        self._interaction = find_matching_interaction(self._url)
-                    if self._write_data and self._interaction:
-                        body = self._interaction["response"]["body"]["string"]
-                        if isinstance(body, bytes):
-                            self._write_data.write(body)
-
-                def getinfo(self, info):
-                    if (
-                        HAS_PYCURL
-                        and info == pycurl.RESPONSE_CODE
-                        and self._interaction
-                    ):
-                        return self._interaction["response"]["status"]["code"]
-                    return None
-
-                def close(self):
-                    pass
-
-            try:
-                # Apply playback patches
-                if HAS_CURL_CFFI_SYNC:
-                    CurlCffiSession.request = mock_session_request  # type: ignore[attr-defined]
-                    curl_cffi.requests.request = mock_module_request
-                    curl_cffi.requests.get = create_mock_module_wrapper("GET")
-                    curl_cffi.requests.post = create_mock_module_wrapper("POST")
-                    curl_cffi.requests.put = create_mock_module_wrapper("PUT")
-                    curl_cffi.requests.delete = create_mock_module_wrapper("DELETE")
-                    curl_cffi.requests.head = create_mock_module_wrapper("HEAD")
-                    curl_cffi.requests.options = create_mock_module_wrapper("OPTIONS")
-                    curl_cffi.requests.patch = create_mock_module_wrapper("PATCH")
-                if HAS_CURL_CFFI_ASYNC:
-                    CurlCffiAsyncSession.request = mock_async_session_request  # type: ignore[attr-defined]
-                if HAS_PYCURL:
-                    pycurl.Curl = MockPycurlCurl  # type: ignore[attr-defined]
-
-                yield None  # No cassette object in playback mode
-
-            finally:
-                # Restore originals
-                if HAS_CURL_CFFI_SYNC:
-                    CurlCffiSession.request = originals["session_request"]  # type: ignore[attr-defined]
-                    curl_cffi.requests.request = originals["module_request"]
-                    curl_cffi.requests.get = originals["module_get"]
-                    curl_cffi.requests.post = originals["module_post"]
-                    curl_cffi.requests.put = originals["module_put"]
-                    curl_cffi.requests.delete = originals["module_delete"]
-                    curl_cffi.requests.head = originals["module_head"]
-                    curl_cffi.requests.options = originals["module_options"]
-                    curl_cffi.requests.patch = originals["module_patch"]
-                if HAS_CURL_CFFI_ASYNC:
-                    CurlCffiAsyncSession.request = originals["async_session_request"]  # type: ignore[attr-defined]
-                if HAS_PYCURL:
-                    pycurl.Curl = originals["pycurl_curl"]  # type: ignore[attr-defined]
+            yield from replay_curl_interactions(
+                request=request,
+                vcr_config=vcr_config,
+                marker=marker,
+                record_scope=record_scope,
+                record_file_path=record_file_path,
+            )
         else:
             raise AttributeError(
                 f"No comparison possible since there is no curl cassette: {record_file_path}",
@@ -733,6 +943,4 @@ def record_curl_context_manager(
 
 
 # Create the fixture
-record_curl_fixture = pytest.fixture(name="record_curl", autouse=True)(
-    record_curl_context_manager
-)
+record_curl_fixture = pytest.fixture(name="record_curl")(record_curl_context_manager)
@@ -0,0 +1,155 @@
+# IMPORT STANDARD
+import contextlib
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_curl_library import curl_libraries
+from pytest_recorder.record_guard import check_network, is_network_blocked
+
+
+class CurlInterceptor:
+    """Handlers of the curl calls made while a `record_curl` test runs."""
+
+    def __init__(
+        self,
+        session_request: Callable,
+        async_session_request: Callable,
+        curl: Callable,
+        curl_multi: Callable,
+    ) -> None:
+        self.session_request = session_request
+        self.async_session_request = async_session_request
+        self.curl = curl
+        self.curl_multi = curl_multi
+
+
+# Interceptor of the running test, in its context : the asyncio tasks of the test
+# inherit it, concurrent tests don't see each other's.
+ACTIVE_CURL_INTERCEPTOR: ContextVar[Optional[CurlInterceptor]] = ContextVar(
+    "ACTIVE_CURL_INTERCEPTOR", default=None
+)
+# Threads started by the test don't inherit its context, they use this one.
+RUNNING_CURL_INTERCEPTOR: Optional[CurlInterceptor] = None
+
+# Functions replaced by the dispatchers, set while they are installed.
+CURL_ORIGINAL_MAP: dict[str, Any] = {}
+
+
+def active_curl_interceptor() -> Optional[CurlInterceptor]:
+    interceptor = ACTIVE_CURL_INTERCEPTOR.get()
+    return interceptor if interceptor is not None else RUNNING_CURL_INTERCEPTOR
+
+
+def install_curl_interceptors() -> None:
+    """
+    Replaces the curl_cffi and pycurl entry points by dispatchers, once per session.
+
+    A dispatcher calls the handler of the active `CurlInterceptor`, or the original
+    when no `record_curl` test runs, once `check_network` allowed its host. The
+    module-level functions of curl_cffi, like `curl_cffi.requests.get`, go through
+    `Session.request`.
+    """
+
+    if CURL_ORIGINAL_MAP:
+        return
+
+    curl_libraries.load()
+    session_class = curl_libraries.session_class
+    async_session_class = curl_libraries.async_session_class
+    pycurl = curl_libraries.pycurl
+
+    if curl_libraries.has_session:
+        original_session_request = session_class.request
+        CURL_ORIGINAL_MAP["session_request"] = original_session_request
+
+        def session_request(self, method, url, **kwargs):
+            interceptor = active_curl_interceptor()
+            if interceptor is None:
+                check_network(url)
+                return original_session_request(self, method, url, **kwargs)
+            return interceptor.session_request(self, method, url, **kwargs)
+
+        session_class.request = session_request
+
+    if curl_libraries.has_async_session:
+        original_async_session_request = async_session_class.request
+        CURL_ORIGINAL_MAP["async_session_request"] = original_async_session_request
+
+        async def async_session_request(self, method, url, **kwargs):
+            interceptor = active_curl_interceptor()
+            if interceptor is None:
+                check_network(url)
+                return await original_async_session_request(self, method, url, **kwargs)
+            return await interceptor.async_session_request(self, method, url, **kwargs)
+
+        async_session_class.request = async_session_request
+
+    if curl_libraries.has_pycurl:
+        original_curl = pycurl.Curl
+        original_curl_multi = pycurl.CurlMulti
+        CURL_ORIGINAL_MAP["pycurl_curl"] = original_curl
+        CURL_ORIGINAL_MAP["pycurl_curl_multi"] = original_curl_multi
+
+        class CheckedCurl(original_curl):  # type: ignore[misc,valid-type]
+            """Handle checking its url with `check_network`, while the network is blocked."""
+
+            def setopt(self, option, value):
+                if option == pycurl.URL:
+                    check_network(value)
+                return super().setopt(option, value)
+
+        def curl():
+            interceptor = active_curl_interceptor()
+            if interceptor is not None:
+                return interceptor.curl()
+            return CheckedCurl() if is_network_blocked() else original_curl()
+
+        def curl_multi():
+            interceptor = active_curl_interceptor()
+            return (
+                original_curl_multi()
+                if interceptor is None
+                else interceptor.curl_multi()
+            )
+
+        pycurl.Curl = curl
+        pycurl.CurlMulti = curl_multi
+
+
+def uninstall_curl_interceptors() -> None:
+    if "session_request" in CURL_ORIGINAL_MAP:
+        curl_libraries.session_class.request = CURL_ORIGINAL_MAP["session_request"]
+    if "async_session_request" in CURL_ORIGINAL_MAP:
+        curl_libraries.async_session_class.request = CURL_ORIGINAL_MAP[
+            "async_session_request"
+        ]
+    if "pycurl_curl" in CURL_ORIGINAL_MAP:
+        curl_libraries.pycurl.Curl = CURL_ORIGINAL_MAP["pycurl_curl"]
+        curl_libraries.pycurl.CurlMulti = CURL_ORIGINAL_MAP["pycurl_curl_multi"]
+    CURL_ORIGINAL_MAP.clear()
+
+
+@contextlib.contextmanager
+def intercept_curl(interceptor: CurlInterceptor) -> Iterator[None]:
+    """Dispatches the curl calls to `interceptor` in this context."""
+
+    global RUNNING_CURL_INTERCEPTOR  # pylint: disable=global-statement
+
+    install_curl_interceptors()
+    token = ACTIVE_CURL_INTERCEPTOR.set(interceptor)
+    previous_interceptor, RUNNING_CURL_INTERCEPTOR = (
+        RUNNING_CURL_INTERCEPTOR,
+        interceptor,
+    )
+    try:
+        yield
+    finally:
+        RUNNING_CURL_INTERCEPTOR = previous_interceptor
+        try:
+            ACTIVE_CURL_INTERCEPTOR.reset(token)
+        except ValueError:
+            # Torn down in another context than the one it was set up in
+            ACTIVE_CURL_INTERCEPTOR.set(None)
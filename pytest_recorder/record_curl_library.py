@@ -0,0 +1,65 @@
+# IMPORT STANDARD
+from typing import Any
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+
+class CurlLibraries:
+    """
+    The curl libraries recorded by `record_curl`, all optional.
+
+    They are imported by `load` when a test marked with `record_curl` runs, not when
+    the plugin is loaded. A library which isn't installed stays None.
+    """
+
+    @property
+    def has_session(self) -> bool:
+        return self.session_class is not None
+
+    @property
+    def has_async_session(self) -> bool:
+        return self.async_session_class is not None
+
+    @property
+    def has_pycurl(self) -> bool:
+        return self.pycurl is not None
+
+    def __init__(self) -> None:
+        self._loaded = False
+        self.session_class: Any = None
+        self.async_session_class: Any = None
+        self.pycurl: Any = None
+
+    def load(self) -> None:
+        """Imports the libraries, only once."""
+
+        # pylint: disable=import-outside-toplevel
+        if self._loaded:
+            return
+        self._loaded = True
+
+        try:
+            from curl_cffi.requests import Session
+
+            self.session_class = Session
+        except ImportError:
+            pass
+
+        try:
+            from curl_cffi.requests import AsyncSession
+
+            self.async_session_class = AsyncSession
+        except ImportError:
+            pass
+
+        try:
+            import pycurl
+
+            self.pycurl = pycurl
+        except ImportError:
+            pass
+
+
+curl_libraries = CurlLibraries()
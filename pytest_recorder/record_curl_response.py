@@ -0,0 +1,370 @@
+# IMPORT STANDARD
+import codecs
+import functools
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_curl_library import curl_libraries
+from pytest_recorder.record_latency import TIMING_KEY, ReplayLatency
+
+
+# Size of the chunks of the replayed streams, when the caller doesn't set one.
+STREAM_CHUNK_SIZE = 65536
+
+
+class MockResponse:
+    """
+    Response replayed from a cassette, mimics `curl_cffi.requests.Response`.
+
+    The body isn't copied : the stream methods yield chunks of a memoryview of the
+    recorded bytes, `text` and `json()` decode it on first access only. With a
+    `latency` the chunks are passed on at the recorded pace.
+    """
+
+    def __init__(self, interaction, latency: Optional[ReplayLatency] = None):
+        self._latency = latency
+        self._timing = interaction["response"].get(TIMING_KEY)
+        self.status_code = interaction["response"]["status"]["code"]
+        self.reason = interaction["response"]["status"]["message"]
+        # A copy : the interaction may be shared by the cassette cache
+        self.headers = dict(interaction["response"]["headers"] or {})
+        body_data = interaction["response"]["body"]["string"]
+        self.content = body_data if isinstance(body_data, bytes) else b""
+        self.url = interaction["request"]["uri"]
+
+    @property
+    def ok(self) -> bool:
+        return not 400 <= self.status_code < 600
+
+    @property
+    def encoding(self) -> str:
+        """Charset of the `Content-Type` header, utf-8 by default."""
+        for key, value in (self.headers or {}).items():
+            if key.lower() == "content-type":
+                for parameter in str(value).split(";")[1:]:
+                    name, _, charset = parameter.partition("=")
+                    if name.strip().lower() == "charset" and charset.strip():
+                        return charset.strip().strip("\"'")
+        return "utf-8"
+
+    @functools.cached_property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def raise_for_status(self):
+        """Raise an exception if the response status indicates an error."""
+        if 400 <= self.status_code < 600:
+            raise Exception(f"HTTP {self.status_code}: {self.reason}")
+
+    def json(self, **kwargs):
+        """Parse response content as JSON."""
+        import json  # pylint: disable=import-outside-toplevel
+
+        return json.loads(self.text, **kwargs)
+
+    def _chunk_iterable(self, chunk_size):
+        view = memoryview(self.content)
+        chunk_size = chunk_size or STREAM_CHUNK_SIZE
+        return (
+            view[start : start + chunk_size]
+            for start in range(0, len(view), chunk_size)
+        )
+
+    def _decoder_of(self, decode_unicode):
+        if not decode_unicode:
+            return None
+        return codecs.getincrementaldecoder(self.encoding)(errors="replace")
+
+    @staticmethod
+    def _split_lines(pending, chunk, delimiter):
+        """Complete lines of `pending` + `chunk`, and the incomplete last one or None."""
+        if pending is not None:
+            chunk = pending + chunk
+        lines = chunk.split(delimiter) if delimiter else chunk.splitlines()
+        pending = (
+            lines.pop()
+            if lines and lines[-1] and chunk and lines[-1][-1] == chunk[-1]
+            else None
+        )
+        return lines, pending
+
+    def iter_content(self, chunk_size=None, decode_unicode=False):
+        """Iterate the recorded body chunk by chunk."""
+        decoder = self._decoder_of(decode_unicode)
+        chunk_iterable = self._chunk_iterable(chunk_size)
+        if self._latency is not None:
+            chunk_iterable = self._latency.pace(
+                chunk_iterable, timing=self._timing, size=len(self.content)
+            )
+
+        for chunk in chunk_iterable:
+            yield decoder.decode(chunk) if decoder else bytes(chunk)
+        if decoder:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+    def iter_lines(self, chunk_size=None, decode_unicode=False, delimiter=None):
+        """Iterate the recorded body line by line, as `curl_cffi` does."""
+        pending = None
+
+        for chunk in self.iter_content(
+            chunk_size=chunk_size, decode_unicode=decode_unicode
+        ):
+            lines, pending = self._split_lines(pending, chunk, delimiter)
+            yield from lines
+
+        if pending is not None:
+            yield pending
+
+    async def aiter_content(self, chunk_size=None, decode_unicode=False):
+        decoder = self._decoder_of(decode_unicode)
+        chunk_iterable = self._chunk_iterable(chunk_size)
+        if self._latency is None:
+            for chunk in chunk_iterable:
+                yield decoder.decode(chunk) if decoder else bytes(chunk)
+        else:
+            async for chunk in self._latency.apace(
+                chunk_iterable, timing=self._timing, size=len(self.content)
+            ):
+                yield decoder.decode(chunk) if decoder else bytes(chunk)
+        if decoder:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+
+    async def aiter_lines(self, chunk_size=None, decode_unicode=False, delimiter=None):
+        pending = None
+
+        async for chunk in self.aiter_content(
+            chunk_size=chunk_size, decode_unicode=decode_unicode
+        ):
+            lines, pending = self._split_lines(pending, chunk, delimiter)
+            for line in lines:
+                yield line
+
+        if pending is not None:
+            yield pending
+
+    async def acontent(self) -> bytes:
+        return self.content
+
+    async def atext(self) -> str:
+        return self.text
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+
+# CURL_MAX_WRITE_SIZE, the largest chunk libcurl passes to a WRITEFUNCTION.
+PYCURL_CHUNK_SIZE = 16384
+
+
+def replay_pycurl_response(
+    interaction,
+    write_function=None,
+    write_data=None,
+    header_function=None,
+    latency: Optional[ReplayLatency] = None,
+) -> None:
+    """Feeds the callbacks of a pycurl handle with a recorded response, as libcurl would."""
+    response = interaction["response"]
+    timing = response.get(TIMING_KEY)
+    if latency is not None:
+        latency.wait_first_byte(timing)
+    if header_function is not None:
+        status = response["status"]
+        header_line_list = [f"HTTP/1.1 {status['code']} {status['message']}"] + [
+            f"{key}: {value}" for key, value in (response.get("headers") or {}).items()
+        ]
+        for header_line in header_line_list:
+            header_function(f"{header_line}\r\n".encode("iso-8859-1", "replace"))
+        header_function(b"\r\n")
+
+    body = response["body"]["string"]
+    write = write_function or getattr(write_data, "write", None)
+    if write is None or not isinstance(body, bytes):
+        return
+
+    view = memoryview(body)
+    chunk_iterable: Iterable[bytes] = (
+        bytes(view[start : start + PYCURL_CHUNK_SIZE])
+        for start in range(0, len(view), PYCURL_CHUNK_SIZE)
+    )
+    if latency is not None:
+        chunk_iterable = latency.pace(chunk_iterable, timing=timing, size=len(view))
+    for chunk in chunk_iterable:
+        write(chunk)
+
+
+class MockPycurlCurl:
+    """
+    pycurl handle completed from a cassette, `find_interaction` finds the recorded
+    interaction of its request.
+    """
+
+    def __init__(
+        self,
+        find_interaction: Callable[[Dict[str, Any]], Any],
+        latency: ReplayLatency,
+    ):
+        self._find_interaction = find_interaction
+        self._latency = latency
+        self._url = None
+        self._method = "GET"
+        self._body = None
+        self._headers: Dict[str, str] = {}
+        self._write_data = None
+        self._write_function = None
+        self._header_function = None
+        self._interaction = None
+
+    def setopt(self, option, value):
+        pycurl = curl_libraries.pycurl
+        if option == pycurl.URL:
+            self._url = value
+        elif option == pycurl.CUSTOMREQUEST:
+            self._method = value
+        elif option == pycurl.HTTPHEADER:
+            for header in value:
+                if ":" in header:
+                    key, val = header.split(":", 1)
+                    self._headers[key.strip()] = val.strip()
+        elif option == pycurl.POSTFIELDS:
+            self._body = value
+            if self._method == "GET":
+                self._method = "POST"
+        elif option == pycurl.WRITEDATA:
+            self._write_data = value
+        elif option == pycurl.WRITEFUNCTION:
+            self._write_function = value
+        elif option == pycurl.HEADERFUNCTION:
+            self._header_function = value
+
+    def perform(self):
+        self.match()
+        self.replay(latency=self._latency)
+
+    def match(self):
+        """Finds the recorded interaction of the request, None when there is none."""
+        if self._url:
+            self._interaction = self._find_interaction(
+                {
+                    "method": self._method,
+                    "uri": self._url,
+                    "headers": self._headers,
+                    "body": self._body,
+                }
+            )
+        return self._interaction
+
+    def replay(self, latency: Optional[ReplayLatency] = None):
+        """Feeds the callbacks with the response found by `match`."""
+        if self._interaction:
+            replay_pycurl_response(
+                self._interaction,
+                write_function=self._write_function,
+                write_data=self._write_data,
+                header_function=self._header_function,
+                latency=latency,
+            )
+
+    def getinfo(self, info):
+        pycurl = curl_libraries.pycurl
+        if self._interaction:
+            if info == pycurl.RESPONSE_CODE:
+                return self._interaction["response"]["status"]["code"]
+            if info == pycurl.EFFECTIVE_URL:
+                return self._interaction["request"]["uri"]
+        return None
+
+    def reset(self):
+        # The state of a new handle, of the same class
+        vars(self).update(vars(type(self)(self._find_interaction, self._latency)))
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        # The option constants, `curl.URL` as well as `pycurl.URL`
+        return getattr(curl_libraries.pycurl, name)
+
+
+class MockPycurlCurlMulti:
+    """
+    Completes the transfers of its handles from the cassette, without sockets.
+
+    With a latency factor the transfers run in parallel : each one completes
+    once its recorded duration has elapsed since its handle was added.
+    """
+
+    def __init__(self, latency: ReplayLatency):
+        self._latency = latency
+        # Handles with the time they were added, then their due time
+        self._handle_list: List[Tuple[Any, float]] = []
+        self._due_list: List[Tuple[Any, float]] = []
+        self._done_list: List[Any] = []
+
+    def add_handle(self, handle):
+        self._handle_list.append((handle, time.perf_counter()))
+
+    def remove_handle(self, handle):
+        for handle_list in (self._handle_list, self._due_list):
+            handle_list[:] = [item for item in handle_list if item[0] is not handle]
+        if handle in self._done_list:
+            self._done_list.remove(handle)
+
+    def perform(self):
+        for handle, added in self._handle_list:
+            interaction = handle.match()
+            timing = interaction and interaction["response"].get(TIMING_KEY)
+            self._due_list.append(
+                (handle, added + sum(self._latency.delays_of(timing)))
+            )
+        self._handle_list = []
+
+        now = time.perf_counter()
+        for handle, due in self._due_list:
+            if due <= now:
+                handle.replay()
+                self._done_list.append(handle)
+        self._due_list = [item for item in self._due_list if item[1] > now]
+        return curl_libraries.pycurl.E_MULTI_OK, len(self._due_list)
+
+    def info_read(self, max_objects=None):
+        count = len(self._done_list) if max_objects is None else max_objects
+        ok_list = self._done_list[:count]
+        del self._done_list[:count]
+        return len(self._done_list), ok_list, []
+
+    def select(self, timeout):
+        """Waits for the next transfer due, at most `timeout` seconds."""
+        if not self._due_list:
+            return 0
+        delay = min(due for _, due in self._due_list) - time.perf_counter()
+        if delay > timeout:
+            time.sleep(max(0.0, timeout))
+            return 0
+        time.sleep(max(0.0, delay))
+        return 1
+
+    def timeout(self):
+        if not self._due_list:
+            return 0
+        delay = min(due for _, due in self._due_list) - time.perf_counter()
+        return max(0, int(delay * 1000))
+
+    def fdset(self):
+        return [], [], []
+
+    def setopt(self, option, value):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,121 @@
+# IMPORT STANDARD
+import bisect
+import hashlib
+import json
+from typing import Any, Dict, Iterator, List, Sequence, Union
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+REPEAT_KEY = "repeat"
+SAME_AS_KEY = "same_as"
+
+
+def digest_of(interaction: Dict[str, Any]) -> bytes:
+    data = json.dumps(interaction, sort_keys=True, default=repr)
+    return hashlib.sha256(data.encode("utf-8")).digest()
+
+
+class InteractionList(Sequence):
+    """
+    Interactions of a collapsed record, expanded when they are accessed.
+
+    An interaction repeated `n` times is stored once, every position it takes
+    returns the same object.
+    """
+
+    def __init__(self, entry_list: List[Dict[str, Any]]) -> None:
+        self._interaction_list: List[Dict[str, Any]] = []
+        self._end_list: List[int] = []
+
+        end = 0
+        for entry in entry_list:
+            if SAME_AS_KEY in entry:
+                index = entry[SAME_AS_KEY]
+                if not 0 <= index < len(self._interaction_list):
+                    raise AttributeError(f"Invalid {SAME_AS_KEY} reference : {index}")
+                interaction = self._interaction_list[index]
+            else:
+                interaction = {
+                    key: value for key, value in entry.items() if key != REPEAT_KEY
+                }
+            end += entry.get(REPEAT_KEY, 1)
+            self._interaction_list.append(interaction)
+            self._end_list.append(end)
+
+    def __len__(self) -> int:
+        return self._end_list[-1] if self._end_list else 0
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("interaction index out of range")
+
+        return self._interaction_list[bisect.bisect_right(self._end_list, index)]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        start = 0
+        for interaction, end in zip(self._interaction_list, self._end_list):
+            for _ in range(end - start):
+                yield interaction
+            start = end
+
+
+class RecordDedup:
+    """
+    Collapses the repeated interactions of the records.
+
+    A run of identical interactions is stored once with a `repeat` count, an
+    interaction identical to an earlier one is stored as a `same_as` reference
+    to it. The order of the interactions is kept.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def __init__(self) -> None:
+        self._enabled = True
+
+    def configure(self, enabled: bool = True) -> None:
+        self._enabled = enabled
+
+    def collapse(self, interaction_list: Sequence[Dict[str, Any]]) -> list:
+        if not self._enabled:
+            return list(interaction_list)
+
+        entry_list: List[Dict[str, Any]] = []
+        index_map: Dict[bytes, int] = {}
+        previous_digest = None
+
+        for interaction in interaction_list:
+            digest = digest_of(interaction)
+            if digest == previous_digest:
+                entry_list[-1][REPEAT_KEY] = entry_list[-1].get(REPEAT_KEY, 1) + 1
+                continue
+
+            previous_digest = digest
+            if digest in index_map:
+                entry_list.append({SAME_AS_KEY: index_map[digest]})
+            else:
+                index_map[digest] = len(entry_list)
+                entry_list.append(dict(interaction))
+
+        return entry_list
+
+    @staticmethod
+    def expand(entry_list: List[Dict[str, Any]]) -> Sequence[Dict[str, Any]]:
+        """Returns `entry_list` itself when nothing was collapsed, an `InteractionList` otherwise."""
+
+        if any(REPEAT_KEY in entry or SAME_AS_KEY in entry for entry in entry_list):
+            return InteractionList(entry_list=entry_list)
+
+        return entry_list
+
+
+record_dedup = RecordDedup()
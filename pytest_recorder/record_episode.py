@@ -0,0 +1,61 @@
+# IMPORT STANDARD
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+
+class EpisodeCounter:
+    """
+    Interactions replayed or recorded by the `--record-new-episodes` mode.
+
+    Every replayed interaction is a network call avoided compared to a full record.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def __init__(self) -> None:
+        self._enabled = False
+        self._counter: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool = False) -> None:
+        self._enabled = enabled
+        self._counter.clear()
+
+    def add(self, recorder: str, replayed: bool, count: int = 1) -> None:
+        with self._lock:
+            self._counter[(recorder, replayed)] += count
+
+    def count_map(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            item_list: List[Tuple[Tuple[str, bool], int]] = sorted(
+                self._counter.items()
+            )
+
+        count_map: Dict[str, Dict[str, int]] = {}
+        for (recorder, replayed), count in item_list:
+            recorder_count = count_map.setdefault(
+                recorder, {"replayed": 0, "recorded": 0}
+            )
+            recorder_count["replayed" if replayed else "recorded"] += count
+
+        return count_map
+
+    def summary(self) -> str:
+        count_map = self.count_map()
+        avoided = sum(count["replayed"] for count in count_map.values())
+        recorder_summary = ", ".join(
+            f"{recorder} {count['replayed']} replayed / {count['recorded']} recorded"
+            for recorder, count in count_map.items()
+        )
+
+        return f"new episodes : {avoided} network calls avoided ({recorder_summary})"
+
+
+episode_counter = EpisodeCounter()
@@ -0,0 +1,418 @@
+# IMPORT STANDARD
+import functools
+import re
+from typing import Any, Callable, Dict, Hashable, List, Optional, Pattern, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+# Compiled filters kept for the session, one per distinct `vcr_config`.
+FILTER_CACHE_SIZE = 128
+
+# Replacement of a `redact_body` pattern given alone.
+REDACTED = "[REDACTED]"
+# Longest regex match redacted whatever the chunks of a streamed body : the bytes
+# held back from one chunk to the next.
+REDACT_WINDOW = 4096
+
+Rule = Tuple[str, Optional[str]]
+RedactRule = Tuple[Union[str, bytes, Pattern], Union[str, bytes]]
+ResponseHook = Callable[[Dict[str, Any]], Any]
+
+_MISSING = object()
+
+
+def rule_list_of(rule_list: Any) -> List[Rule]:
+    """`(name, replacement)` rules, a name alone is removed as with vcrpy."""
+
+    return [
+        (rule, None) if isinstance(rule, str) else (rule[0], rule[1])
+        for rule in rule_list or []
+    ]
+
+
+def redact_rule_list_of(rule_list: Any) -> List[RedactRule]:
+    """`(pattern, replacement)` rules, a pattern alone is replaced by `REDACTED`."""
+
+    return [
+        (
+            (rule, REDACTED)
+            if isinstance(rule, (str, bytes, re.Pattern))
+            else (rule[0], rule[1])
+        )
+        for rule in rule_list or []
+    ]
+
+
+def as_bytes(value: Union[str, bytes]) -> bytes:
+    return value.encode("utf-8") if isinstance(value, str) else bytes(value)
+
+
+def hook_list_of(hooks: Any) -> List[ResponseHook]:
+    """`before_record_response` hooks, a single callable as with vcrpy or a list."""
+
+    if hooks is None:
+        return []
+    if callable(hooks):
+        return [hooks]
+    return list(hooks)
+
+
+class LiteralRedaction:
+    """A literal replaced with `bytes.replace`, its occurrences never overlap."""
+
+    def __init__(self, literal: bytes, replacement: bytes) -> None:
+        self._literal = literal
+        self._replacement = replacement
+        self.overlap = len(literal) - 1
+
+    def sub(self, data: bytes) -> bytes:
+        return data.replace(self._literal, self._replacement)
+
+    def split(self, buffer: bytes, hold: int) -> Tuple[bytes, int]:
+        """The redacted start of `buffer` up to `hold` or the occurrence across it."""
+
+        cut = buffer.find(self._literal, max(hold - self.overlap, 0))
+        if cut == -1 or cut > hold:
+            cut = hold
+
+        return self.sub(buffer[:cut]), cut
+
+
+class RegexRedaction:
+    """A bytes regular expression, or a literal which may overlap itself."""
+
+    def __init__(self, pattern: Pattern[bytes], replacement: bytes, overlap: int):
+        self._pattern = pattern
+        self._replacement = replacement
+        # A template without group references : replaced without a callback
+        self._template = replacement.replace(b"\\", b"\\\\")
+        self.overlap = overlap
+
+    def sub(self, data: bytes) -> bytes:
+        return self._pattern.sub(self._template, data)
+
+    def split(self, buffer: bytes, hold: int) -> Tuple[bytes, int]:
+        """The redacted start of `buffer` up to `hold` or the match across it."""
+
+        part_list = []
+        position = 0
+        cut = hold
+        for match in self._pattern.finditer(buffer):
+            if match.end() > hold:
+                # May be longer with the next chunk, redacted with it
+                cut = min(hold, match.start())
+                break
+            part_list.append(buffer[position : match.start()])
+            part_list.append(self._replacement)
+            position = match.end()
+        part_list.append(buffer[position:cut])
+
+        return b"".join(part_list), cut
+
+
+Redaction = Union[LiteralRedaction, RegexRedaction]
+
+
+def redaction_of(
+    pattern: Union[str, bytes, Pattern], replacement: Union[str, bytes]
+) -> Optional[Redaction]:
+    """
+    The redaction of a `redact_body` rule, matched on the UTF-8 bytes of the body.
+    A str regular expression is compiled again as a bytes one.
+    """
+
+    if isinstance(pattern, re.Pattern):
+        if isinstance(pattern.pattern, str):
+            pattern = re.compile(
+                pattern.pattern.encode("utf-8"), pattern.flags & ~re.UNICODE
+            )
+        return RegexRedaction(pattern, as_bytes(replacement), overlap=REDACT_WINDOW)
+
+    literal = as_bytes(pattern)
+    if not literal:
+        return None
+    if any(literal[:size] == literal[-size:] for size in range(1, len(literal))):
+        # "abab" : the occurrences found depend on the previous ones
+        return RegexRedaction(
+            re.compile(re.escape(literal)), as_bytes(replacement), len(literal)
+        )
+
+    return LiteralRedaction(literal, as_bytes(replacement))
+
+
+class BodyRedactor:
+    """
+    Redacts a body received in chunks, in a single pass.
+
+    Each chunk goes through the redactions in order, each holding back the last
+    bytes of its input where a match may continue in the next chunk. `feed`
+    returns the part of the body redacted for sure, `finish` the rest. The result
+    is the one of redacting the whole body at once for regex matches up to
+    `REDACT_WINDOW` bytes long.
+    """
+
+    def __init__(self, redaction_list: List[Redaction]) -> None:
+        self._redaction_list = redaction_list
+        self._tail_list = [b""] * len(redaction_list)
+
+    def feed(self, chunk: bytes) -> bytes:
+        data = bytes(chunk)
+        for index, redaction in enumerate(self._redaction_list):
+            tail = self._tail_list[index]
+            buffer = tail + data if tail else data
+            hold = len(buffer) - redaction.overlap
+            if hold <= 0:
+                self._tail_list[index] = buffer
+                return b""
+
+            data, cut = redaction.split(buffer, hold)
+            self._tail_list[index] = buffer[cut:]
+
+        return data
+
+    def finish(self) -> bytes:
+        data = b""
+        for index, redaction in enumerate(self._redaction_list):
+            data = redaction.sub(self._tail_list[index] + data)
+            self._tail_list[index] = b""
+
+        return data
+
+
+class RecordFilter:
+    """
+    The filters of a `vcr_config`, compiled into lookup tables.
+
+    - `filter_headers` : replaced or removed request and response headers, matched
+    whatever their case.
+    - `filter_query_parameters` : replaced or removed query parameters, the url is
+    only parsed when it has a query, and only rebuilt when a parameter is filtered.
+    - `filter_arguments` : literal replacements in the ftplib arguments, as one
+    regular expression matching the longest value first, in a single pass.
+    - `redact_body` : literal and regex replacements in the response bodies, applied
+    in order like hooks but in a single pass while the body is received, before the
+    `before_record_response` hooks.
+    - `before_record_response` : hooks called in order with the response, which
+    return it, a new response, a new body string, or None to drop the interaction.
+
+    Use `record_filter_of` : the filters of a configuration are compiled once per
+    session and shared by the curl and ftp recorders.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return bool(
+            self._header_map
+            or self._query_map
+            or self._argument_map
+            or self._hook_list
+            or self.redacts
+        )
+
+    @property
+    def filters_responses(self) -> bool:
+        return bool(self._hook_list)
+
+    @property
+    def redacts(self) -> bool:
+        return bool(self._redaction_list)
+
+    def __init__(
+        self,
+        header_list: List[Rule],
+        query_list: List[Rule],
+        argument_list: List[Tuple[str, str]],
+        hook_list: List[ResponseHook],
+        redact_list: Optional[List[RedactRule]] = None,
+    ) -> None:
+        self._header_map = {name.lower(): value for name, value in header_list}
+        self._query_map = dict(query_list)
+        self._argument_map = {
+            value: replacement for value, replacement in argument_list if value
+        }
+        self._argument_pattern = (
+            re.compile(
+                "|".join(
+                    re.escape(value)
+                    for value in sorted(self._argument_map, key=len, reverse=True)
+                )
+            )
+            if self._argument_map
+            else None
+        )
+        self._hook_list = hook_list
+
+        self._redaction_list = [
+            redaction
+            for redaction in (
+                redaction_of(pattern, replacement)
+                for pattern, replacement in redact_list or []
+            )
+            if redaction is not None
+        ]
+
+    def filter_headers(self, headers: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not self._header_map or not headers:
+            return headers if headers is not None else {}
+
+        filtered = {}
+        for name, value in headers.items():
+            replacement = self._header_map.get(str(name).lower(), _MISSING)
+            if replacement is _MISSING:
+                filtered[name] = value
+            elif replacement is not None:
+                filtered[name] = replacement
+
+        return filtered
+
+    def filter_uri(self, uri: Optional[str]) -> Optional[str]:
+        if not self._query_map or not uri or "?" not in uri:
+            return uri
+
+        split = urlsplit(uri)
+        pair_list = parse_qsl(split.query, keep_blank_values=True)
+        if not any(name in self._query_map for name, _ in pair_list):
+            return uri
+
+        filtered_list: List[Tuple[str, Any]] = []
+        for name, value in pair_list:
+            replacement = self._query_map.get(name, _MISSING)
+            if replacement is _MISSING:
+                filtered_list.append((name, value))
+            elif replacement is not None:
+                filtered_list.append((name, replacement))
+
+        return split._replace(query=urlencode(filtered_list)).geturl()
+
+    def filter_argument(self, value: Any) -> Any:
+        if self._argument_pattern is None or not isinstance(value, str):
+            return value
+
+        return self._argument_pattern.sub(
+            lambda match: self._argument_map[match.group(0)], value
+        )
+
+    def filter_response(self, response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for hook in self._hook_list:
+            filtered = hook(response)
+            if filtered is None:
+                return None
+            if isinstance(filtered, str):
+                response.setdefault("body", {})["string"] = filtered
+            elif isinstance(filtered, dict):
+                response = filtered
+
+        return response
+
+    def redactor(self) -> Optional[BodyRedactor]:
+        """A redactor for a body received in chunks, None without `redact_body`."""
+
+        if not self._redaction_list:
+            return None
+
+        return BodyRedactor(self._redaction_list)
+
+    def redact_body(self, body: Any) -> Any:
+        """Redacts a whole bytes or str body."""
+
+        if not self._redaction_list or not body:
+            return body
+
+        data = body.encode("utf-8") if isinstance(body, str) else bytes(body)
+        for redaction in self._redaction_list:
+            data = redaction.sub(data)
+
+        return data.decode("utf-8") if isinstance(body, str) else data
+
+    def redact_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        body = response.get("body")
+        if isinstance(body, dict) and body.get("string"):
+            body["string"] = self.redact_body(body["string"])
+
+        return response
+
+    def filter_entry(
+        self, cassette_entry: Dict[str, Any], redacted: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Filters an interaction with `request` and `response`, None to drop it.
+        `redacted` : the body was already redacted by a `redactor` as it was received.
+        """
+
+        if not self.enabled:
+            return cassette_entry
+
+        request = cassette_entry["request"]
+        request["headers"] = self.filter_headers(request.get("headers"))
+        request["uri"] = self.filter_uri(request.get("uri"))
+        response = cassette_entry["response"]
+        response["headers"] = self.filter_headers(response.get("headers"))
+        if not redacted:
+            response = self.redact_response(response)
+
+        response = self.filter_response(response)
+        if response is None:
+            return None
+        cassette_entry["response"] = response
+
+        return cassette_entry
+
+
+def filter_key_of(vcr_config: Dict[str, Any]) -> Hashable:
+    return (
+        tuple(rule_list_of(vcr_config.get("filter_headers"))),
+        tuple(rule_list_of(vcr_config.get("filter_query_parameters"))),
+        tuple(
+            (value, replacement)
+            for value, replacement in vcr_config.get("filter_arguments") or []
+        ),
+        tuple(hook_list_of(vcr_config.get("before_record_response"))),
+        tuple(redact_rule_list_of(vcr_config.get("redact_body"))),
+    )
+
+
+@functools.lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _compile(key: Tuple) -> RecordFilter:
+    header_tuple, query_tuple, argument_tuple, hook_tuple, redact_tuple = key
+    return RecordFilter(
+        header_list=list(header_tuple),
+        query_list=list(query_tuple),
+        argument_list=list(argument_tuple),
+        hook_list=list(hook_tuple),
+        redact_list=list(redact_tuple),
+    )
+
+
+def record_filter_of(vcr_config: Optional[Dict[str, Any]]) -> RecordFilter:
+    """The compiled filters of `vcr_config`, shared by the configurations alike."""
+
+    key = filter_key_of(vcr_config or {})
+    try:
+        return _compile(key)
+    except TypeError:
+        # Unhashable replacements : compiled for this configuration only
+        return _compile.__wrapped__(key)
+
+
+def vcr_config_of(vcr_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The keyword arguments of `vcr.VCR` : vcrpy doesn't know `redact_body`, its rules
+    run as the first `before_record_response` hook.
+    """
+
+    vcr_config = dict(vcr_config or {})
+    if "redact_body" not in vcr_config:
+        return vcr_config
+
+    record_filter = record_filter_of(vcr_config)
+    del vcr_config["redact_body"]
+    if record_filter.redacts:
+        vcr_config["before_record_response"] = [
+            record_filter.redact_response,
+            *hook_list_of(vcr_config.get("before_record_response")),
+        ]
+
+    return vcr_config
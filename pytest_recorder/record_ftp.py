@@ -9,21 +9,44 @@ Files: `tests/record/ftp/<module>/<test>_ftp.yaml` (YAML with `interactions` lis
 """
 
 # pylint: disable=protected-access,unused-argument,try-except-raise,unused-variable
+# pylint: disable=import-outside-toplevel
 # noqa: flake8: disable=F841
 
+# ftplib, urllib.request, unittest.mock and yaml are imported by `FTPCassette` so
+# loading the plugin doesn't import them for tests which don't record FTP.
+
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Sequence
 import base64
-import ftplib
+import functools
 import io
-import urllib.request
-from urllib.error import URLError
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from unittest.mock import patch
+import threading
+import weakref
 
-import yaml
 import pytest
 from _pytest.fixtures import SubRequest
+from pytest_recorder.record_cache import record_cache
+from pytest_recorder.record_dedup import record_dedup
+from pytest_recorder.record_episode import episode_counter
+from pytest_recorder.record_filter import record_filter_of
+from pytest_recorder.record_guard import is_strict, replay_guard
+from pytest_recorder.record_io import record_writer
+from pytest_recorder.record_latency import (
+    TIMING_KEY,
+    ReplayLatency,
+    Timer,
+    is_timed,
+    latency_factor_of,
+)
+from pytest_recorder.record_match import CaptureList, RequestIndex
+from pytest_recorder.record_module import (
+    check_module_recording,
+    module_record,
+    record_name_of,
+    record_scope_of,
+)
+from pytest_recorder.record_stats import RecordPhase, record_stats
+from pytest_recorder.record_throttle import host_of, record_throttle
 from pytest_recorder.record_type import RecordType
 
 
@@ -56,9 +79,15 @@ class RecordFilePathBuilder:
 
 
 class _FakeResponse:
-    def __init__(self, data: bytes, url: Optional[str] = None):
+    def __init__(
+        self,
+        data: bytes,
+        url: Optional[str] = None,
+        timing: Optional[Dict[str, float]] = None,
+    ):
         self._buf = io.BytesIO(data)
         self._url = url
+        self.timing = timing
 
     def read(self, amt: int = -1) -> bytes:
         return self._buf.read(amt)
@@ -76,19 +105,72 @@ class _FakeResponse:
             pass
 
 
+class EpisodeIndex(RequestIndex):
+    """Episodes of an ftp cassette, keyed by their url, or their command and arguments."""
+
+    MATCH_ON = ("url", "command", "args")
+
+    def __init__(self, episode_list: Sequence[Dict[str, Any]]) -> None:
+        super().__init__(episode_list, match_on_list=[self.MATCH_ON])
+
+    @staticmethod
+    def request_of(interaction: Dict[str, Any]) -> Dict[str, Any]:
+        return interaction
+
+    @staticmethod
+    def key_of(request: Dict[str, Any], match_on: Sequence[str]) -> tuple:
+        # The arguments are a tuple when recorded, a list once loaded
+        return tuple(
+            tuple(request.get(name) or ()) if name == "args" else request.get(name)
+            for name in match_on
+        )
+
+
 class FTPCassette:
+    # Commands changing the state of the session, sent again when a connection
+    # opens after they were replayed from the episodes
+    SESSION_COMMAND_SET = {"login", "cwd"}
+
     def __init__(
         self,
         cassette_path: Path,
         record_mode: str = "once",
         vcr_config: Optional[Dict[str, Any]] = None,
+        module_interactions: Optional[list[Dict[str, Any]]] = None,
+        strict: bool = False,
+        timed: bool = False,
+        latency: Optional[ReplayLatency] = None,
     ):
         self.cassette_path = Path(cassette_path)
         self.record_mode = record_mode
         self.vcr_config = vcr_config or {}
+        self.record_filter = record_filter_of(self.vcr_config)
         self.interactions: list[Dict[str, Any]] = []
+        # Interactions recorded or replayed from the episodes, listed in the order
+        # their commands were sent, whatever the thread completing them first
+        self._capture_list = CaptureList()
+        # Interactions shared by the tests of the module, replayed instead of the
+        # cassette's and extended with the new interactions instead of being saved
+        self.module_interactions = module_interactions
+        # Unmatched urls raise instead of replaying the next interaction
+        self.strict = strict
+        # Timing recorded with the interactions, reproduced when replaying them
+        self.timed = timed
+        self.latency = latency or ReplayLatency()
         self._replay_index = 0
+        # Interactions of the existing cassette, replayed in "new_episodes" mode
+        self._episode_index: Optional[EpisodeIndex] = None
+        # Connections to open on their first command missing from the episodes,
+        # with the session commands replayed until then
+        self._pending_session_map: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )
+        # Guards the replay position, ftplib connections may be used from several
+        # threads
+        self._lock = threading.RLock()
         self._patcher = None
+        import urllib.request
+
         # keep references to original callables to allow wrapping/restoring
         self._orig_urlopen = urllib.request.urlopen
         self._originals: Dict[str, Any] = {}
@@ -111,6 +193,9 @@ class FTPCassette:
     def _apply_vcr_filters(
         self, cassette_entry: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
+        if not self.record_filter.enabled:
+            return cassette_entry
+
         # Build wrapper structure used by other recorders to make filters consistent
         request_uri = cassette_entry.get("url") or cassette_entry.get(
             "request", {}
@@ -135,64 +220,21 @@ class FTPCassette:
             "response": {"body": response_body, "headers": dict(response_headers)},
         }
 
-        # filter headers
-        if "filter_headers" in self.vcr_config:
-            for header_name, replacement in self.vcr_config["filter_headers"]:
-                # request headers
-                if header_name in wrapper["request"]["headers"]:
-                    if replacement is None:
-                        del wrapper["request"]["headers"][header_name]
-                    else:
-                        wrapper["request"]["headers"][header_name] = replacement
-
-                # response headers
-                if header_name in wrapper["response"]["headers"]:
-                    if replacement is None:
-                        del wrapper["response"]["headers"][header_name]
-                    else:
-                        wrapper["response"]["headers"][header_name] = replacement
-
-        # Filter query parameters on the request URI
-        if "filter_query_parameters" in self.vcr_config and wrapper["request"]["uri"]:
-            parsed_url = (
-                urlparse(wrapper["request"]["uri"])
-                if wrapper["request"]["uri"]
-                else None
-            )
-            if parsed_url:
-                query_params = parse_qs(parsed_url.query)
-                for param_name, replacement in self.vcr_config[
-                    "filter_query_parameters"
-                ]:
-                    if param_name in query_params:
-                        query_params[param_name] = [replacement]
-                new_query = urlencode(query_params, doseq=True)
-                new_parsed = parsed_url._replace(query=new_query)
-                wrapper["request"]["uri"] = urlunparse(new_parsed)
-
-        # Handle before_record_response functions
-        if "before_record_response" in self.vcr_config:
-            for filter_func in self.vcr_config["before_record_response"]:
-                try:
-                    filtered_response = filter_func(wrapper["response"])
-                except Exception:
-                    # Skip filters that raise
-                    continue
-
-                # None means drop this interaction
-                if filtered_response is None:
-                    return None
-
-                # If filter returns a dict, replace the response
-                if isinstance(filtered_response, dict):
-                    # ensure structure
-                    wrapper["response"] = filtered_response
-                    continue
+        wrapper["request"]["headers"] = self.record_filter.filter_headers(
+            wrapper["request"]["headers"]
+        )
+        wrapper["response"]["headers"] = self.record_filter.filter_headers(
+            wrapper["response"]["headers"]
+        )
+        wrapper["request"]["uri"] = self.record_filter.filter_uri(
+            wrapper["request"]["uri"]
+        )
 
-                # If it returned a string, treat it as new body text
-                if isinstance(filtered_response, str):
-                    wrapper["response"]["body"]["encoding"] = "utf-8"
-                    wrapper["response"]["body"]["string"] = filtered_response
+        # None means drop this interaction
+        response = self.record_filter.filter_response(wrapper["response"])
+        if response is None:
+            return None
+        wrapper["response"] = response
 
         # Map wrapper back to cassette_entry
         out = dict(cassette_entry)  # copy
@@ -219,44 +261,33 @@ class FTPCassette:
     def _filter_ftplib_interaction(
         self, interaction: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
+        if not self.record_filter.enabled:
+            return interaction
+
         interaction = interaction.copy()
 
         # Filter arguments and other string values
-        if "filter_arguments" in self.vcr_config:
-            filters = self.vcr_config["filter_arguments"]
-
-            # Filter args
-            if "args" in interaction:
-                args = list(interaction["args"])
-                for value, replacement in filters:
-                    for i, arg in enumerate(args):
-                        if isinstance(arg, str):
-                            args[i] = arg.replace(value, replacement)
-                interaction["args"] = tuple(args)
-
-            # Filter host
-            if "host" in interaction and isinstance(interaction["host"], str):
-                host = interaction["host"]
-                for value, replacement in filters:
-                    host = host.replace(value, replacement)
-                interaction["host"] = host
+        if "args" in interaction:
+            interaction["args"] = tuple(self._filter_arguments(interaction["args"]))
+        if "host" in interaction:
+            interaction["host"] = self.record_filter.filter_argument(
+                interaction["host"]
+            )
 
         # Handle before_record_response
-        if "before_record_response" in self.vcr_config:
-            response_dict = {
-                "body": {
-                    "string": interaction.get("body"),
-                    "encoding": interaction.get("encoding"),
-                },
-                "status": {"message": interaction.get("response")},
-                "headers": {},  # No headers in FTP
-            }
-
-            for filter_func in self.vcr_config["before_record_response"]:
-                filtered_response = filter_func(response_dict)
-                if filtered_response is None:
-                    return None  # Drop the interaction
-                response_dict = filtered_response
+        if self.record_filter.filters_responses:
+            response_dict = self.record_filter.filter_response(
+                {
+                    "body": {
+                        "string": interaction.get("body"),
+                        "encoding": interaction.get("encoding"),
+                    },
+                    "status": {"message": interaction.get("response")},
+                    "headers": {},  # No headers in FTP
+                }
+            )
+            if response_dict is None:
+                return None  # Drop the interaction
 
             # Map back
             if "body" in response_dict:
@@ -280,30 +311,139 @@ class FTPCassette:
 
         return interaction
 
+    def load_interactions(self) -> Sequence[Dict[str, Any]]:
+        import yaml
+
+        with record_stats.measure(RecordType.ftp.name, RecordPhase.load):
+            data = (
+                record_cache.load(
+                    record_file_path=self.cassette_path, parse=yaml.safe_load
+                )
+                or {}
+            )
+        return record_dedup.expand(data.get("interactions", []))
+
+    def save(self, interactions: list[Dict[str, Any]]) -> None:
+        """Writes the interactions to the cassette, removes the cassette without any."""
+        import yaml
+
+        if interactions:
+            with record_stats.measure(RecordType.ftp.name, RecordPhase.serialize):
+                data = yaml.safe_dump(
+                    {"interactions": record_dedup.collapse(interactions)}
+                )
+            with record_stats.measure(RecordType.ftp.name, RecordPhase.persist):
+                record_writer.write(record_file_path=self.cassette_path, data=data)
+        else:
+            record_writer.remove(record_file_path=self.cassette_path)
+
     def _should_record(self) -> bool:
         if self.record_mode == "none":
             return False
         if self.record_mode == "once":
             return not self.cassette_path.exists()
-        if self.record_mode == "all":
+        if self.record_mode in ("all", "new_episodes"):
             return True
         return False
 
+    def _locked(self, function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self._lock:
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def _find_episode(
+        self,
+        url: Optional[str] = None,
+        command: Optional[str] = None,
+        args: Optional[Sequence[Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Records and returns the first unused episode of the url, or of the command."""
+        if self._episode_index is None:
+            return None
+
+        episode = self._episode_index.find(
+            {"url": url, "command": command, "args": args}
+        )
+        if episode is not None:
+            self._capture_list.add(self._capture_list.reserve(), episode)
+            episode_counter.add(recorder=RecordType.ftp.name, replayed=True)
+        return episode
+
+    @staticmethod
+    def _episode_response(episode: Dict[str, Any], default: str) -> Any:
+        import ftplib
+
+        if "error" in episode:
+            raise ftplib.error_perm(episode["error"])
+        return episode.get("response") or default
+
+    def _follow_session(self, ftp, method_name: str, args: tuple) -> None:
+        """
+        Sends a session command replayed from the episodes on the open connection,
+        or keeps it to be sent once the connection opens.
+        """
+        if method_name not in self.SESSION_COMMAND_SET:
+            return
+
+        with self._lock:
+            session_list = self._pending_session_map.get(ftp)
+            if session_list is not None:
+                session_list.append((method_name, args))
+                return
+        if ftp.sock is not None:
+            self._originals[method_name](ftp, *args)
+
+    def _open_connection(self, ftp) -> None:
+        """Opens a connection deferred while its commands were in the episodes."""
+        with self._lock:
+            session_list = self._pending_session_map.pop(ftp, None)
+        if session_list is None:
+            return
+
+        self._originals["connect"](ftp)
+        for method_name, args in session_list:
+            self._originals[method_name](ftp, *args)
+
+    def _add_timing(self, entry: Dict[str, Any], timer: Timer) -> Dict[str, Any]:
+        if self.timed:
+            entry[TIMING_KEY] = timer.timing()
+        return entry
+
+    def _filter_arguments(self, args) -> list:
+        return [self.record_filter.filter_argument(arg) for arg in args]
+
     # urllib interception
     def _recording_urlopen(self, orig, url, *a, **k):
         """Wrapper around urllib.request.urlopen to record FTP GETs."""
+        from urllib.error import URLError
+
+        episode = self._find_episode(url=str(url))
+        if episode is not None:
+            return _FakeResponse(self._deserialize_body(episode), url=str(url))
+
+        sequence = self._capture_list.reserve()
+        timer = Timer()
+
+        def send():
+            timer.restart()
+            return orig(url, *a, **k)
+
         try:
-            resp = orig(url, *a, **k)
+            resp = record_throttle.send(url, send, error_types=(URLError,))
         except URLError as e:
             # When recording and the remote FTP host is unreachable, skip the test
             pytest.skip(f"Skipping FTP recording due to network error: {e}")
+        timer.mark_first_byte()
         data = resp.read()
-        entry = {"url": str(url)}
-        entry.update(self._serialize_body(data))
+        entry = self._add_timing({"url": str(url)}, timer)
+        entry.update(self._serialize_body(self.record_filter.redact_body(data)))
         entry_filtered = self._apply_vcr_filters(entry)
         if entry_filtered is None:
             return _FakeResponse(data, url=str(url))
-        self.interactions.append(entry_filtered)
+        self._capture_list.add(sequence, entry_filtered)
         return _FakeResponse(self._deserialize_body(entry_filtered), url=str(url))
 
     def _replay_urlopen(self, url, *a, **k):
@@ -311,18 +451,34 @@ class FTPCassette:
             if self.interactions[i].get("url") == str(url):
                 entry = self.interactions[i]
                 self._replay_index = i + 1
-                return _FakeResponse(self._deserialize_body(entry), url=str(url))
-        if self._replay_index < len(self.interactions):
+                return _FakeResponse(
+                    self._deserialize_body(entry),
+                    url=str(url),
+                    timing=entry.get(TIMING_KEY),
+                )
+        if not self.strict and self._replay_index < len(self.interactions):
             entry = self.interactions[self._replay_index]
             self._replay_index += 1
-            return _FakeResponse(self._deserialize_body(entry), url=entry.get("url"))
+            return _FakeResponse(
+                self._deserialize_body(entry),
+                url=entry.get("url"),
+                timing=entry.get(TIMING_KEY),
+            )
         raise AttributeError(f"No recorded FTP interaction for URL: {url}")
 
     # ftplib interception: retrbinary / retrlines
     def __enter__(self):
         """Install the FTP and urllib interceptors."""
+        import ftplib
+        from unittest.mock import patch
+
         # patch urllib
         if self._should_record():
+            if self.module_interactions is not None:
+                self._episode_index = EpisodeIndex(self.module_interactions)
+            elif self.record_mode == "new_episodes" and self.cassette_path.exists():
+                self._episode_index = EpisodeIndex(self.load_interactions())
+
             self._patcher = patch(
                 "urllib.request.urlopen",
                 lambda url, *a, **k: self._recording_urlopen(
@@ -338,36 +494,52 @@ class FTPCassette:
             cassette = self
 
             def retrbinary_recorder(self, cmd, callback, blocksize=8192, rest=None):
+                episode = cassette._find_episode(
+                    command="retrbinary", args=cassette._filter_arguments((cmd,))
+                )
+                if episode is not None:
+                    response = cassette._episode_response(
+                        episode, default="226 Transfer complete."
+                    )
+                    data = cassette._deserialize_body(episode)
+                    for i in range(0, len(data), blocksize):
+                        callback(data[i : i + blocksize])
+                    return response
+
+                # The blocks go to the callback as they arrive, and are kept redacted
+                # for the cassette. A retried transfer starts over : the callback
+                # only gets the bytes past the ones of the failed attempts.
+                sequence = cassette._capture_list.reserve()
+                timer = Timer()
                 buf = bytearray()
-
-                def capture(chunk):
-                    buf.extend(chunk)
-                    try:
-                        callback(chunk)
-                    except Exception:
-                        pass
-
-                try:
-                    res = cassette._originals["retrbinary"](
+                redactor = None
+                received = delivered = 0
+
+                def capture(block):
+                    nonlocal received, delivered
+                    timer.mark_first_byte()
+                    buf.extend(block if redactor is None else redactor.feed(block))
+                    start, received = received, received + len(block)
+                    if received > delivered:
+                        callback(
+                            block if start >= delivered else block[delivered - start :]
+                        )
+                        delivered = received
+
+                def send():
+                    nonlocal redactor, received
+                    buf.clear()
+                    redactor = cassette.record_filter.redactor()
+                    received = 0
+                    timer.restart()
+                    return cassette._originals["retrbinary"](
                         self, cmd, capture, blocksize, rest
                     )
-                except ftplib.error_perm as e:
-                    # Permanent error, record it and re-raise
-                    host = (
-                        getattr(self, "host", None) or getattr(self, "sock", None) or ""
-                    )
-                    entry = {
-                        "command": "retrbinary",
-                        "args": (cmd,),
-                        "error": str(e),
-                        "host": host,
-                    }
-                    cassette.interactions.append(entry)
-                    raise
+
                 host = getattr(self, "host", None) or getattr(self, "sock", None) or ""
                 try:
-                    res = cassette._originals["retrbinary"](
-                        self, cmd, capture, blocksize, rest
+                    res = record_throttle.send(
+                        f"ftp://{host}", send, error_types=(ftplib.error_temp,)
                     )
                 except ftplib.error_perm as e:
                     # Permanent error, record it and re-raise
@@ -377,7 +549,9 @@ class FTPCassette:
                         "error": str(e),
                         "host": host,
                     }
-                    cassette.interactions.append(entry)
+                    cassette._capture_list.add(
+                        sequence, cassette._add_timing(entry, timer)
+                    )
                     raise
                 except ftplib.all_errors:
                     # Let other errors fail the test loudly
@@ -389,40 +563,55 @@ class FTPCassette:
                     "response": res,
                     "host": host,
                 }
+                cassette._add_timing(entry, timer)
+                if redactor is not None:
+                    buf.extend(redactor.finish())
                 entry.update(cassette._serialize_body(bytes(buf)))
                 filtered_entry = cassette._filter_ftplib_interaction(entry)
                 if filtered_entry:
-                    cassette.interactions.append(filtered_entry)
+                    cassette._capture_list.add(sequence, filtered_entry)
                 return res
 
             def retrlines_recorder(self, cmd, callback=None):
+                episode = cassette._find_episode(
+                    command="retrlines", args=cassette._filter_arguments((cmd,))
+                )
+                if episode is not None:
+                    response = cassette._episode_response(
+                        episode, default="226 Transfer complete."
+                    )
+                    data = cassette._deserialize_body(episode).decode("utf-8")
+                    for line in data.splitlines():
+                        if callback:
+                            callback(line)
+                    return response
+
+                # Passed to the callback as they arrive, past the lines of the failed
+                # attempts of a retried transfer, as the blocks of retrbinary
+                sequence = cassette._capture_list.reserve()
                 lines: list[str] = []
+                timer = Timer()
+                delivered = 0
 
                 def capture(line):
+                    nonlocal delivered
+                    timer.mark_first_byte()
                     lines.append(line)
-                    if callback:
-                        try:
+                    if len(lines) > delivered:
+                        delivered = len(lines)
+                        if callback:
                             callback(line)
-                        except Exception:
-                            pass
 
-                try:
-                    res = cassette._originals["retrlines"](self, cmd, capture)
-                except ftplib.error_perm as e:
-                    host = (
-                        getattr(self, "host", None) or getattr(self, "sock", None) or ""
-                    )
-                    entry = {
-                        "command": "retrlines",
-                        "args": (cmd,),
-                        "error": str(e),
-                        "host": host,
-                    }
-                    cassette.interactions.append(entry)
-                    raise
+                def send():
+                    lines.clear()
+                    timer.restart()
+                    return cassette._originals["retrlines"](self, cmd, capture)
+
                 host = getattr(self, "host", None) or getattr(self, "sock", None) or ""
                 try:
-                    res = cassette._originals["retrlines"](self, cmd, capture)
+                    res = record_throttle.send(
+                        f"ftp://{host}", send, error_types=(ftplib.error_temp,)
+                    )
                 except ftplib.error_perm as e:
                     entry = {
                         "command": "retrlines",
@@ -430,7 +619,9 @@ class FTPCassette:
                         "error": str(e),
                         "host": host,
                     }
-                    cassette.interactions.append(entry)
+                    cassette._capture_list.add(
+                        sequence, cassette._add_timing(entry, timer)
+                    )
                     raise
                 except ftplib.all_errors:
                     raise
@@ -442,10 +633,15 @@ class FTPCassette:
                     "response": res,
                     "host": host,
                 }
-                entry.update(cassette._serialize_body(body.encode("utf-8")))
+                cassette._add_timing(entry, timer)
+                entry.update(
+                    cassette._serialize_body(
+                        cassette.record_filter.redact_body(body.encode("utf-8"))
+                    )
+                )
                 filtered_entry = cassette._filter_ftplib_interaction(entry)
                 if filtered_entry:
-                    cassette.interactions.append(filtered_entry)
+                    cassette._capture_list.add(sequence, filtered_entry)
                 return res
 
             ftplib.FTP.retrbinary = retrbinary_recorder
@@ -476,6 +672,21 @@ class FTPCassette:
                 if method_name == "login" and len(args) > 0:
                     display_args = ("[REDACTED]",) * len(args)
 
+                episode = cassette._find_episode(
+                    command=method_name,
+                    args=cassette._filter_arguments(display_args),
+                )
+                if episode is not None:
+                    response = cassette._episode_response(
+                        episode, default="250 Command successful."
+                    )
+                    cassette._follow_session(self, method_name, args)
+                    return response
+
+                # Commands change the state of the session : rate limited, not retried
+                record_throttle.acquire(host_of(f"ftp://{host}"))
+                sequence = cassette._capture_list.reserve()
+                timer = Timer()
                 try:
                     res = cassette._originals[method_name](self, *args)
                 except ftplib.error_perm as e:
@@ -485,7 +696,9 @@ class FTPCassette:
                         "error": str(e),
                         "host": host,
                     }
-                    cassette.interactions.append(entry)
+                    cassette._capture_list.add(
+                        sequence, cassette._add_timing(entry, timer)
+                    )
                     raise
                 except ftplib.all_errors:
                     raise
@@ -496,17 +709,29 @@ class FTPCassette:
                     "response": res,
                     "host": host,
                 }
+                cassette._add_timing(entry, timer)
                 filtered_entry = cassette._filter_ftplib_interaction(entry)
                 if filtered_entry:
-                    cassette.interactions.append(filtered_entry)
+                    cassette._capture_list.add(sequence, filtered_entry)
                 return res
 
             def storbinary_recorder(self, cmd, fp, *args, **kwargs):
+                episode = cassette._find_episode(
+                    command="storbinary", args=cassette._filter_arguments((cmd,) + args)
+                )
+                if episode is not None:
+                    return cassette._episode_response(
+                        episode, default="226 Transfer complete."
+                    )
+
                 file_content = fp.read()
                 # We need to put the content back for the real call
                 new_fp = io.BytesIO(file_content)
                 host = getattr(self, "host", None) or getattr(self, "sock", None) or ""
 
+                record_throttle.acquire(host_of(f"ftp://{host}"))
+                sequence = cassette._capture_list.reserve()
+                timer = Timer()
                 try:
                     res = cassette._originals["storbinary"](
                         self, cmd, new_fp, *args, **kwargs
@@ -518,7 +743,9 @@ class FTPCassette:
                         "error": str(e),
                         "host": host,
                     }
-                    cassette.interactions.append(entry)
+                    cassette._capture_list.add(
+                        sequence, cassette._add_timing(entry, timer)
+                    )
                     raise
                 except ftplib.all_errors:
                     raise
@@ -529,17 +756,33 @@ class FTPCassette:
                     "response": res,
                     "host": host,
                 }
-                entry.update(cassette._serialize_body(file_content))
+                cassette._add_timing(entry, timer)
+                entry.update(
+                    cassette._serialize_body(
+                        cassette.record_filter.redact_body(file_content)
+                    )
+                )
                 filtered_entry = cassette._filter_ftplib_interaction(entry)
                 if filtered_entry:
-                    cassette.interactions.append(filtered_entry)
+                    cassette._capture_list.add(sequence, filtered_entry)
                 return res
 
             def storlines_recorder(self, cmd, fp, *args, **kwargs):
+                episode = cassette._find_episode(
+                    command="storlines", args=cassette._filter_arguments((cmd,) + args)
+                )
+                if episode is not None:
+                    return cassette._episode_response(
+                        episode, default="226 Transfer complete."
+                    )
+
                 file_content_str = fp.read()
                 new_fp = io.StringIO(file_content_str)
                 host = getattr(self, "host", None) or getattr(self, "sock", None) or ""
 
+                record_throttle.acquire(host_of(f"ftp://{host}"))
+                sequence = cassette._capture_list.reserve()
+                timer = Timer()
                 try:
                     res = cassette._originals["storlines"](
                         self, cmd, new_fp, *args, **kwargs
@@ -551,7 +794,9 @@ class FTPCassette:
                         "error": str(e),
                         "host": host,
                     }
-                    cassette.interactions.append(entry)
+                    cassette._capture_list.add(
+                        sequence, cassette._add_timing(entry, timer)
+                    )
                     raise
                 except ftplib.all_errors:
                     raise
@@ -562,10 +807,17 @@ class FTPCassette:
                     "response": res,
                     "host": host,
                 }
-                entry.update(cassette._serialize_body(file_content_str.encode("utf-8")))
+                cassette._add_timing(entry, timer)
+                entry.update(
+                    cassette._serialize_body(
+                        cassette.record_filter.redact_body(
+                            file_content_str.encode("utf-8")
+                        )
+                    )
+                )
                 filtered_entry = cassette._filter_ftplib_interaction(entry)
                 if filtered_entry:
-                    cassette.interactions.append(filtered_entry)
+                    cassette._capture_list.add(sequence, filtered_entry)
                 return res
 
             ftplib.FTP.storbinary = storbinary_recorder
@@ -588,17 +840,55 @@ class FTPCassette:
                 "quit",
             ]:
                 setattr(ftplib.FTP, name, make_command_recorder(name))
+
+            def connect_recorder(
+                self, host="", port=0, timeout=-999, source_address=None
+            ):
+                # Opened by the first command missing from the episodes, if any
+                if host:
+                    self.host = host
+                if port > 0:
+                    self.port = port
+                if timeout != -999:
+                    self.timeout = timeout
+                if source_address is not None:
+                    self.source_address = source_address
+                with cassette._lock:
+                    cassette._pending_session_map[self] = []
+                self.welcome = "220 Service ready."
+                return self.welcome
+
+            def putline_recorder(self, line):
+                # Every command sent to the server goes through putline
+                cassette._open_connection(self)
+                return cassette._originals["putline"](self, line)
+
+            if self._episode_index is not None:
+                self._originals["connect"] = ftplib.FTP.connect
+                self._originals["putline"] = ftplib.FTP.putline
+                ftplib.FTP.connect = connect_recorder
+                ftplib.FTP.putline = putline_recorder
         else:
             # replay mode
-            if not self.cassette_path.exists():
+            if self.module_interactions is not None:
+                self.interactions = self.module_interactions
+            elif not self.cassette_path.exists():
                 raise AttributeError(f"No ftp cassette to replay: {self.cassette_path}")
-            with self.cassette_path.open("r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
-            self.interactions = data.get("interactions", [])
-            self._patcher = patch(
-                "urllib.request.urlopen",
-                lambda url, *a, **k: self._replay_urlopen(url, *a, **k),
+            else:
+                self.interactions = self.load_interactions()
+            replay_urlopen = record_stats.wrap(
+                RecordType.ftp.name,
+                RecordPhase.match,
+                self._locked(self._replay_urlopen),
             )
+
+            def delayed_urlopen(url, *a, **k):
+                # Outside of the lock, the threads wait for their responses together
+                response = replay_urlopen(url, *a, **k)
+                self.latency.wait(response.timing)
+                return response
+
+            self._patcher = patch("urllib.request.urlopen", delayed_urlopen)
             self._patcher.start()
 
             cassette = self
@@ -613,12 +903,9 @@ class FTPCassette:
                             return interaction
                     return None
 
-                search_args = list(args) if args is not None else None
-                if search_args and "filter_arguments" in cassette.vcr_config:
-                    for value, replacement in cassette.vcr_config["filter_arguments"]:
-                        for i, arg in enumerate(search_args):
-                            if isinstance(arg, str):
-                                search_args[i] = arg.replace(value, replacement)
+                search_args = (
+                    cassette._filter_arguments(args) if args is not None else None
+                )
 
                 for i in range(cassette._replay_index, len(cassette.interactions)):
                     interaction = cassette.interactions[i]
@@ -638,18 +925,29 @@ class FTPCassette:
                     return interaction
                 return None
 
+            find_interaction = record_stats.wrap(
+                RecordType.ftp.name, RecordPhase.match, self._locked(find_interaction)
+            )
+
             def retrbinary_replayer(self, cmd, callback, blocksize=8192, rest=None):
                 interaction = find_interaction(command="retrbinary", args=(cmd,))
                 if interaction is None:
                     raise AttributeError(
                         f"No recorded FTP interaction for retrbinary with cmd: {cmd}"
                     )
+                timing = interaction.get(TIMING_KEY)
                 if "error" in interaction:
+                    cassette.latency.wait(timing)
                     raise ftplib.error_perm(interaction["error"])
 
                 data = cassette._deserialize_body(interaction)
-                for i in range(0, len(data), blocksize):
-                    callback(data[i : i + blocksize])
+                cassette.latency.wait_first_byte(timing)
+                for chunk in cassette.latency.pace(
+                    (data[i : i + blocksize] for i in range(0, len(data), blocksize)),
+                    timing=timing,
+                    size=len(data),
+                ):
+                    callback(chunk)
                 return interaction.get("response") or "226 Transfer complete."
 
             def retrlines_replayer(self, cmd, callback=None):
@@ -658,17 +956,33 @@ class FTPCassette:
                     raise AttributeError(
                         f"No recorded FTP interaction for retrlines with cmd: {cmd}"
                     )
+                timing = interaction.get(TIMING_KEY)
                 if "error" in interaction:
+                    cassette.latency.wait(timing)
                     raise ftplib.error_perm(interaction["error"])
 
                 data = cassette._deserialize_body(interaction).decode("utf-8")
                 lines = data.splitlines()
-                for line in lines:
+                cassette.latency.wait_first_byte(timing)
+                for line in cassette.latency.pace(lines, timing=timing, size=len(data)):
                     if callback:
                         callback(line)
                 return interaction.get("response") or "226 Transfer complete."
 
+            def connect_replayer(
+                self, host="", port=0, timeout=-999, source_address=None
+            ):
+                # Nothing to connect to in replay, the commands are replayed
+                if host:
+                    self.host = host
+                if port > 0:
+                    self.port = port
+                self.welcome = "220 Service ready."
+                return self.welcome
+
             # install replay wrappers
+            self._originals["connect"] = ftplib.FTP.connect
+            ftplib.FTP.connect = connect_replayer
             self._originals["retrbinary"] = ftplib.FTP.retrbinary
             self._originals["retrlines"] = ftplib.FTP.retrlines
             ftplib.FTP.retrbinary = retrbinary_replayer
@@ -696,6 +1010,7 @@ class FTPCassette:
                     raise AttributeError(
                         f"No recorded FTP interaction for {method_name} with args {args}"
                     )
+                cassette.latency.wait(interaction.get(TIMING_KEY))
                 if "error" in interaction:
                     raise ftplib.error_perm(interaction["error"])
                 response = interaction.get("response")
@@ -712,6 +1027,7 @@ class FTPCassette:
                     raise AttributeError(
                         f"No recorded FTP interaction for storbinary with cmd: {cmd}"
                     )
+                cassette.latency.wait(interaction.get(TIMING_KEY))
                 if "error" in interaction:
                     raise ftplib.error_perm(interaction["error"])
                 return interaction.get("response") or "226 Transfer complete."
@@ -722,6 +1038,7 @@ class FTPCassette:
                     raise AttributeError(
                         f"No recorded FTP interaction for storlines with cmd: {cmd}"
                     )
+                cassette.latency.wait(interaction.get(TIMING_KEY))
                 if "error" in interaction:
                     raise ftplib.error_perm(interaction["error"])
                 return interaction.get("response") or "226 Transfer complete."
@@ -750,6 +1067,8 @@ class FTPCassette:
         return self
 
     def __exit__(self, exc_type, exc, tb):
+        import ftplib
+
         if self._patcher:
             try:
                 self._patcher.stop()
@@ -764,25 +1083,44 @@ class FTPCassette:
                 pass
 
         # persist if recorded
-        if self._should_record() and self.interactions:
-            self.cassette_path.parent.mkdir(parents=True, exist_ok=True)
-            with self.cassette_path.open("w", encoding="utf-8", newline="\n") as f:
-                yaml.safe_dump({"interactions": self.interactions}, f)
+        if self._should_record():
+            self.interactions = self._capture_list.entry_list()
+            if self.record_mode == "new_episodes":
+                episode_counter.add(
+                    recorder=RecordType.ftp.name,
+                    replayed=False,
+                    count=len(self.interactions)
+                    - (self._episode_index.used_count if self._episode_index else 0),
+                )
+            if self.module_interactions is not None:
+                episode_id_set = {id(entry) for entry in self.module_interactions}
+                self.module_interactions.extend(
+                    [
+                        entry
+                        for entry in self.interactions
+                        if id(entry) not in episode_id_set
+                    ]
+                )
+            else:
+                self.save(self.interactions)
 
 
 def record_ftp_context_manager(request: SubRequest):
     marker = request.node.get_closest_marker("record_ftp")
 
     if marker:
+        record_new_episodes = request.config.getoption("--record-new-episodes")
         record_no_overwrite = request.config.getoption("--record-no-overwrite")
         record_type = request.config.getoption("--record")
-        test_function = request.node.name
+        record_scope = record_scope_of(marker=marker)
+        test_function = record_name_of(request=request, scope=record_scope)
         test_module_path = Path(request.node.fspath)
 
-        record_file_path = RecordFilePathBuilder.build(
-            test_module_path=test_module_path,
-            test_function=test_function,
-        )
+        with record_stats.measure(RecordType.ftp.name, RecordPhase.path):
+            record_file_path = RecordFilePathBuilder.build(
+                test_module_path=test_module_path,
+                test_function=test_function,
+            )
 
         vcr_config = {}
         if "vcr_config" in request.fixturenames:
@@ -791,21 +1129,71 @@ def record_ftp_context_manager(request: SubRequest):
         if (RecordType.all in record_type or RecordType.ftp in record_type) and not (
             record_file_path.exists() and record_no_overwrite
         ):
-            if record_file_path.exists():
-                record_file_path.unlink(missing_ok=True)
+            check_module_recording(request=request, scope=record_scope)
+            record_mode = (
+                "new_episodes"
+                if record_new_episodes and record_file_path.exists()
+                else "all"
+            )
+            module_interactions = None
+            if record_scope == "module":
+                module_cassette = FTPCassette(
+                    cassette_path=record_file_path, record_mode=record_mode
+                )
+                module_interactions = module_record(
+                    request=request,
+                    recorder=RecordType.ftp.name,
+                    record_file_path=record_file_path,
+                    load=lambda: (
+                        list(module_cassette.load_interactions())
+                        if record_mode == "new_episodes"
+                        else []
+                    ),
+                    save=lambda interactions: module_cassette.save(interactions),
+                )
+                # The interactions of the previous tests of the module are replayed
+                record_mode = "new_episodes"
+
             with FTPCassette(
                 cassette_path=record_file_path,
-                record_mode="once",
+                record_mode=record_mode,
                 vcr_config=vcr_config,
+                module_interactions=module_interactions,
+                timed=is_timed(request=request),
             ) as cassette:
                 yield cassette
         elif record_file_path.exists():
+            module_interactions = None
+            if record_scope == "module":
+                module_cassette = FTPCassette(
+                    cassette_path=record_file_path, record_mode="none"
+                )
+                module_interactions = module_record(
+                    request=request,
+                    recorder=RecordType.ftp.name,
+                    record_file_path=record_file_path,
+                    load=lambda: list(module_cassette.load_interactions()),
+                    save=lambda interactions: None,
+                )
+
             with FTPCassette(
                 cassette_path=record_file_path,
                 record_mode="none",
                 vcr_config=vcr_config,
+                module_interactions=module_interactions,
+                strict=is_strict(request=request, marker=marker),
+                latency=ReplayLatency(
+                    factor=latency_factor_of(request=request, marker=marker)
+                ),
             ) as cassette:
-                yield cassette
+                with replay_guard(
+                    request=request,
+                    marker=marker,
+                    recorder=RecordType.ftp.name,
+                    record_file_path=record_file_path,
+                    vcr_config=vcr_config,
+                ):
+                    yield cassette
         else:
             raise AttributeError(
                 f"No comparison possible since there is no ftp cassette : {record_file_path}"
@@ -814,6 +1202,4 @@ def record_ftp_context_manager(request: SubRequest):
         yield None
 
 
-record_ftp_fixture = pytest.fixture(name="record_ftp", autouse=True)(
-    record_ftp_context_manager
-)
+record_ftp_fixture = pytest.fixture(name="record_ftp")(record_ftp_context_manager)
@@ -0,0 +1,137 @@
+# IMPORT STANDARD
+import contextlib
+import socket
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Set
+from urllib.parse import urlsplit
+
+# IMPORT THIRD-PARTY
+from _pytest.fixtures import SubRequest
+from _pytest.mark import Mark
+
+# IMPORT INTERNAL
+
+LOCALHOST_SET = {"localhost", "127.0.0.1", "::1"}
+
+# Checks of the running `block_network` contexts. libcurl opens its own sockets,
+# the curl dispatchers run these checks with `check_network` instead.
+NETWORK_CHECK_LIST: List[Callable[[Any], None]] = []
+
+
+class RecordNetworkError(RuntimeError):
+    """A connection was attempted while replaying a cassette in strict mode."""
+
+
+def is_strict(request: SubRequest, marker: Mark) -> bool:
+    return marker.kwargs.get("strict", request.config.getoption("--record-strict"))
+
+
+def is_network_blocked() -> bool:
+    return bool(NETWORK_CHECK_LIST)
+
+
+def check_network(url: Any) -> None:
+    """Raises `RecordNetworkError` when a `block_network` context blocks the host of `url`."""
+
+    if isinstance(url, bytes):
+        url = url.decode("utf-8", errors="replace")
+    split = urlsplit(str(url))
+    for check in list(NETWORK_CHECK_LIST):
+        check((split.hostname or "", split.port))
+
+
+def allowed_host_set_of(vcr_config: Dict[str, Any]) -> Set[str]:
+    """Hosts vcrpy doesn't record, so they can be reached while replaying."""
+
+    host_set = set(vcr_config.get("ignore_hosts", ()))
+    if vcr_config.get("ignore_localhost"):
+        host_set |= LOCALHOST_SET
+
+    return host_set
+
+
+@contextlib.contextmanager
+def block_network(
+    recorder: str,
+    record_file_path: Path,
+    allowed_host_set: Set[str],
+) -> Iterator[None]:
+    """
+    Makes the name resolutions and connections raise `RecordNetworkError`.
+
+    A request missing from the cassette fails at once instead of waiting for the
+    network, on sandboxed runners until a socket timeout. Unix sockets and the
+    `allowed_host_set` hosts, with the addresses they resolve to, stay reachable.
+
+    The curl_cffi and pycurl calls made outside of a `record_curl` replay are
+    checked by the curl dispatchers, libcurl doesn't use the socket module.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from unittest.mock import patch
+
+    from pytest_recorder.record_curl_dispatch import install_curl_interceptors
+
+    allowed_host_set = set(allowed_host_set)
+    original_getaddrinfo = socket.getaddrinfo
+    original_connect = socket.socket.connect
+    original_connect_ex = socket.socket.connect_ex
+    unix_family = getattr(socket, "AF_UNIX", None)
+
+    def check(address: Any) -> None:
+        host = address[0] if isinstance(address, tuple) else address
+        if isinstance(host, bytes):
+            host = host.decode("idna")
+        if host and host not in allowed_host_set:
+            raise RecordNetworkError(
+                f"Network access while replaying the {recorder} cassette "
+                f"{record_file_path} : no recorded interaction for the request to "
+                f"{address!r}."
+            )
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        check((host, port))
+        address_info_list = original_getaddrinfo(host, port, *args, **kwargs)
+        allowed_host_set.update(
+            address_info[4][0] for address_info in address_info_list
+        )
+        return address_info_list
+
+    def connect(self, address):
+        if self.family != unix_family:
+            check(address)
+        return original_connect(self, address)
+
+    def connect_ex(self, address):
+        if self.family != unix_family:
+            check(address)
+        return original_connect_ex(self, address)
+
+    install_curl_interceptors()
+    NETWORK_CHECK_LIST.append(check)
+    try:
+        with patch.object(socket, "getaddrinfo", getaddrinfo), patch.object(
+            socket.socket, "connect", connect
+        ), patch.object(socket.socket, "connect_ex", connect_ex):
+            yield
+    finally:
+        NETWORK_CHECK_LIST.remove(check)
+
+
+def replay_guard(
+    request: SubRequest,
+    marker: Mark,
+    recorder: str,
+    record_file_path: Path,
+    vcr_config: Dict[str, Any],
+):
+    """`block_network` for the strict replays, a no-op context otherwise."""
+
+    if not is_strict(request=request, marker=marker):
+        return contextlib.nullcontext()
+
+    return block_network(
+        recorder=recorder,
+        record_file_path=record_file_path,
+        allowed_host_set=allowed_host_set_of(vcr_config=vcr_config),
+    )
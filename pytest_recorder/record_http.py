@@ -1,17 +1,50 @@
 # IMPORT STANDARD
-import urllib3
+import contextlib
+import importlib
+import threading
 from pathlib import Path
 from typing import Any, Dict
 
 # IMPORT THIRD-PARTY
 import pytest
-import vcr
 from _pytest.fixtures import SubRequest
-from vcr.persisters.filesystem import FilesystemPersister, serialize
 
 # IMPORT INTERNAL
+from pytest_recorder.record_episode import episode_counter
+from pytest_recorder.record_filter import vcr_config_of
+from pytest_recorder.record_guard import replay_guard
+from pytest_recorder.record_io import record_writer
+from pytest_recorder.record_latency import (
+    TIMING_KEY,
+    ReplayLatency,
+    Timer,
+    is_timed,
+    latency_factor_of,
+)
+from pytest_recorder.record_module import (
+    check_module_recording,
+    module_record,
+    record_name_of,
+    record_scope_of,
+)
+from pytest_recorder.record_stats import RecordPhase, record_stats
+from pytest_recorder.record_throttle import record_throttle
 from pytest_recorder.record_type import RecordType
 
+# vcr and urllib3 are only imported once a test is marked with `record_http`.
+LAZY_ATTRIBUTE_MAP = {
+    "VCRFilesystemPersister": "pytest_recorder.vcr_persister",
+    "VCRRecordingPersister": "pytest_recorder.vcr_persister",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in LAZY_ATTRIBUTE_MAP:
+        module = importlib.import_module(LAZY_ATTRIBUTE_MAP[name])
+        return getattr(module, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 @pytest.fixture(name="vcr_config")
 def vcr_config_fixture() -> Dict[str, Any]:
@@ -25,20 +58,186 @@ def pytest_configure(config):
     )
 
 
-class VCRFilesystemPersister(FilesystemPersister):
-    @staticmethod
-    def save_cassette(cassette_path, cassette_dict, serializer):
-        data = serialize(cassette_dict, serializer)
-        cassette_path = Path(cassette_path).resolve()
-        cassette_path.parent.mkdir(parents=True, exist_ok=True)
+def count_new_episodes(cassette) -> None:
+    """Counts the interactions a `new_episodes` cassette replays and records."""
+
+    play_response = cassette.play_response
+    append = cassette.append
+
+    def counted_play_response(*args, **kwargs):
+        response = play_response(*args, **kwargs)
+        episode_counter.add(recorder=RecordType.http.name, replayed=True)
+        return response
+
+    def counted_append(*args, **kwargs):
+        append(*args, **kwargs)
+        episode_counter.add(recorder=RecordType.http.name, replayed=False)
+
+    cassette.play_response = counted_play_response
+    cassette.append = counted_append
+
+
+def is_played(cassette, pool, method, url, body=None, headers=None) -> bool:
+    """Whether vcrpy plays the response of a urllib3 request from the cassette."""
+
+    # pylint: disable=import-outside-toplevel
+    from vcr.request import Request
+
+    if url and not url.startswith("/"):
+        # Proxy request
+        uri = url
+    else:
+        default_port = {"https": 443, "http": 80}.get(pool.scheme)
+        port = "" if pool.port in (None, default_port) else f":{pool.port}"
+        uri = f"{pool.scheme}://{pool.host}{port}{url}"
+
+    return cassette.can_play_response_for(
+        Request(method=method, uri=uri, body=body, headers=headers or pool.headers)
+    )
+
+
+@contextlib.contextmanager
+def throttle_requests(cassette):
+    """
+    Rate limits and retries the requests sent by urllib3 while recording.
+
+    The interactions vcrpy recorded for a failed attempt are removed from the
+    cassette before the request is sent again. The requests played from the
+    cassette with `--record-new-episodes` aren't sent, nor throttled.
+    """
+
+    if not record_throttle.enabled:
+        yield
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from unittest.mock import patch
+
+    from urllib3 import exceptions
+    from urllib3.connectionpool import HTTPConnectionPool
+
+    error_types = (
+        exceptions.MaxRetryError,
+        exceptions.NewConnectionError,
+        exceptions.ProtocolError,
+        exceptions.TimeoutError,
+    )
+    original_urlopen = HTTPConnectionPool.urlopen
+
+    def urlopen(pool, method, url, *args, **kwargs):
+        if is_played(
+            cassette,
+            pool,
+            method,
+            url,
+            body=kwargs.get("body", args[0] if args else None),
+            headers=kwargs.get("headers", args[1] if len(args) > 1 else None),
+        ):
+            return original_urlopen(pool, method, url, *args, **kwargs)
+
+        attempt_start = len(cassette.data)
+
+        def send():
+            nonlocal attempt_start
+            attempt_start = len(cassette.data)
+            return original_urlopen(pool, method, url, *args, **kwargs)
+
+        def discard(response):
+            response.drain_conn()
+            response.release_conn()
+            del cassette.data[attempt_start:]
+
+        return record_throttle.send(
+            f"{pool.scheme}://{pool.host}",
+            send,
+            status_of=lambda response: (response.status, response.headers),
+            error_types=error_types,
+            discard=discard,
+        )
+
+    with patch.object(HTTPConnectionPool, "urlopen", urlopen):
+        yield
+
+
+@contextlib.contextmanager
+def time_responses(cassette, timed: bool):
+    """
+    Adds the timing of the responses vcrpy records to their interaction.
+
+    vcrpy sends the request and reads the response in `VCRConnection.getresponse`,
+    the first byte is the end of the headers, read by the real connection.
+    """
+
+    if not timed:
+        yield
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from unittest.mock import patch
+
+    from vcr.stubs import VCRConnection
+
+    # Timer of the response read by the thread, appended by the same thread
+    local = threading.local()
+    original_getresponse = VCRConnection.getresponse
+    append = cassette.append
 
-        with cassette_path.open("w", encoding="utf-8", newline="\n") as f:
-            f.write(data)
+    def getresponse(self, *args, **kwargs):
+        timer = local.timer = Timer()
+        real_connection = self.real_connection
+        real_getresponse = real_connection.getresponse
+
+        def timed_getresponse(*real_args, **real_kwargs):
+            response = real_getresponse(*real_args, **real_kwargs)
+            timer.mark_first_byte()
+            return response
+
+        real_connection.getresponse = timed_getresponse
+        try:
+            return original_getresponse(self, *args, **kwargs)
+        finally:
+            del real_connection.getresponse
+            local.timer = None
+
+    def timed_append(request, response):
+        timer = getattr(local, "timer", None)
+        if timer is not None:
+            response = {**response, TIMING_KEY: timer.timing()}
+        append(request, response)
+
+    with patch.object(VCRConnection, "getresponse", getresponse), patch.object(
+        cassette, "append", timed_append
+    ):
+        yield
+
+
+@contextlib.contextmanager
+def delay_responses(cassette, latency: ReplayLatency):
+    """Replays the responses once their recorded duration, scaled, has elapsed."""
+
+    if not latency.enabled:
+        yield
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from unittest.mock import patch
+
+    play_response = cassette.play_response
+
+    def delayed_play_response(*args, **kwargs):
+        response = play_response(*args, **kwargs)
+        latency.wait(response.get(TIMING_KEY))
+        return response
+
+    with patch.object(cassette, "play_response", delayed_play_response):
+        yield
 
 
 class RecordFilePathBuilder:
     @staticmethod
     def build(test_module_path: Path, test_function: str) -> Path:
+        import urllib3  # pylint: disable=import-outside-toplevel
+
         test_module = test_module_path.stem
 
         record_folder_name = RecordType.http.name
@@ -52,6 +251,59 @@ class RecordFilePathBuilder:
         return record_file_path
 
 
+@contextlib.contextmanager
+def use_function_cassette(vcr_object, record_file_path: Path, prepare):
+    with vcr_object.use_cassette(record_file_path.name) as cassette:
+        prepare(cassette)
+        yield cassette
+
+
+@contextlib.contextmanager
+def use_module_cassette(
+    request: SubRequest, vcr_object, record_file_path: Path, prepare
+):
+    """
+    Cassette shared by the tests of the module, saved after the last of them.
+
+    Its interactions are played back as often as needed : the requests already
+    recorded by a previous test of the module are served from memory.
+    """
+
+    # pylint: disable=import-outside-toplevel
+    from vcr.cassette import Cassette
+    from vcr.patch import CassettePatcherBuilder
+    from vcr.record_mode import RecordMode
+
+    def load():
+        config = vcr_object.get_merged_config(allow_playback_repeats=True)
+        for name in ("path_transformer", "func_path_generator", "record_on_exception"):
+            config.pop(name, None)
+        if config["record_mode"] == RecordMode.ONCE:
+            config["record_mode"] = RecordMode.NEW_EPISODES
+
+        cassette = Cassette.load(path=str(record_file_path), **config)
+        cassette.rewound = True
+        prepare(cassette)
+        return cassette
+
+    def save(cassette):
+        cassette._save()  # pylint: disable=protected-access
+        if not cassette.data:
+            record_writer.remove(record_file_path=record_file_path)
+
+    cassette = module_record(
+        request=request,
+        recorder=RecordType.http.name,
+        record_file_path=record_file_path,
+        load=load,
+        save=save,
+    )
+    with contextlib.ExitStack() as exit_stack:
+        for patcher in CassettePatcherBuilder(cassette).build():
+            exit_stack.enter_context(patcher)
+        yield cassette
+
+
 def record_http_context_manager(
     request: SubRequest,
     vcr_config: Dict[str, Any],
@@ -59,40 +311,122 @@ def record_http_context_manager(
     marker = request.node.get_closest_marker("record_http")
 
     if marker:
+        # pylint: disable=import-outside-toplevel
+        import vcr
+
+        from pytest_recorder.vcr_persister import (
+            VCRFilesystemPersister,
+            VCRRecordingPersister,
+        )
+
+        record_new_episodes = request.config.getoption("--record-new-episodes")
         record_no_overwrite = request.config.getoption("--record-no-overwrite")
         record_type = request.config.getoption("--record")
-        test_function = request.node.name
+        record_scope = record_scope_of(marker=marker)
+        test_function = record_name_of(request=request, scope=record_scope)
         test_module_path = Path(request.node.fspath)  # PYTEST 6.2.2 COMPATIBILITY
 
-        record_file_path = RecordFilePathBuilder.build(
-            test_module_path=test_module_path,
-            test_function=test_function,
-        )
+        with record_stats.measure(RecordType.http.name, RecordPhase.path):
+            record_file_path = RecordFilePathBuilder.build(
+                test_module_path=test_module_path,
+                test_function=test_function,
+            )
+
+        def use_cassette(prepare=lambda cassette: None):
+            if record_scope == "module":
+                return use_module_cassette(
+                    request=request,
+                    vcr_object=vcr_object,
+                    record_file_path=record_file_path,
+                    prepare=prepare,
+                )
+
+            return use_function_cassette(
+                vcr_object=vcr_object,
+                record_file_path=record_file_path,
+                prepare=prepare,
+            )
 
         if (RecordType.all in record_type or RecordType.http in record_type) and not (
             record_file_path.exists() and record_no_overwrite
         ):
-            record_file_path.unlink(missing_ok=True)
+            check_module_recording(request=request, scope=record_scope)
+            if record_new_episodes and record_file_path.exists():
+                vcr_object = vcr.VCR(
+                    cassette_library_dir=str(record_file_path.parent),
+                    record_mode="new_episodes",
+                    **vcr_config_of(vcr_config),
+                )
+                vcr_object.register_persister(
+                    VCRFilesystemPersister(recorder=RecordType.http.name)
+                )
 
-            vcr_object = vcr.VCR(
-                cassette_library_dir=str(record_file_path.parent),
-                record_mode="once",
-                **vcr_config,
-            )
-            vcr_object.register_persister(VCRFilesystemPersister)
+                with use_cassette(prepare=count_new_episodes) as cassette:
+                    with throttle_requests(cassette=cassette), time_responses(
+                        cassette=cassette, timed=is_timed(request=request)
+                    ):
+                        yield cassette
+            else:
+                vcr_object = vcr.VCR(
+                    cassette_library_dir=str(record_file_path.parent),
+                    record_mode="once",
+                    **vcr_config_of(vcr_config),
+                )
+                vcr_object.register_persister(
+                    VCRRecordingPersister(recorder=RecordType.http.name)
+                )
 
-            with vcr_object.use_cassette(record_file_path.name) as cassette:
-                yield cassette
+                cassette = None
+                try:
+                    with use_cassette() as cassette:
+                        with throttle_requests(cassette=cassette), time_responses(
+                            cassette=cassette, timed=is_timed(request=request)
+                        ):
+                            yield cassette
+                finally:
+                    # Nothing was recorded, drop the outdated cassette, even when the
+                    # cassette or the request patches fail to exit
+                    if (
+                        record_scope == "function"
+                        and cassette is not None
+                        and not cassette.data
+                    ):
+                        record_writer.remove(record_file_path=record_file_path)
         elif record_file_path.exists():
             vcr_object = vcr.VCR(
                 cassette_library_dir=str(record_file_path.parent),
                 record_mode="none",
-                **vcr_config,
+                **vcr_config_of(vcr_config),
             )
-            vcr_object.register_persister(VCRFilesystemPersister)
+            vcr_object.register_persister(
+                VCRFilesystemPersister(recorder=RecordType.http.name)
+            )
+
+            def measure_match(cassette):
+                for name in ("can_play_response_for", "play_response"):
+                    setattr(
+                        cassette,
+                        name,
+                        record_stats.wrap(
+                            RecordType.http.name,
+                            RecordPhase.match,
+                            getattr(cassette, name),
+                        ),
+                    )
 
-            with vcr_object.use_cassette(record_file_path.name) as cassette:
-                yield cassette
+            latency = ReplayLatency(
+                factor=latency_factor_of(request=request, marker=marker)
+            )
+
+            with use_cassette(prepare=measure_match) as cassette:
+                with replay_guard(
+                    request=request,
+                    marker=marker,
+                    recorder=RecordType.http.name,
+                    record_file_path=record_file_path,
+                    vcr_config=vcr_config,
+                ), delay_responses(cassette=cassette, latency=latency):
+                    yield cassette
         else:
             raise AttributeError(
                 f"No comparison possible since there is no vcr cassette : {record_file_path}",
@@ -101,6 +435,4 @@ def record_http_context_manager(
         yield None
 
 
-record_fixture = pytest.fixture(name="record_http", autouse=True)(
-    record_http_context_manager
-)
+record_fixture = pytest.fixture(name="record_http")(record_http_context_manager)
@@ -0,0 +1,237 @@
+# IMPORT STANDARD
+import logging
+import os
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from enum import Enum
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_crypt import MAGIC, record_cipher
+
+logger = logging.getLogger(__name__)
+
+# `mkstemp` creates files readable only by their owner, records are meant to
+# have the same permissions as any other file written by the user.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_RECORD_FILE_MODE = 0o666 & ~_UMASK
+
+
+class FsyncPolicy(str, Enum):
+    none = "none"
+    file = "file"
+    directory = "directory"
+
+
+class RecordWriteStatus(str, Enum):
+    new = "new"
+    updated = "updated"
+    unchanged = "unchanged"
+    removed = "removed"
+
+
+class RecordWriter:
+    """
+    Writes the record files.
+
+    Every record is written atomically : the data goes to a temporary file in the
+    destination folder which then replaces the record with `os.replace`. A run
+    killed in the middle of a write leaves either the previous record or the new
+    one, never a truncated file.
+
+    When `write_behind` is enabled the fixtures only serialize their records, the
+    files are written by a pool of background workers and the queue is drained at
+    the end of the session. Each record path is always handled by the same worker
+    so successive writes to one file keep their order.
+
+    A record whose content digest matches the existing file is left untouched, so
+    re-recording identical data keeps the file and its modification time. With
+    `record_cipher` enabled records are encrypted by the writer, the digest is the
+    one of their plain content.
+    """
+
+    @property
+    def fsync(self) -> FsyncPolicy:
+        return self._fsync
+
+    @property
+    def status_count(self) -> Dict[RecordWriteStatus, int]:
+        with self._lock:
+            return dict(self._status_counter)
+
+    @property
+    def write_behind(self) -> bool:
+        return bool(self._executor_list)
+
+    def __init__(self) -> None:
+        self._fsync = FsyncPolicy.none
+        self._executor_list: List[ThreadPoolExecutor] = []
+        self._pending_list: List[Tuple[Path, Future]] = []
+        self._status_counter: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        write_behind: bool = False,
+        workers: int = 4,
+        fsync: FsyncPolicy = FsyncPolicy.none,
+    ) -> None:
+        self.shutdown()
+        self._fsync = FsyncPolicy(fsync)
+        self._status_counter.clear()
+
+        if write_behind:
+            self._executor_list = [
+                ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix=f"pytest_recorder_writer_{index}",
+                )
+                for index in range(max(workers, 1))
+            ]
+
+    def write(self, record_file_path: Path, data: Union[bytes, str]) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        self._submit(self._write, record_file_path, data)
+
+    def remove(self, record_file_path: Path) -> None:
+        """Remove an outdated record, queued behind the pending writes to the same path."""
+
+        self._submit(self._remove, record_file_path)
+
+    def _submit(self, function, record_file_path: Path, *args) -> None:
+        if not self._executor_list:
+            function(record_file_path, *args)
+            return
+
+        index = hash(str(record_file_path)) % len(self._executor_list)
+        future = self._executor_list[index].submit(function, record_file_path, *args)
+        with self._lock:
+            self._pending_list.append((record_file_path, future))
+
+    def _count(self, status: RecordWriteStatus) -> None:
+        with self._lock:
+            self._status_counter[status] += 1
+
+    def _write(self, record_file_path: Path, data: bytes) -> None:
+        if not record_file_path.exists():
+            status = RecordWriteStatus.new
+        elif self.is_unchanged(
+            record_file_path=record_file_path,
+            data=data,
+            encrypted=record_cipher.enabled,
+        ):
+            logger.debug("Record file unchanged : %s", record_file_path)
+            self._count(RecordWriteStatus.unchanged)
+            return
+        else:
+            status = RecordWriteStatus.updated
+
+        if record_cipher.enabled:
+            data = record_cipher.encrypt(data)
+        self.write_atomic(
+            record_file_path=record_file_path,
+            data=data,
+            fsync=self._fsync,
+        )
+        self._count(status)
+
+    def _remove(self, record_file_path: Path) -> None:
+        if record_file_path.exists():
+            logger.debug("Removing record file : %s", record_file_path)
+            record_file_path.unlink()
+            self._count(RecordWriteStatus.removed)
+
+    def drain(self) -> List[Tuple[Path, BaseException]]:
+        """Wait for the pending writes, return the ones which failed."""
+
+        with self._lock:
+            pending_list, self._pending_list = self._pending_list, []
+
+        error_list = []
+        for record_file_path, future in pending_list:
+            error = future.exception()
+            if error is not None:
+                logger.error("Cannot write record file : %s", record_file_path)
+                error_list.append((record_file_path, error))
+
+        return error_list
+
+    def shutdown(self) -> List[Tuple[Path, BaseException]]:
+        error_list = self.drain()
+
+        for executor in self._executor_list:
+            executor.shutdown(wait=True)
+        self._executor_list = []
+
+        return error_list
+
+    @staticmethod
+    def is_unchanged(
+        record_file_path: Path, data: bytes, encrypted: bool = False
+    ) -> bool:
+        """Whether the file holds `data`, encrypted with `record_cipher` or plain."""
+
+        file_hash = sha256()
+        with record_file_path.open(mode="rb") as file:
+            if record_cipher.is_encrypted(file.read(len(MAGIC))) != encrypted:
+                return False
+            if not encrypted and record_file_path.stat().st_size != len(data):
+                return False
+            file.seek(0)
+            try:
+                for chunk in record_cipher.iter_plain(file):
+                    file_hash.update(chunk)
+            except RuntimeError:
+                # Encrypted with another key, or altered : written again
+                return False
+
+        return file_hash.digest() == sha256(data).digest()
+
+    @staticmethod
+    def write_atomic(
+        record_file_path: Path,
+        data: bytes,
+        fsync: FsyncPolicy = FsyncPolicy.none,
+    ) -> None:
+        record_folder_path = record_file_path.parent
+        logger.debug("Making record folder : %s", record_folder_path)
+        record_folder_path.mkdir(parents=True, exist_ok=True)
+
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=record_folder_path,
+            prefix=f".{record_file_path.name}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(file_descriptor, mode="wb") as file:
+                logger.debug("Writing record file : %s", record_file_path)
+                file.write(data)
+                if fsync != FsyncPolicy.none:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.chmod(temporary_path, _RECORD_FILE_MODE)
+            os.replace(temporary_path, record_file_path)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.unlink(temporary_path)
+            raise
+
+        if fsync == FsyncPolicy.directory and hasattr(os, "O_DIRECTORY"):
+            folder_descriptor = os.open(record_folder_path, os.O_RDONLY)
+            try:
+                os.fsync(folder_descriptor)
+            finally:
+                os.close(folder_descriptor)
+
+
+record_writer = RecordWriter()
@@ -0,0 +1,173 @@
+# IMPORT STANDARD
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple
+
+# IMPORT THIRD-PARTY
+from _pytest.fixtures import SubRequest
+from _pytest.mark import Mark
+
+# IMPORT INTERNAL
+
+TIMING_KEY = "timing"
+# Timings are rounded to 0.1 ms, finer differences are noise
+TIMING_DIGITS = 4
+
+Timing = Dict[str, float]
+
+
+def is_timed(request: SubRequest) -> bool:
+    return request.config.getoption("--record-timing")
+
+
+def latency_factor_of(request: SubRequest, marker: Mark) -> float:
+    factor = marker.kwargs.get(
+        "latency", request.config.getoption("--record-latency", default=None)
+    )
+    # Without the option, as when the fixtures run outside of pytest
+    factor = 0.0 if factor is None else float(factor)
+    if factor < 0:
+        raise AttributeError(f"The latency factor can't be negative : {factor}")
+
+    return factor
+
+
+def timing_of(ttfb: float, duration: float) -> Timing:
+    """Timing of an interaction : seconds to its first byte and to its end."""
+
+    duration = max(0.0, duration)
+    return {
+        "ttfb": round(min(max(0.0, ttfb), duration), TIMING_DIGITS),
+        "duration": round(duration, TIMING_DIGITS),
+    }
+
+
+class Timer:
+    """
+    Times an interaction while it is recorded.
+
+    The first byte is the first byte the caller can use : the end of the headers
+    for a response read as a stream, the end of the interaction otherwise.
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.first_byte: Optional[float] = None
+
+    def restart(self) -> None:
+        """Times the interaction from now, when its request is sent again."""
+
+        self.start = time.perf_counter()
+        self.first_byte = None
+
+    def mark_first_byte(self) -> None:
+        if self.first_byte is None:
+            self.first_byte = time.perf_counter()
+
+    def timing(self) -> Timing:
+        end = time.perf_counter()
+        first_byte = end if self.first_byte is None else self.first_byte
+        return timing_of(ttfb=first_byte - self.start, duration=end - self.start)
+
+
+class ReplayLatency:
+    """
+    Reproduces the recorded timing of the replayed interactions, scaled by `factor`.
+
+    A replayed response waits for its time to first byte, then its body is passed on
+    at the pace it was received, for the rest of its duration. Responses returned at
+    once wait for their whole duration. With a `factor` of 0 nothing waits, nor do the
+    interactions recorded without timing.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return self.factor > 0
+
+    def __init__(self, factor: float = 0.0) -> None:
+        self.factor = factor
+
+    def delays_of(self, timing: Optional[Timing]) -> Tuple[float, float]:
+        """Seconds to wait for the first byte, then for the rest of the transfer."""
+
+        if not timing or not self.enabled:
+            return 0.0, 0.0
+
+        duration = float(timing.get("duration", 0.0))
+        ttfb = min(float(timing.get("ttfb", duration)), duration)
+        return ttfb * self.factor, (duration - ttfb) * self.factor
+
+    def wait(self, timing: Optional[Timing]) -> None:
+        delay = sum(self.delays_of(timing))
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, timing: Optional[Timing]) -> None:
+        delay = sum(self.delays_of(timing))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait_first_byte(self, timing: Optional[Timing]) -> None:
+        delay = self.delays_of(timing)[0]
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_first_byte_async(self, timing: Optional[Timing]) -> None:
+        delay = self.delays_of(timing)[0]
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _pace_of(
+        self, timing: Optional[Timing], size: int
+    ) -> Optional[Tuple[float, float]]:
+        """Start of the transfer and seconds per byte, None when nothing waits."""
+
+        transfer_delay = self.delays_of(timing)[1]
+        if transfer_delay <= 0 or size <= 0:
+            return None
+
+        return time.perf_counter(), transfer_delay / size
+
+    def pace(
+        self, chunk_iterable: Iterable[Any], timing: Optional[Timing], size: int
+    ) -> Iterator[Any]:
+        """
+        Passes on the chunks of a `size` bytes body as they were received.
+
+        Each chunk is due once the transfer time of the bytes up to its end has
+        elapsed, measured from the first chunk, so the waits don't add up errors.
+        """
+
+        start_rate = self._pace_of(timing=timing, size=size)
+        if start_rate is None:
+            yield from chunk_iterable
+            return
+
+        start, rate = start_rate
+        received = 0
+        for chunk in chunk_iterable:
+            received = min(size, received + len(chunk))
+            delay = start + received * rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield chunk
+
+    async def apace(
+        self, chunk_iterable: Iterable[Any], timing: Optional[Timing], size: int
+    ) -> AsyncIterator[Any]:
+        """Same as `pace`, waiting with `asyncio.sleep`."""
+
+        start_rate = self._pace_of(timing=timing, size=size)
+        if start_rate is None:
+            for chunk in chunk_iterable:
+                yield chunk
+            return
+
+        start, rate = start_rate
+        received = 0
+        for chunk in chunk_iterable:
+            received = min(size, received + len(chunk))
+            delay = start + received * rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield chunk
@@ -0,0 +1,208 @@
+# IMPORT STANDARD
+import itertools
+import threading
+import warnings
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_dedup import digest_of
+
+# Same names as vcrpy's matchers, `match_on` can be shared with the http recorder.
+MATCHER_MAP: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "method": lambda request: str(request.get("method") or "GET").upper(),
+    "uri": lambda request: str(request.get("uri")),
+    "scheme": lambda request: urlsplit(str(request.get("uri"))).scheme,
+    "host": lambda request: urlsplit(str(request.get("uri"))).hostname,
+    "port": lambda request: urlsplit(str(request.get("uri"))).port,
+    "path": lambda request: urlsplit(str(request.get("uri"))).path,
+    "query": lambda request: tuple(
+        sorted(parse_qsl(urlsplit(str(request.get("uri"))).query))
+    ),
+    "body": lambda request: (
+        None if request.get("body") is None else digest_of(request["body"])
+    ),
+    "headers": lambda request: digest_of(request.get("headers") or {}),
+}
+DEFAULT_MATCH_ON = ("method", "uri", "body")
+# vcrpy's matchers under another name here, the bodies are compared as recorded.
+MATCHER_ALIAS_MAP = {"raw_body": "body"}
+
+
+def match_on_of(vcr_config: Dict[str, Any]) -> Tuple[str, ...]:
+    """
+    `match_on` of `vcr_config`, with the matchers of the aliases.
+
+    A matcher unknown here, like one registered with `vcr.register_matcher`, falls
+    back to the loose default matching, with a warning.
+    """
+
+    match_on = tuple(
+        dict.fromkeys(
+            MATCHER_ALIAS_MAP.get(matcher, matcher)
+            for matcher in vcr_config.get("match_on", DEFAULT_MATCH_ON)
+        )
+    )
+    unknown_list = [matcher for matcher in match_on if matcher not in MATCHER_MAP]
+    if unknown_list:
+        warnings.warn(
+            f"Unknown matchers : {unknown_list}, expected some of {list(MATCHER_MAP)}, "
+            f"matching on {list(loose_match_on_of(DEFAULT_MATCH_ON))} instead.",
+            stacklevel=2,
+        )
+        return loose_match_on_of(DEFAULT_MATCH_ON)
+
+    return match_on
+
+
+def loose_match_on_of(match_on: Sequence[str]) -> Tuple[str, ...]:
+    """`match_on` ignoring the query, which `filter_query_parameters` may have changed."""
+
+    if "uri" not in match_on and "query" not in match_on:
+        return tuple(match_on)
+
+    loose_match_on = [
+        matcher for matcher in match_on if matcher not in ("uri", "query")
+    ]
+    if "uri" in match_on:
+        loose_match_on += [
+            matcher
+            for matcher in ("scheme", "host", "port", "path")
+            if matcher not in loose_match_on
+        ]
+
+    return tuple(loose_match_on)
+
+
+class RequestIndex:
+    """
+    Interactions of a cassette indexed by the key of their request.
+
+    Each key holds the positions of its interactions in their recorded order : the
+    same request sent twice gets the interactions in that order, whatever the other
+    requests. The keys of `match_on_list` are tried in turn, from the strictest.
+
+    Concurrent lookups don't wait for each other : the queues are popped atomically
+    and the lock only guards the set of the used interactions.
+    """
+
+    def __init__(
+        self,
+        interaction_list: Sequence[Dict[str, Any]],
+        match_on_list: Sequence[Sequence[str]] = (DEFAULT_MATCH_ON,),
+        allow_playback_repeats: bool = False,
+    ) -> None:
+        self._interaction_list = interaction_list
+        self._allow_playback_repeats = allow_playback_repeats
+        self._used_set: Set[int] = set()
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+        self._match_on_list: List[Tuple[str, ...]] = []
+        for match_on in match_on_list:
+            if tuple(match_on) not in self._match_on_list:
+                self._match_on_list.append(tuple(match_on))
+        self._queue_map_list = [
+            self._build(match_on=match_on) for match_on in self._match_on_list
+        ]
+
+    @staticmethod
+    def request_of(interaction: Dict[str, Any]) -> Dict[str, Any]:
+        return interaction["request"]
+
+    @staticmethod
+    def key_of(request: Dict[str, Any], match_on: Sequence[str]) -> tuple:
+        return tuple(MATCHER_MAP[matcher](request) for matcher in match_on)
+
+    def _build(self, match_on: Sequence[str]) -> Dict[tuple, Tuple[int, Deque[int]]]:
+        """Per key, the first position, replayed again with repeats, and the queue."""
+
+        queue_map: Dict[tuple, Tuple[int, Deque[int]]] = {}
+        for i, interaction in enumerate(self._interaction_list):
+            key = self.key_of(request=self.request_of(interaction), match_on=match_on)
+            queue_map.setdefault(key, (i, deque()))[1].append(i)
+
+        return queue_map
+
+    def _claim(self, i: int) -> bool:
+        with self._lock:
+            if i in self._used_set:
+                return False
+            self._used_set.add(i)
+            return True
+
+    def _take(self, first: int, queue: Deque[int]) -> Optional[Dict[str, Any]]:
+        while True:
+            try:
+                i = queue.popleft()
+            except IndexError:
+                break
+            if self._claim(i):
+                return self._interaction_list[i]
+
+        if self._allow_playback_repeats:
+            return self._interaction_list[first]
+
+        return None
+
+    def find(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """First unused interaction matching `request`, None if there is none."""
+
+        for match_on, queue_map in zip(self._match_on_list, self._queue_map_list):
+            entry = queue_map.get(self.key_of(request=request, match_on=match_on))
+            if entry is not None:
+                interaction = self._take(*entry)
+                if interaction is not None:
+                    return interaction
+
+        return None
+
+    def __len__(self) -> int:
+        return len(self._interaction_list)
+
+    @property
+    def used_count(self) -> int:
+        with self._lock:
+            return len(self._used_set)
+
+    def next_unused(self) -> Optional[Dict[str, Any]]:
+        """First unused interaction in the recorded order, whatever its request."""
+
+        with self._lock:
+            while self._cursor < len(self._interaction_list):
+                i = self._cursor
+                self._cursor += 1
+                if i not in self._used_set:
+                    self._used_set.add(i)
+                    return self._interaction_list[i]
+
+        return None
+
+
+class CaptureList:
+    """
+    Interactions captured while recording, in the order their requests were sent.
+
+    Concurrent requests complete in any order : each one takes a sequence number
+    when it is sent and the interactions are listed in the order of these numbers.
+    """
+
+    def __init__(self) -> None:
+        self._sequence = itertools.count()
+        self._entry_map: Dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self) -> int:
+        with self._lock:
+            return next(self._sequence)
+
+    def add(self, sequence: int, entry: Any) -> None:
+        with self._lock:
+            self._entry_map[sequence] = entry
+
+    def entry_list(self) -> List[Any]:
+        with self._lock:
+            return [self._entry_map[sequence] for sequence in sorted(self._entry_map)]
@@ -0,0 +1,77 @@
+# IMPORT STANDARD
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, TypeVar
+
+# IMPORT THIRD-PARTY
+import pytest
+from _pytest.fixtures import SubRequest
+from _pytest.mark import Mark
+
+# IMPORT INTERNAL
+
+RecordT = TypeVar("RecordT")
+
+# Name of the record shared by the tests of a module, in place of the test name.
+MODULE_RECORD_NAME = "_module"
+RECORD_SCOPE_LIST = ["function", "module"]
+
+MODULE_RECORD_MAP_KEY = pytest.StashKey[Dict[Tuple[str, Path], Any]]()
+
+
+def record_scope_of(marker: Mark) -> str:
+    scope = marker.kwargs.get("scope", "function")
+    if scope not in RECORD_SCOPE_LIST:
+        raise AttributeError(
+            f"Unknown record scope : {scope!r}, expected one of {RECORD_SCOPE_LIST}"
+        )
+
+    return scope
+
+
+def check_module_recording(request: SubRequest, scope: str) -> None:
+    """
+    Refuses to record with the module scope on a pytest-xdist worker without
+    --record-dist : the tests of the module would run on several workers, each
+    writing the module record, the last one overwriting the others.
+    """
+
+    if (
+        scope == "module"
+        and hasattr(request.config, "workerinput")
+        and not request.config.getoption("--record-dist", default=False)
+    ):
+        raise RuntimeError(
+            "Recording with scope='module' under pytest-xdist requires --record-dist, "
+            "which runs the tests of the module on one worker."
+        )
+
+
+def record_name_of(request: SubRequest, scope: str) -> str:
+    return MODULE_RECORD_NAME if scope == "module" else request.node.name
+
+
+def module_record(
+    request: SubRequest,
+    recorder: str,
+    record_file_path: Path,
+    load: Callable[[], RecordT],
+    save: Callable[[RecordT], None],
+) -> RecordT:
+    """
+    Record shared by the tests of the module of `request`.
+
+    The first test of the module using the record calls `load`, the others get the
+    same object from memory. `save` is called once, after the last test of the
+    module.
+    """
+
+    module_node = request.node.getparent(pytest.Module) or request.node.session
+    record_map = module_node.stash.setdefault(MODULE_RECORD_MAP_KEY, {})
+    key = (recorder, record_file_path)
+
+    if key not in record_map:
+        record = load()
+        record_map[key] = record
+        module_node.addfinalizer(lambda: save(record))
+
+    return record_map[key]
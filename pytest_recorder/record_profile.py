@@ -0,0 +1,205 @@
+# IMPORT STANDARD
+import cProfile
+import pstats
+import re
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+# Frames kept per allocation, enough to reach the recorder frame below yaml or vcr.
+TRACEMALLOC_FRAME_COUNT = 25
+DEFAULT_FOLDER_PATH = Path(".record_profile")
+RECORDER_FILTER_LIST = [
+    tracemalloc.Filter(
+        inclusive=True,
+        filename_pattern=str(Path(__file__).parent / "*"),
+        all_frames=True,
+    ),
+    tracemalloc.Filter(inclusive=False, filename_pattern=__file__),
+]
+
+AllocationMap = Dict[Tuple[str, int], List[int]]
+
+
+class RecordProfiler:
+    """
+    cProfile and tracemalloc around the recorder fixtures.
+
+    The recorders are profiled between `start` and `stop`, which may be called several
+    times per test. `finish_test` writes the test's `.pstats` file and the sites of
+    the allocations made under a recorder module and still alive at the end of each
+    profiled span.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def folder_path(self) -> Path:
+        return self._folder_path
+
+    def __init__(self) -> None:
+        self._enabled = False
+        self._folder_path = DEFAULT_FOLDER_PATH
+        self._top = 10
+        self._depth = 0
+        self._own_tracing = False
+        self._profile: Optional[cProfile.Profile] = None
+        self._allocation_map: AllocationMap = defaultdict(lambda: [0, 0])
+        self._peak = 0
+        self._session_stats: Optional[pstats.Stats] = None
+        self._session_allocation_map: AllocationMap = defaultdict(lambda: [0, 0])
+        self._session_peak = 0
+        self._test_count = 0
+
+    def configure(
+        self, enabled: bool = False, folder_path: Optional[Path] = None, top: int = 10
+    ) -> None:
+        self._enabled = enabled
+        self._folder_path = folder_path or DEFAULT_FOLDER_PATH
+        self._top = top
+        self._depth = 0
+        self._profile = None
+        self._allocation_map.clear()
+        self._peak = 0
+        self._session_stats = None
+        self._session_allocation_map.clear()
+        self._session_peak = 0
+        self._test_count = 0
+
+    def start(self) -> None:
+        if not self._enabled:
+            return
+
+        self._depth += 1
+        if self._depth > 1:
+            return
+
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+        # Tracing started by the user, e.g. with -X tracemalloc, is left running
+        self._own_tracing = not tracemalloc.is_tracing()
+        if self._own_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAME_COUNT)
+        else:
+            tracemalloc.reset_peak()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        if not self._enabled or self._depth == 0:
+            return
+
+        self._depth -= 1
+        if self._depth > 0 or self._profile is None:
+            return
+
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot().filter_traces(RECORDER_FILTER_LIST)
+        _, peak = tracemalloc.get_traced_memory()
+        if self._own_tracing:
+            tracemalloc.stop()
+
+        self._peak = max(self._peak, peak)
+        for statistic in snapshot.statistics("lineno"):
+            frame = statistic.traceback[0]
+            allocation = self._allocation_map[(frame.filename, frame.lineno)]
+            allocation[0] += statistic.size
+            allocation[1] += statistic.count
+
+    def finish_test(self, nodeid: str) -> None:
+        """Writes the reports of the test and adds them to the session ones."""
+
+        if not self._enabled or self._profile is None:
+            return
+
+        self._folder_path.mkdir(parents=True, exist_ok=True)
+        file_stem = re.sub(r"[^\w.-]+", "_", nodeid).strip("_")
+
+        self._profile.dump_stats(self._folder_path / f"{file_stem}.pstats")
+        if self._session_stats is None:
+            self._session_stats = pstats.Stats(self._profile)
+        else:
+            self._session_stats.add(self._profile)
+
+        self.write_allocation_report(
+            report_path=self._folder_path / f"{file_stem}.alloc.txt",
+            title=nodeid,
+            allocation_map=self._allocation_map,
+            peak=self._peak,
+        )
+        for site, (size, count) in self._allocation_map.items():
+            allocation = self._session_allocation_map[site]
+            allocation[0] += size
+            allocation[1] += count
+        self._session_peak = max(self._session_peak, self._peak)
+        self._test_count += 1
+
+        self._profile = None
+        self._allocation_map.clear()
+        self._peak = 0
+
+    def finish_session(self) -> List[Path]:
+        """Writes the aggregated session reports, returns their paths."""
+
+        if not self._enabled or self._session_stats is None:
+            return []
+
+        stats_path = self._folder_path / "session.pstats"
+        self._session_stats.dump_stats(stats_path)
+
+        report_path = self._folder_path / "session.alloc.txt"
+        self.write_allocation_report(
+            report_path=report_path,
+            title=f"session : {self._test_count} tests",
+            allocation_map=self._session_allocation_map,
+            peak=self._session_peak,
+        )
+
+        return [stats_path, report_path]
+
+    def summary_line_list(self) -> List[str]:
+        if self._session_stats is None:
+            return []
+
+        line_list = [f"{self._test_count} tests profiled in {self._folder_path}"]
+        line_list += [f"peak traced memory : {self._session_peak} B"]
+        line_list += [f"{'size (B)':>12}{'count':>10}  allocation site"]
+        line_list += self.allocation_line_list(
+            allocation_map=self._session_allocation_map, top=self._top
+        )
+
+        return line_list
+
+    @staticmethod
+    def allocation_line_list(allocation_map: AllocationMap, top: int) -> List[str]:
+        site_list = sorted(
+            allocation_map.items(), key=lambda item: item[1][0], reverse=True
+        )
+
+        return [
+            f"{size:>12}{count:>10}  {filename}:{lineno}"
+            for (filename, lineno), (size, count) in site_list[:top]
+        ]
+
+    def write_allocation_report(
+        self,
+        report_path: Path,
+        title: str,
+        allocation_map: AllocationMap,
+        peak: int,
+    ) -> None:
+        line_list = [title, f"peak traced memory : {peak} B", ""]
+        line_list += [f"{'size (B)':>12}{'count':>10}  allocation site"]
+        line_list += self.allocation_line_list(
+            allocation_map=allocation_map, top=self._top
+        )
+        report_path.write_text("\n".join(line_list) + "\n", encoding="utf-8")
+
+
+record_profiler = RecordProfiler()
@@ -0,0 +1,144 @@
+# IMPORT STANDARD
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_module import MODULE_RECORD_NAME
+
+# `<test name><recorder suffix>.<extension>`, see the `RecordFilePathBuilder` classes.
+RECORD_FILE_NAME_PATTERN = re.compile(
+    r"(?P<name>.+?)(?:_curl|_ftp|_urllib3_v\d+)?\.(?:json|yaml)"
+)
+# A recorder marker with the module scope, `@pytest.mark.record_curl(scope="module")`.
+MODULE_SCOPE_MARKER_PATTERN = re.compile(
+    r"""\brecord_(?:curl|ftp|http)\([^)]*\bscope\s*=\s*["']module["']"""
+)
+
+
+class RecordScope:
+    """
+    Groups the tests by the record files they replay.
+
+    Record files are named after the test module and the test name, without the
+    class : `TestA::test_x` and `TestB::test_x` of one module share their records.
+    The tests sharing records form one scope, weighing the size of these records.
+    A test without record is a scope of its own.
+
+    A module recorded with the module scope, which has a module record or marks a
+    recorder with `scope="module"`, is a single scope : its tests share one record,
+    written once by the worker running all of them.
+    """
+
+    def __init__(self, rootpath: Path) -> None:
+        self._rootpath = rootpath
+        self._size_map_by_module: Dict[str, Dict[str, int]] = {}
+        self._is_module_scoped_by_module: Dict[str, bool] = {}
+
+    def _size_map(self, module: str) -> Dict[str, int]:
+        """Size of the record files of a test module, per test name."""
+
+        size_map = self._size_map_by_module.get(module)
+        if size_map is not None:
+            return size_map
+
+        size_map = {}
+        module_path = self._rootpath / module
+        record_folder_path = module_path.parent / "record"
+        if record_folder_path.is_dir():
+            for recorder_folder_path in record_folder_path.iterdir():
+                module_folder_path = recorder_folder_path / module_path.stem
+                if not module_folder_path.is_dir():
+                    continue
+                for record_file_path in module_folder_path.iterdir():
+                    match = RECORD_FILE_NAME_PATTERN.fullmatch(record_file_path.name)
+                    if match is None or not record_file_path.is_file():
+                        continue
+                    size_map[match["name"]] = (
+                        size_map.get(match["name"], 0) + record_file_path.stat().st_size
+                    )
+
+        self._size_map_by_module[module] = size_map
+        return size_map
+
+    def _is_module_scoped(self, module: str) -> bool:
+        is_module_scoped = self._is_module_scoped_by_module.get(module)
+        if is_module_scoped is not None:
+            return is_module_scoped
+
+        is_module_scoped = MODULE_RECORD_NAME in self._size_map(module)
+        if not is_module_scoped:
+            try:
+                source = (self._rootpath / module).read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                source = ""
+            is_module_scoped = MODULE_SCOPE_MARKER_PATTERN.search(source) is not None
+
+        self._is_module_scoped_by_module[module] = is_module_scoped
+        return is_module_scoped
+
+    def scope_of(self, nodeid: str) -> str:
+        module, _, rest = nodeid.partition("::")
+        if self._is_module_scoped(module):
+            return module
+
+        name = rest.rsplit("::", 1)[-1]
+        if name in self._size_map(module):
+            return f"{module}::{name}"
+
+        return nodeid
+
+    def size_of(self, scope: str) -> int:
+        module, _, name = scope.partition("::")
+        if not name:
+            return sum(self._size_map(module).values())
+
+        return self._size_map(module).get(name, 0)
+
+
+def make_record_scheduler(config: Any, log: Any) -> Any:
+    """Scheduler sending the tests sharing record files to the same pytest-xdist worker."""
+
+    # pylint: disable=import-outside-toplevel
+    from xdist.scheduler import LoadScopeScheduling
+
+    class RecordScheduling(LoadScopeScheduling):
+        """
+        Tests sharing records run on the same worker, where the records stay in the
+        `record_cache`. The scopes with the heaviest records are sent first.
+        """
+
+        def __init__(self, config: Any, log: Any = None) -> None:
+            super().__init__(config, log)
+            self._record_scope = RecordScope(rootpath=config.rootpath)
+            self._is_sorted = False
+
+        def _split_scope(self, nodeid: str) -> str:
+            return self._record_scope.scope_of(nodeid)
+
+        def _assign_work_unit(self, node: Any) -> None:
+            if not self._is_sorted:
+                self._is_sorted = True
+                for scope in sorted(
+                    self.workqueue, key=self._record_scope.size_of, reverse=True
+                ):
+                    self.workqueue.move_to_end(scope)
+            super()._assign_work_unit(node)
+
+        def mark_test_pending(self, item: str) -> None:
+            """Sends a test again, as `pytest_handlecrashitem` asks after a crash."""
+
+            scope = self._split_scope(item)
+            self.workqueue.setdefault(scope, OrderedDict())[item] = False
+            self.workqueue.move_to_end(scope, last=False)
+            for node in self.assigned_work:
+                self._reschedule(node)
+
+        def remove_pending_tests_from_node(self, node: Any, indices: Any) -> None:
+            # Answers the "steal" command of work stealing, never sent by this scheduler
+            super().remove_pending_tests_from_node(node, indices)
+
+    return RecordScheduling(config, log)
@@ -0,0 +1,409 @@
+"""Local HTTP server replaying the curl and http cassettes.
+
+Usage: pytest-recorder serve [PATH ...] [--host HOST] [--port PORT] [--latency FACTOR]
+"""
+
+# IMPORT STANDARD
+import argparse
+import asyncio
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_cache import record_cache
+from pytest_recorder.record_crypt import KEY_ENV_VAR, key_of, record_cipher
+from pytest_recorder.record_dedup import record_dedup
+from pytest_recorder.record_latency import TIMING_KEY, ReplayLatency
+from pytest_recorder.record_match import RequestIndex
+from pytest_recorder.record_type import RecordType
+
+# Requests are matched on their path, the host is the server's : from the strictest
+# to the loosest, as the query and body may have been filtered when recorded.
+SERVER_MATCH_ON_LIST = [
+    ("method", "path", "query", "body"),
+    ("method", "path", "body"),
+    ("method", "path", "query"),
+    ("method", "path"),
+]
+# Recorders whose cassettes are served, in `record/<recorder>/<test_module>`.
+SERVER_RECORDER_LIST = [RecordType.http.name, RecordType.curl.name]
+# Set by the server from the body it sends, or meaningless once replayed.
+SKIPPED_HEADER_SET = {"connection", "content-length", "keep-alive", "transfer-encoding"}
+SERVER_CHUNK_SIZE = 65536
+MAX_HEADER_SIZE = 65536
+
+
+def body_of(body: Any) -> Any:
+    """Recorded or received request body, in the same form whatever its source."""
+
+    if isinstance(body, (bytes, bytearray)):
+        try:
+            body = bytes(body).decode("utf-8")
+        except UnicodeDecodeError:
+            return bytes(body)
+    if isinstance(body, str):
+        try:
+            return json.loads(body)
+        except ValueError:
+            return body or None
+
+    return body
+
+
+def header_list_of(headers: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """Headers of a vcrpy cassette, lists of values, or of a curl cassette, values."""
+
+    header_list = []
+    for key, value in (headers or {}).items():
+        for item in value if isinstance(value, list) else [value]:
+            header_list.append((str(key), str(item)))
+
+    return header_list
+
+
+def cassette_path_list_of(path_list: Iterable[Path]) -> List[Path]:
+    cassette_path_list = []
+    for path in map(Path, path_list):
+        if path.is_dir():
+            cassette_path_list += sorted(path.rglob("*.yaml"))
+        elif path.is_file():
+            cassette_path_list.append(path)
+        else:
+            raise AttributeError(f"No cassette to serve : {path}")
+
+    return cassette_path_list
+
+
+def load_interaction_list(cassette_path_list: Sequence[Path]) -> List[Dict[str, Any]]:
+    """Interactions of the cassettes, keyed by their request as the server receives it."""
+
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    interaction_list = []
+    for cassette_path in cassette_path_list:
+        data = record_cache.load(record_file_path=cassette_path, parse=yaml.safe_load)
+        for interaction in record_dedup.expand((data or {}).get("interactions", [])):
+            request = interaction["request"]
+            split = urlsplit(str(request.get("uri")))
+            interaction_list.append(
+                {
+                    "request": {
+                        "method": request.get("method"),
+                        "uri": split._replace(scheme="", netloc="").geturl(),
+                        "body": body_of(request.get("body")),
+                    },
+                    "response": interaction["response"],
+                    # curl bodies are stored decoded, their encoding header is stale
+                    "decoded": "source_type" in interaction,
+                }
+            )
+
+    return interaction_list
+
+
+class RecordServer:
+    """
+    HTTP/1.1 server answering with the responses of curl and http cassettes.
+
+    The requests are looked up in a `RequestIndex` of the cassettes' interactions :
+    the same request gets its recorded responses in order, then the first one again.
+    Responses are encoded once, then written as is. A request matching no
+    interaction gets a 404.
+
+    The server runs an asyncio loop in a background thread, its clients use real
+    sockets : connection pools, keep-alive and timeouts behave as with the API.
+    The request counts are updated by that thread, under a lock.
+    """
+
+    @property
+    def url(self) -> str:
+        if self._port is None:
+            raise RuntimeError("The record server isn't started.")
+        return f"http://{self._address[0]}:{self._port}"
+
+    def __init__(
+        self,
+        path_list: Iterable[Path],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[ReplayLatency] = None,
+    ) -> None:
+        # Requested address, the port being chosen by the system when 0
+        self._address = (host, port)
+        self._port: Optional[int] = None
+        self._latency = latency or ReplayLatency()
+        self._request_index = RequestIndex(
+            load_interaction_list(cassette_path_list_of(path_list)),
+            match_on_list=SERVER_MATCH_ON_LIST,
+            allow_playback_repeats=True,
+        )
+        # Status line and headers, and body, of each interaction once encoded
+        self._encoded_map: Dict[int, Tuple[bytes, bytes]] = {}
+        self._loop: Any = None
+        self._server: Any = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._count_lock = threading.Lock()
+        self._count_map: Counter = Counter()
+
+    @property
+    def interaction_count(self) -> int:
+        return len(self._request_index)
+
+    @property
+    def request_count(self) -> int:
+        with self._count_lock:
+            return self._count_map["requests"]
+
+    @property
+    def miss_count(self) -> int:
+        with self._count_lock:
+            return self._count_map["misses"]
+
+    def _count(self, name: str) -> None:
+        with self._count_lock:
+            self._count_map[name] += 1
+
+    def _encode(self, interaction: Dict[str, Any]) -> Tuple[bytes, bytes]:
+        encoded = self._encoded_map.get(id(interaction))
+        if encoded is not None:
+            return encoded
+
+        response = interaction["response"]
+        body = (response.get("body") or {}).get("string") or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        skipped_header_set = SKIPPED_HEADER_SET
+        if interaction["decoded"]:
+            skipped_header_set = skipped_header_set | {"content-encoding"}
+        status = response.get("status") or {}
+        line_list = [f"HTTP/1.1 {status.get('code', 200)} {status.get('message', '')}"]
+        line_list += [
+            f"{key}: {value}"
+            for key, value in header_list_of(response.get("headers"))
+            if key.lower() not in skipped_header_set
+        ]
+        line_list.append(f"Content-Length: {len(body)}")
+        head = ("\r\n".join(line_list) + "\r\n\r\n").encode("latin-1", "replace")
+
+        encoded = self._encoded_map[id(interaction)] = (head, body)
+        return encoded
+
+    @staticmethod
+    def _miss(method: str, target: str) -> Tuple[bytes, bytes]:
+        body = f"No recorded interaction for {method} {target}\n".encode("utf-8")
+        head = (
+            "HTTP/1.1 404 Not Found\r\n"
+            "Content-Type: text/plain; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("latin-1")
+        return head, body
+
+    @staticmethod
+    async def _read_body(reader, header_map: Dict[str, str]) -> bytes:
+        if "chunked" in header_map.get("transfer-encoding", "").lower():
+            chunk_list: List[bytes] = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Trailers, up to the blank line
+                    while (await reader.readline()).strip():
+                        pass
+                    return b"".join(chunk_list)
+                chunk_list.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+
+        length = int(header_map.get("content-length") or 0)
+        return await reader.readexactly(length) if length else b""
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    return
+
+                line_list = head.decode("latin-1").split("\r\n")
+                method, target, version = line_list[0].split(" ", 2)
+                header_map: Dict[str, str] = {}
+                for line in line_list[1:]:
+                    key, _, value = line.partition(":")
+                    if key:
+                        header_map[key.strip().lower()] = value.strip()
+                body = await self._read_body(reader, header_map)
+
+                self._count("requests")
+                interaction = self._request_index.find(
+                    {"method": method, "uri": target, "body": body_of(body)}
+                )
+                if interaction is None:
+                    self._count("misses")
+                    response_head, response_body = self._miss(method, target)
+                    timing = None
+                else:
+                    response_head, response_body = self._encode(interaction)
+                    timing = interaction["response"].get(TIMING_KEY)
+
+                await self._latency.wait_first_byte_async(timing)
+                writer.write(response_head)
+                if method != "HEAD":
+                    view = memoryview(response_body)
+                    async for chunk in self._latency.apace(
+                        (
+                            view[start : start + SERVER_CHUNK_SIZE]
+                            for start in range(0, len(view), SERVER_CHUNK_SIZE)
+                        ),
+                        timing=timing,
+                        size=len(view),
+                    ):
+                        writer.write(chunk)
+                await writer.drain()
+
+                connection = header_map.get("connection", "").lower()
+                if connection == "close" or (
+                    version == "HTTP/1.0" and connection != "keep-alive"
+                ):
+                    return
+        except (ConnectionError, ValueError):
+            return
+        finally:
+            writer.close()
+
+    async def _start_server(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle,
+            host=self._address[0],
+            port=self._address[1],
+            limit=MAX_HEADER_SIZE,
+        )
+        self._port = self._server.sockets[0].getsockname()[1]
+
+    async def _close(self) -> None:
+        """Stops listening and drops the connections kept alive by the clients."""
+
+        self._server.close()
+        task_list = [
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ]
+        for task in task_list:
+            task.cancel()
+        await asyncio.gather(*task_list, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def start(self) -> "RecordServer":
+        """Serves from a background thread, returns once the server listens."""
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self._start_server())
+            finally:
+                self._started.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._close())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="record-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._port is None:
+            raise RuntimeError(
+                "The record server couldn't listen on "
+                f"{self._address[0]}:{self._address[1]}."
+            )
+
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    def serve_forever(self) -> None:
+        """Serves from the calling thread, until it is interrupted."""
+
+        async def serve() -> None:
+            await self._start_server()
+            print(
+                f"Serving {self.interaction_count} recorded interactions on {self.url}",
+                flush=True,
+            )
+            async with self._server:
+                await self._server.serve_forever()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+
+    def __enter__(self) -> "RecordServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def record_path_list_of(test_module_path: Path) -> List[Path]:
+    """Folders of the curl and http cassettes of a test module."""
+
+    path_list = [
+        test_module_path.parent / "record" / recorder / test_module_path.stem
+        for recorder in SERVER_RECORDER_LIST
+    ]
+
+    return [path for path in path_list if path.is_dir()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="pytest-recorder")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser(
+        "serve", help="Serve curl and http cassettes over HTTP."
+    )
+    serve_parser.add_argument(
+        "path_list",
+        nargs="*",
+        type=Path,
+        default=[Path("record")],
+        metavar="PATH",
+        help="Cassettes, or folders searched for cassettes (default: record).",
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        metavar="FACTOR",
+        help="Wait for the recorded timing of the responses multiplied by FACTOR (default: 0, no wait).",
+    )
+    serve_parser.add_argument(
+        "--key-file",
+        type=Path,
+        default=None,
+        help=f"Key of the encrypted cassettes (default: the {KEY_ENV_VAR} environment variable).",
+    )
+    args = parser.parse_args(argv)
+
+    record_cipher.configure(key=key_of(key_file_path=args.key_file))
+    RecordServer(
+        path_list=args.path_list,
+        host=args.host,
+        port=args.port,
+        latency=ReplayLatency(factor=args.latency),
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
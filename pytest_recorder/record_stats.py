@@ -0,0 +1,180 @@
+# IMPORT STANDARD
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+NULL_CONTEXT = nullcontext()
+
+
+class RecordPhase(str, Enum):
+    path = "path"
+    load = "load"
+    match = "match"
+    serialize = "serialize"
+    hash = "hash"
+    persist = "persist"
+
+
+class PhaseMeasure:
+    def __init__(self, stats: "RecordStats", recorder: str, phase: RecordPhase):
+        self._stats = stats
+        self._recorder = recorder
+        self._phase = phase
+        self._start = 0.0
+
+    def __enter__(self) -> "PhaseMeasure":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._stats.add(
+            recorder=self._recorder,
+            phase=self._phase,
+            seconds=time.perf_counter() - self._start,
+        )
+
+
+class RecordStats:
+    """
+    Time spent by the recorders, per recorder, phase and test.
+
+    When disabled `measure` returns a shared no-op context manager, so the
+    instrumentation costs nearly nothing.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def nodeid(self) -> Optional[str]:
+        return self._nodeid
+
+    @nodeid.setter
+    def nodeid(self, value: Optional[str]):
+        self._nodeid = value
+
+    def __init__(self) -> None:
+        self._enabled = False
+        self._nodeid = None
+        self._lock = threading.Lock()
+        self._total_map: Dict[Tuple[str, RecordPhase], List[float]] = defaultdict(
+            lambda: [0, 0.0]
+        )
+        self._test_map: Dict[Tuple[str, RecordPhase], Dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    def configure(self, enabled: bool = False) -> None:
+        self._enabled = enabled
+        self._nodeid = None
+        self._total_map.clear()
+        self._test_map.clear()
+
+    def measure(self, recorder: str, phase: RecordPhase):
+        if not self._enabled:
+            return NULL_CONTEXT
+
+        return PhaseMeasure(stats=self, recorder=recorder, phase=phase)
+
+    def wrap(self, recorder: str, phase: RecordPhase, function: Callable) -> Callable:
+        if not self._enabled:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with PhaseMeasure(stats=self, recorder=recorder, phase=phase):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def add(self, recorder: str, phase: RecordPhase, seconds: float) -> None:
+        key = (recorder, RecordPhase(phase))
+        nodeid = self._nodeid or "<session>"
+
+        with self._lock:
+            total = self._total_map[key]
+            total[0] += 1
+            total[1] += seconds
+            self._test_map[key][nodeid] += seconds
+
+    def merge(self, data: Optional[Dict[str, Any]]) -> None:
+        """Adds the times of another process, from its `to_dict`, a pytest-xdist worker for instance."""
+
+        data = data or {}
+        with self._lock:
+            for total in data.get("totals", []):
+                key = (total["recorder"], RecordPhase(total["phase"]))
+                self._total_map[key][0] += total["calls"]
+                self._total_map[key][1] += total["seconds"]
+            for nodeid, seconds_map in data.get("tests", {}).items():
+                for name, seconds in seconds_map.items():
+                    recorder, _, phase = name.rpartition(".")
+                    self._test_map[(recorder, RecordPhase(phase))][nodeid] += seconds
+
+    def slowest(self, phase: RecordPhase, top: int) -> List[Tuple[str, float]]:
+        """Tests which spent the most time in `phase`, all recorders included."""
+
+        with self._lock:
+            seconds_map: Dict[str, float] = defaultdict(float)
+            for (_, key_phase), test_seconds_map in self._test_map.items():
+                if key_phase == phase:
+                    for nodeid, seconds in test_seconds_map.items():
+                        seconds_map[nodeid] += seconds
+
+        return sorted(seconds_map.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    def to_dict(self, top: int) -> Dict[str, Any]:
+        with self._lock:
+            total_list = [
+                {
+                    "recorder": recorder,
+                    "phase": phase.value,
+                    "calls": calls,
+                    "seconds": seconds,
+                }
+                for (recorder, phase), (calls, seconds) in sorted(
+                    self._total_map.items()
+                )
+            ]
+            test_map: Dict[str, Dict[str, float]] = defaultdict(dict)
+            for (recorder, phase), test_seconds_map in self._test_map.items():
+                for nodeid, seconds in test_seconds_map.items():
+                    test_map[nodeid][f"{recorder}.{phase.value}"] = seconds
+
+        return {
+            "totals": total_list,
+            "tests": dict(test_map),
+            "slowest": {
+                phase.value: self.slowest(phase=phase, top=top) for phase in RecordPhase
+            },
+        }
+
+    def summary_line_list(self, top: int) -> List[str]:
+        data = self.to_dict(top=top)
+
+        line_list = [f"{'recorder':<10}{'phase':<11}{'calls':>8}{'total (s)':>12}"]
+        for total in data["totals"]:
+            line_list.append(
+                f"{total['recorder']:<10}{total['phase']:<11}"
+                f"{total['calls']:>8}{total['seconds']:>12.4f}"
+            )
+
+        for phase, slowest_list in data["slowest"].items():
+            if slowest_list:
+                line_list.append(f"slowest tests for phase {phase} :")
+                for nodeid, seconds in slowest_list:
+                    line_list.append(f"  {seconds:.4f}s {nodeid}")
+
+        return line_list
+
+
+record_stats = RecordStats()
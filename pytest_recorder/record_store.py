@@ -0,0 +1,397 @@
+# IMPORT STANDARD
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_io import RecordWriter
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+STORE_CHUNK_SIZE = 1 << 20
+
+ErrorList = List[Tuple[Path, BaseException]]
+
+
+def digest_of_file(file_path: Path) -> str:
+    file_hash = sha256()
+    with file_path.open(mode="rb") as file:
+        for chunk in iter(lambda: file.read(STORE_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+def module_path_of(record_file_path: Path) -> Path:
+    """Test module of a record : `<folder>/record/<recorder>/<module>/<file>`."""
+
+    module_folder_path = record_file_path.parent
+    return module_folder_path.parent.parent.parent / f"{module_folder_path.name}.py"
+
+
+def module_record_path_list(module_path: Path) -> List[Path]:
+    """Record files of a test module, for every recorder."""
+
+    record_folder_path = module_path.parent / "record"
+    if not record_folder_path.is_dir():
+        return []
+
+    record_file_path_list = []
+    for recorder_folder_path in sorted(record_folder_path.iterdir()):
+        module_folder_path = recorder_folder_path / module_path.stem
+        if not module_folder_path.is_dir():
+            continue
+        record_file_path_list += [
+            record_file_path
+            for record_file_path in sorted(module_folder_path.iterdir())
+            if record_file_path.is_file() and not record_file_path.name.startswith(".")
+        ]
+
+    return record_file_path_list
+
+
+class RecordStore:
+    """
+    Record files kept in a remote content-addressed store instead of the repository.
+
+    Only the manifest is committed : it maps the path of each record, which names
+    its test module, test and recorder, to the sha256 digest of its content. The
+    store serves that content at `<url>/<digest>` and accepts it with a PUT.
+
+    Before the tests run, the records of the collected test modules which are
+    missing, or differ from the manifest, are fetched in parallel over a pool of
+    connections. The fetched content is kept in a local cache folder, the least
+    recently used files are removed once they weigh more than `cache_max_bytes`.
+    A local record which differs from the manifest while being newer than it, a
+    record written again since, is never replaced : it is logged and counted as
+    kept, to be uploaded with `push`.
+
+    With `push`, the records of the tested modules are uploaded at the end of the
+    session when the store doesn't have them yet, and the manifest is updated.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._url)
+
+    @property
+    def push_enabled(self) -> bool:
+        return self.enabled and self._push
+
+    def __init__(self) -> None:
+        self._pool: Any = None
+        self._lock = threading.Lock()
+        self.configure()
+
+    def configure(
+        self,
+        url: Optional[str] = None,
+        manifest_path: Optional[Path] = None,
+        cache_folder_path: Optional[Path] = None,
+        cache_max_bytes: int = 0,
+        workers: int = 8,
+        push: bool = False,
+        timeout: float = 30.0,
+    ) -> None:
+        self.close()
+        self._url = (url or "").rstrip("/")
+        self._manifest_path = Path(manifest_path or "record_manifest.json").resolve()
+        self._cache_folder_path = cache_folder_path
+        self._cache_max_bytes = cache_max_bytes
+        self._workers = max(workers, 1)
+        self._push = push
+        self._timeout = timeout
+        self._count_map = {
+            "fetched": 0,
+            "cached": 0,
+            "unchanged": 0,
+            "kept": 0,
+            "pushed": 0,
+        }
+        # Manifest entries to write, None for a removed record
+        self._update_map: Dict[str, Optional[str]] = {}
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.clear()
+            self._pool = None
+
+    def _pool_manager(self) -> Any:
+        # pylint: disable=import-outside-toplevel
+        import urllib3
+
+        with self._lock:
+            if self._pool is None:
+                self._pool = urllib3.PoolManager(
+                    maxsize=self._workers,
+                    block=True,
+                    timeout=urllib3.Timeout(total=self._timeout),
+                    retries=urllib3.Retry(
+                        total=3,
+                        backoff_factor=0.2,
+                        status_forcelist=(500, 502, 503, 504),
+                        # Content addressed : every request is idempotent
+                        allowed_methods=None,
+                    ),
+                )
+            return self._pool
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._count_map[name] += 1
+
+    def _key_of(self, record_file_path: Path) -> str:
+        return (
+            record_file_path.resolve()
+            .relative_to(self._manifest_path.parent)
+            .as_posix()
+        )
+
+    def _record_file_path_of(self, key: str) -> Path:
+        return self._manifest_path.parent / key
+
+    def _blob_url(self, digest: str) -> str:
+        return f"{self._url}/{digest}"
+
+    def _cache_path(self, digest: str) -> Optional[Path]:
+        if self._cache_folder_path is None or self._cache_max_bytes <= 0:
+            return None
+        return self._cache_folder_path / digest[:2] / digest
+
+    def load_manifest(self) -> Dict[str, str]:
+        if not self._manifest_path.is_file():
+            return {}
+
+        data = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        if data.get("version") != MANIFEST_VERSION:
+            raise RuntimeError(
+                f"Unsupported record manifest version : {data.get('version')!r}, "
+                f"expected {MANIFEST_VERSION} in {self._manifest_path}"
+            )
+
+        return data.get("records", {})
+
+    def write_manifest(self) -> None:
+        """Writes the pending manifest entries, if they change the manifest."""
+
+        with self._lock:
+            update_map, self._update_map = self._update_map, {}
+        if not update_map:
+            return
+
+        record_map = self.load_manifest()
+        for key, digest in update_map.items():
+            if digest is None:
+                record_map.pop(key, None)
+            else:
+                record_map[key] = digest
+
+        data = json.dumps(
+            {"version": MANIFEST_VERSION, "records": dict(sorted(record_map.items()))},
+            indent=2,
+        )
+        data += "\n"
+        if self._manifest_path.is_file() and RecordWriter.is_unchanged(
+            record_file_path=self._manifest_path, data=data.encode("utf-8")
+        ):
+            return
+        RecordWriter.write_atomic(
+            record_file_path=self._manifest_path, data=data.encode("utf-8")
+        )
+
+    def _get(self, digest: str) -> bytes:
+        cache_path = self._cache_path(digest)
+        if cache_path is not None and cache_path.is_file():
+            data = cache_path.read_bytes()
+            if sha256(data).hexdigest() == digest:
+                # The modification time orders the cache, most recently used last
+                with suppress(FileNotFoundError):
+                    os.utime(cache_path)
+                self._count("cached")
+                return data
+
+        response = self._pool_manager().request("GET", self._blob_url(digest))
+        if response.status != 200:
+            raise RuntimeError(
+                f"Cannot fetch record {digest} from the record store : HTTP {response.status}"
+            )
+        data = response.data
+        if sha256(data).hexdigest() != digest:
+            raise RuntimeError(f"Record {digest} from the record store is corrupted.")
+
+        if cache_path is not None:
+            RecordWriter.write_atomic(record_file_path=cache_path, data=data)
+        self._count("fetched")
+        return data
+
+    def _fetch(
+        self, record_file_path: Path, digest: str, manifest_mtime_ns: int
+    ) -> None:
+        if record_file_path.is_file():
+            if digest_of_file(record_file_path) == digest:
+                self._count("unchanged")
+                return
+            if record_file_path.stat().st_mtime_ns > manifest_mtime_ns:
+                logger.warning(
+                    "Record newer than the manifest kept%s : %s",
+                    ", to be pushed" if self._push else "",
+                    record_file_path,
+                )
+                self._count("kept")
+                return
+
+        RecordWriter.write_atomic(
+            record_file_path=record_file_path, data=self._get(digest)
+        )
+
+    def _put(self, record_file_path: Path) -> str:
+        digest = digest_of_file(record_file_path)
+        pool = self._pool_manager()
+        url = self._blob_url(digest)
+
+        if pool.request("HEAD", url).status != 200:
+            # The file is streamed, urllib3 rewinds it for a retry
+            with record_file_path.open(mode="rb") as file:
+                response = pool.request(
+                    "PUT",
+                    url,
+                    body=file,
+                    headers={
+                        "Content-Type": "application/octet-stream",
+                        "Content-Length": str(os.fstat(file.fileno()).st_size),
+                    },
+                )
+            if response.status not in (200, 201, 204):
+                raise RuntimeError(
+                    f"Cannot push record {digest} to the record store : HTTP {response.status}"
+                )
+            self._count("pushed")
+
+        return digest
+
+    def _run(
+        self, function: Callable[..., Any], argument_list: Sequence[Tuple[Any, ...]]
+    ) -> Tuple[List[Any], ErrorList]:
+        """Runs `function` on the worker pool, returns its results and its errors."""
+
+        if not argument_list:
+            return [], []
+
+        result_list: List[Any] = []
+        error_list: ErrorList = []
+        with ThreadPoolExecutor(
+            max_workers=min(self._workers, len(argument_list)),
+            thread_name_prefix="pytest_recorder_store",
+        ) as executor:
+            future_list = [
+                (arguments[0], executor.submit(function, *arguments))
+                for arguments in argument_list
+            ]
+            for record_file_path, future in future_list:
+                error = future.exception()
+                if error is None:
+                    result_list.append(future.result())
+                else:
+                    logger.error("Record store failed : %s", record_file_path)
+                    result_list.append(None)
+                    error_list.append((record_file_path, error))
+
+        return result_list, error_list
+
+    def _module_set_of(self, module_path_list: Iterable[Path]) -> Set[Path]:
+        return {Path(module_path).resolve() for module_path in module_path_list}
+
+    def fetch(self, module_path_list: Iterable[Path]) -> ErrorList:
+        """Writes the records of the test modules listed in the manifest."""
+
+        module_set = self._module_set_of(module_path_list)
+        record_map = self.load_manifest()
+        manifest_mtime_ns = self._manifest_path.stat().st_mtime_ns if record_map else 0
+        argument_list = []
+        for key, digest in record_map.items():
+            record_file_path = self._record_file_path_of(key)
+            if module_path_of(record_file_path) in module_set:
+                argument_list.append((record_file_path, digest, manifest_mtime_ns))
+
+        _, error_list = self._run(self._fetch, argument_list)
+        self.trim_cache()
+
+        return error_list
+
+    def push(self, module_path_list: Iterable[Path]) -> ErrorList:
+        """Uploads the records of the test modules, the manifest is updated by `write_manifest`."""
+
+        module_set = self._module_set_of(module_path_list)
+        argument_list = [
+            (record_file_path,)
+            for module_path in sorted(module_set)
+            for record_file_path in module_record_path_list(module_path)
+        ]
+        digest_list, error_list = self._run(self._put, argument_list)
+
+        update_map: Dict[str, Optional[str]] = {
+            key: None
+            for key in self.load_manifest()
+            if module_path_of(self._record_file_path_of(key)) in module_set
+        }
+        for (record_file_path,), digest in zip(argument_list, digest_list):
+            key = self._key_of(record_file_path)
+            if digest is None:
+                # Keep the manifest entry of a record which couldn't be pushed
+                update_map.pop(key, None)
+            else:
+                update_map[key] = digest
+        self.merge({"update": update_map})
+
+        return error_list
+
+    def trim_cache(self) -> None:
+        """Removes the least recently used cache files beyond `cache_max_bytes`."""
+
+        if self._cache_folder_path is None or not self._cache_folder_path.is_dir():
+            return
+
+        entry_list = []
+        for cache_path in self._cache_folder_path.glob("*/*"):
+            with suppress(FileNotFoundError):
+                stat = cache_path.stat()
+                entry_list.append((stat.st_mtime_ns, stat.st_size, cache_path))
+
+        byte_count = sum(size for _, size, _ in entry_list)
+        for _, size, cache_path in sorted(entry_list):
+            if byte_count <= self._cache_max_bytes:
+                break
+            with suppress(FileNotFoundError):
+                cache_path.unlink()
+            byte_count -= size
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"count": dict(self._count_map), "update": dict(self._update_map)}
+
+    def merge(self, data: Optional[Dict[str, Any]]) -> None:
+        """Adds the counts and manifest entries of another process, a pytest-xdist worker for instance."""
+
+        data = data or {}
+        with self._lock:
+            for name, count in data.get("count", {}).items():
+                self._count_map[name] = self._count_map.get(name, 0) + count
+            self._update_map.update(data.get("update", {}))
+
+    def summary(self) -> str:
+        count_map = self.to_dict()["count"]
+        return "record store : " + ", ".join(
+            f"{count} {name}" for name, count in count_map.items()
+        )
+
+
+record_store = RecordStore()
@@ -0,0 +1,271 @@
+# IMPORT STANDARD
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple, Type
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, Windows
+    fcntl = None  # type: ignore
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+logger = logging.getLogger(__name__)
+
+ANY_HOST = "*"
+TRANSIENT_STATUS_SET = {429, 500, 502, 503, 504}
+
+# (status code, headers) of a response, as returned by the recorders' `status_of`.
+StatusOf = Callable[[Any], Tuple[int, Mapping[str, str]]]
+
+
+def parse_rate_limit(value: str) -> Tuple[str, float, float]:
+    """Parses `HOST=RATE[/BURST]`, RATE being in requests per second."""
+
+    match = re.fullmatch(
+        r"(?P<host>[^=]+)=(?P<rate>[\d.]+)(?:/(?P<burst>[\d.]+))?", value
+    )
+    if match is None:
+        raise ValueError(f"Expected HOST=RATE[/BURST], got : {value!r}")
+
+    rate = float(match["rate"])
+    burst = float(match["burst"]) if match["burst"] else max(1.0, rate)
+    if rate <= 0 or burst < 1:
+        raise ValueError(f"RATE must be positive and BURST at least 1 : {value!r}")
+
+    return match["host"].strip().lower(), rate, burst
+
+
+def host_of(url: Any) -> str:
+    return (urlparse(str(url)).hostname or "").lower()
+
+
+class RecordThrottle:
+    """
+    Rate limits and retries the requests sent while recording.
+
+    Each host has a token bucket : `rate` tokens per second, at most `burst` of them.
+    The bucket state lives in a file of `folder_path`, locked with `fcntl.flock`
+    while it is updated, so every process of the session, xdist workers included,
+    draws from the same buckets. Without `fcntl` the buckets are only shared by the
+    threads of the process.
+
+    A request failing with a transient status or error is sent again up to
+    `retries` times, after an exponential backoff with jitter or the delay given
+    by the `Retry-After` header.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._rate_map) or self._retries > 0
+
+    @property
+    def retries(self) -> int:
+        return self._retries
+
+    def __init__(self) -> None:
+        self._rate_map: Dict[str, Tuple[float, float]] = {}
+        self._folder_path: Optional[Path] = None
+        self._retries = 0
+        self._backoff = 0.5
+        self._max_delay = 30.0
+        self._lock = threading.Lock()
+        self._memory_state_map: Dict[str, Dict[str, float]] = {}
+
+    def configure(
+        self,
+        rate_limit_list: Optional[list] = None,
+        folder_path: Optional[Path] = None,
+        retries: int = 0,
+        backoff: float = 0.5,
+        max_delay: float = 30.0,
+    ) -> None:
+        self._rate_map = {}
+        for host, rate, burst in map(parse_rate_limit, rate_limit_list or []):
+            self._rate_map[host] = (rate, burst)
+        self._folder_path = folder_path
+        self._retries = retries
+        self._backoff = backoff
+        self._max_delay = max_delay
+        self._memory_state_map.clear()
+
+    def rate_of(self, host: str) -> Optional[Tuple[float, float]]:
+        return self._rate_map.get(host, self._rate_map.get(ANY_HOST))
+
+    @contextlib.contextmanager
+    def _locked_state(self, host: str) -> Iterator[Dict[str, float]]:
+        if fcntl is None or self._folder_path is None:
+            with self._lock:
+                yield self._memory_state_map.setdefault(host, {})
+            return
+
+        self._folder_path.mkdir(parents=True, exist_ok=True)
+        file_name = re.sub(r"[^\w.-]+", "_", host or "_") + ".bucket"
+        with open(self._folder_path / file_name, "a+", encoding="utf-8") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                state = json.loads(content) if content else {}
+                yield state
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps(state))
+                file.flush()
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def reserve(self, host: str) -> float:
+        """Takes a token for `host`, returns 0 or the seconds to wait before trying again."""
+
+        rate_burst = self.rate_of(host)
+        if rate_burst is None:
+            return 0.0
+
+        rate, burst = rate_burst
+        with self._locked_state(host) as state:
+            now = time.time()
+            tokens = state.get("tokens", burst)
+            elapsed = max(0.0, now - state.get("timestamp", now))
+            tokens = min(burst, tokens + elapsed * rate)
+            state["timestamp"] = now
+
+            if tokens >= 1:
+                state["tokens"] = tokens - 1
+                return 0.0
+
+            state["tokens"] = tokens
+            return (1 - tokens) / rate
+
+    def acquire(self, host: str) -> None:
+        delay = self.reserve(host)
+        while delay > 0:
+            time.sleep(delay)
+            delay = self.reserve(host)
+
+    async def acquire_async(self, host: str) -> None:
+        # The reservation may wait on the file lock, out of the event loop
+        delay = await asyncio.to_thread(self.reserve, host)
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = await asyncio.to_thread(self.reserve, host)
+
+    def retry_delay(self, attempt: int, headers: Optional[Mapping] = None) -> float:
+        retry_after = (headers or {}).get("Retry-After") or (headers or {}).get(
+            "retry-after"
+        )
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(self._max_delay, max(0.0, delay))
+
+        delay = min(self._max_delay, self._backoff * 2**attempt)
+        return random.uniform(delay / 2, delay)
+
+    def _next_delay(
+        self,
+        attempt: int,
+        result: Any,
+        status_of: Optional[StatusOf],
+        discard: Optional[Callable[[Any], None]],
+    ) -> Optional[float]:
+        """Seconds to wait before sending again, None when `result` is final."""
+
+        if status_of is None or attempt >= self._retries:
+            return None
+
+        status, headers = status_of(result)
+        if status not in TRANSIENT_STATUS_SET:
+            return None
+
+        if discard is not None:
+            discard(result)
+        logger.info(
+            "Transient status %s, retry %s/%s", status, attempt + 1, self._retries
+        )
+        return self.retry_delay(attempt=attempt, headers=headers)
+
+    def send(
+        self,
+        url: Any,
+        send: Callable[[], Any],
+        status_of: Optional[StatusOf] = None,
+        error_types: Tuple[Type[BaseException], ...] = (),
+        discard: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """
+        Calls `send` once a token is available for the host of `url`.
+
+        `send` is called again when it raises one of `error_types`, or when `status_of`
+        gives a transient status for its result, which is then passed to `discard`.
+        """
+
+        host = host_of(url)
+        attempt = 0
+        while True:
+            self.acquire(host)
+            try:
+                result = send()
+            except error_types as error:
+                if attempt >= self._retries:
+                    raise
+                logger.info("%r, retry %s/%s", error, attempt + 1, self._retries)
+                delay = self.retry_delay(attempt=attempt)
+            else:
+                next_delay = self._next_delay(attempt, result, status_of, discard)
+                if next_delay is None:
+                    return result
+                delay = next_delay
+
+            attempt += 1
+            time.sleep(delay)
+
+    async def send_async(
+        self,
+        url: Any,
+        send: Callable[[], Any],
+        status_of: Optional[StatusOf] = None,
+        error_types: Tuple[Type[BaseException], ...] = (),
+        discard: Optional[Callable[[Any], None]] = None,
+    ) -> Any:
+        """Same as `send` for a coroutine function `send`."""
+
+        host = host_of(url)
+        attempt = 0
+        while True:
+            await self.acquire_async(host)
+            try:
+                result = await send()
+            except error_types as error:
+                if attempt >= self._retries:
+                    raise
+                logger.info("%r, retry %s/%s", error, attempt + 1, self._retries)
+                delay = self.retry_delay(attempt=attempt)
+            else:
+                next_delay = self._next_delay(attempt, result, status_of, discard)
+                if next_delay is None:
+                    return result
+                delay = next_delay
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+record_throttle = RecordThrottle()
@@ -6,10 +6,12 @@ from pathlib import Path
 
 # IMPORT THIRD-PARTY
 import pytest
-import time_machine
 from _pytest.fixtures import SubRequest
 
 # IMPORT INTERNAL
+from pytest_recorder.record_crypt import record_cipher
+from pytest_recorder.record_io import record_writer
+from pytest_recorder.record_stats import RecordPhase, record_stats
 from pytest_recorder.record_type import RecordType
 
 logger = logging.getLogger(__name__)
@@ -41,10 +43,10 @@ class TravelHandler:
     def load_travel(record_file_path: Path) -> TravelModel:
         if record_file_path.exists():
             logger.debug("Loading record file : %s", record_file_path)
-            with record_file_path.open(
-                mode="r", encoding="utf-8", newline="\n"
-            ) as file:
-                data = json.load(file)
+            with record_stats.measure(RecordType.time.name, RecordPhase.load):
+                data = json.loads(
+                    record_cipher.read_text(record_file_path, newline="\n")
+                )
 
             if isinstance(data, dict) and "isoformat" in data and "tick" in data:
                 isoformat = data["isoformat"]
@@ -69,16 +71,15 @@ class TravelHandler:
         travel: TravelModel,
         record_file_path: Path,
     ):
-        logger.debug("Making record folder : %s", record_file_path.parent)
-        record_file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        data = {
-            "isoformat": travel.dt.isoformat(),
-            "tick": travel.tick,
-        }
-        with record_file_path.open(mode="w", encoding="utf-8", newline="\n") as file:
-            logger.debug("Writing record file : %s", record_file_path)
-            json.dump(data, file)
+        with record_stats.measure(RecordType.time.name, RecordPhase.serialize):
+            data = json.dumps(
+                {
+                    "isoformat": travel.dt.isoformat(),
+                    "tick": travel.tick,
+                }
+            )
+        with record_stats.measure(RecordType.time.name, RecordPhase.persist):
+            record_writer.write(record_file_path=record_file_path, data=data)
 
 
 class RecordFilePathBuilder:
@@ -102,15 +103,18 @@ def record_time_context_manager(
     marker = request.node.get_closest_marker("record_time")
 
     if marker:
+        import time_machine  # pylint: disable=import-outside-toplevel
+
         record_no_overwrite = request.config.getoption("--record-no-overwrite")
         record_type = request.config.getoption("--record")
         test_function = request.node.name
         test_module_path = Path(request.node.fspath)  # PYTEST 6.2.2 COMPATIBILITY
 
-        record_file_path = RecordFilePathBuilder.build(
-            test_module_path=test_module_path,
-            test_function=test_function,
-        )
+        with record_stats.measure(RecordType.time.name, RecordPhase.path):
+            record_file_path = RecordFilePathBuilder.build(
+                test_module_path=test_module_path,
+                test_function=test_function,
+            )
 
         if (RecordType.all in record_type or RecordType.time in record_type) and not (
             record_file_path.exists() and record_no_overwrite
@@ -149,6 +153,4 @@ def record_time_context_manager(
         yield None
 
 
-record_fixture = pytest.fixture(name="record_time", autouse=True)(
-    record_time_context_manager
-)
+record_fixture = pytest.fixture(name="record_time")(record_time_context_manager)
@@ -11,6 +11,9 @@ import pytest
 from _pytest.fixtures import SubRequest
 
 # IMPORT INTERNAL
+from pytest_recorder.record_crypt import record_cipher
+from pytest_recorder.record_io import record_writer
+from pytest_recorder.record_stats import RecordPhase, record_stats
 from pytest_recorder.record_type import RecordType
 
 logger = logging.getLogger(__name__)
@@ -92,12 +95,10 @@ class ObjectCollectorHandler:
 
     @classmethod
     def persist(cls, record_model: ObjectCollector, record_file_path: Path):
-        logger.debug("Making record folder : %s", record_file_path.parent)
-        record_file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with record_file_path.open(mode="w", encoding="utf-8", newline="\n") as file:
-            logger.debug("Writing record file : %s", record_file_path)
-            json.dump(record_model.object_list, file)
+        with record_stats.measure(RecordType.object.name, RecordPhase.serialize):
+            data = json.dumps(record_model.object_list)
+        with record_stats.measure(RecordType.object.name, RecordPhase.persist):
+            record_writer.write(record_file_path=record_file_path, data=data)
 
     @staticmethod
     def load_record_model(
@@ -106,10 +107,10 @@ class ObjectCollectorHandler:
     ) -> ObjectCollector:
         if record_file_path.exists():
             logger.debug("Loading record file : %s", record_file_path)
-            with record_file_path.open(
-                mode="r", encoding="utf-8", newline="\n"
-            ) as file:
-                object_list = json.load(file)
+            with record_stats.measure(RecordType.object.name, RecordPhase.load):
+                object_list = json.loads(
+                    record_cipher.read_text(record_file_path, newline="\n")
+                )
         else:
             raise AttributeError(
                 f"Cannot load record file : {record_file_path}",
@@ -189,15 +190,17 @@ def record_context_manager(
     if record_no_hash:
         record.hash_only = False
 
-    record_file_path = RecordFilePathBuilder.build(
-        test_module_path=test_module_path,
-        test_function=test_function,
-        hash_only=record.hash_only,
-    )
+    with record_stats.measure(RecordType.object.name, RecordPhase.path):
+        record_file_path = RecordFilePathBuilder.build(
+            test_module_path=test_module_path,
+            test_function=test_function,
+            hash_only=record.hash_only,
+        )
 
-    record_formatted = ObjectCollectorHandler.jsonify_and_hash_record_data(
-        record_model=record,
-    )
+    with record_stats.measure(RecordType.object.name, RecordPhase.hash):
+        record_formatted = ObjectCollectorHandler.jsonify_and_hash_record_data(
+            record_model=record,
+        )
 
     if (RecordType.all in record_type or RecordType.object in record_type) and not (
         record_file_path.exists() and record_no_overwrite
@@ -212,11 +215,12 @@ def record_context_manager(
             record_file_path=record_file_path,
         )
 
-        ObjectCollectorHandler.verify(
-            record_current=record_formatted,
-            record_loaded=record_loaded,
-            record_file_path=record_file_path,
-        )
+        with record_stats.measure(RecordType.object.name, RecordPhase.match):
+            ObjectCollectorHandler.verify(
+                record_current=record_formatted,
+                record_loaded=record_loaded,
+                record_file_path=record_file_path,
+            )
     else:
         raise AttributeError(
             f"No record to compare with the collected objects : {record_file_path}",
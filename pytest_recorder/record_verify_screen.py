@@ -10,6 +10,9 @@ from _pytest.capture import CaptureResult, MultiCapture, SysCapture
 from _pytest.fixtures import SubRequest
 
 # IMPORT INTERNAL
+from pytest_recorder.record_crypt import record_cipher
+from pytest_recorder.record_io import record_writer
+from pytest_recorder.record_stats import RecordPhase, record_stats
 from pytest_recorder.record_type import RecordType
 
 logger = logging.getLogger(__name__)
@@ -26,7 +29,8 @@ class CaptureResultHandler:
     @staticmethod
     def hash_output(capture_result: CaptureResult) -> CaptureResult:
         out = capture_result.out
-        out_hash = sha256(out.encode()).hexdigest()
+        with record_stats.measure(RecordType.screen.name, RecordPhase.hash):
+            out_hash = sha256(out.encode()).hexdigest()
         err = capture_result.err
         capture_result_hash = CaptureResult(out=out_hash, err=err)
 
@@ -36,10 +40,10 @@ class CaptureResultHandler:
     def load_capture_result(record_file_path: Path) -> CaptureResult:
         if record_file_path.exists():
             logger.debug("Loading record file : %s", record_file_path)
-            with record_file_path.open(
-                mode="r", encoding="utf-8", newline="\n"
-            ) as file:
-                data = json.load(file)
+            with record_stats.measure(RecordType.screen.name, RecordPhase.load):
+                data = json.loads(
+                    record_cipher.read_text(record_file_path, newline="\n")
+                )
 
             if isinstance(data, dict):
                 out = data.get("out", "")
@@ -61,16 +65,15 @@ class CaptureResultHandler:
         capture_result: CaptureResult,
         record_file_path: Path,
     ):
-        logger.debug("Making record folder : %s", record_file_path.parent)
-        record_file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        data = {
-            "out": capture_result.out,
-            "err": capture_result.err,
-        }
-        with record_file_path.open(mode="w", encoding="utf-8", newline="\n") as file:
-            logger.debug("Writing record file : %s", record_file_path)
-            json.dump(data, file)
+        with record_stats.measure(RecordType.screen.name, RecordPhase.serialize):
+            data = json.dumps(
+                {
+                    "out": capture_result.out,
+                    "err": capture_result.err,
+                }
+            )
+        with record_stats.measure(RecordType.screen.name, RecordPhase.persist):
+            record_writer.write(record_file_path=record_file_path, data=data)
 
     @staticmethod
     def verify(
@@ -115,10 +118,11 @@ def record_screen_context_manager(
         test_function = request.node.name
         test_module_path = Path(request.node.fspath)  # PYTEST 6.2.2 COMPATIBILITY
 
-        record_file_path = RecordFilePathBuilder.build(
-            test_module_path=test_module_path,
-            test_function=test_function,
-        )
+        with record_stats.measure(RecordType.screen.name, RecordPhase.path):
+            record_file_path = RecordFilePathBuilder.build(
+                test_module_path=test_module_path,
+                test_function=test_function,
+            )
 
         if capture == "no":
             global_capturing = MultiCapture(
@@ -152,11 +156,12 @@ def record_screen_context_manager(
             capture_result_loaded = CaptureResultHandler.load_capture_result(
                 record_file_path=record_file_path
             )
-            CaptureResultHandler.verify(
-                capture_result=capture_result,
-                capture_result_loaded=capture_result_loaded,
-                record_file_path=record_file_path,
-            )
+            with record_stats.measure(RecordType.screen.name, RecordPhase.match):
+                CaptureResultHandler.verify(
+                    capture_result=capture_result,
+                    capture_result_loaded=capture_result_loaded,
+                    record_file_path=record_file_path,
+                )
         else:
             raise AttributeError(
                 f"No screen output recording to compare with the current result : {record_file_path}",
@@ -166,6 +171,6 @@ def record_screen_context_manager(
         yield None
 
 
-record_fixture = pytest.fixture(name="record_verify_screen", autouse=True)(
+record_fixture = pytest.fixture(name="record_verify_screen")(
     record_screen_context_manager
 )
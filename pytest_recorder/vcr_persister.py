@@ -0,0 +1,73 @@
+# IMPORT STANDARD
+from pathlib import Path
+
+# IMPORT THIRD-PARTY
+from vcr.persisters.filesystem import (
+    CassetteDecodeError,
+    CassetteNotFoundError,
+    FilesystemPersister,
+    deserialize,
+    serialize,
+)
+
+# IMPORT INTERNAL
+from pytest_recorder.record_cache import record_cache
+from pytest_recorder.record_dedup import record_dedup
+from pytest_recorder.record_io import record_writer
+from pytest_recorder.record_stats import RecordPhase, record_stats
+from pytest_recorder.record_type import RecordType
+
+
+class DedupSerializer:
+    """Collapses the repeated interactions of the cassettes written by `serializer`."""
+
+    def __init__(self, serializer) -> None:
+        self._serializer = serializer
+
+    def deserialize(self, cassette_string):
+        data = self._serializer.deserialize(cassette_string)
+        if isinstance(data, dict) and "interactions" in data:
+            data["interactions"] = record_dedup.expand(data["interactions"])
+        return data
+
+    def serialize(self, cassette_dict):
+        cassette_dict["interactions"] = record_dedup.collapse(
+            cassette_dict["interactions"]
+        )
+        return self._serializer.serialize(cassette_dict)
+
+
+class VCRFilesystemPersister(FilesystemPersister):
+    def __init__(self, recorder: str = RecordType.http.name) -> None:
+        self.recorder = recorder
+
+    def load_cassette(self, cassette_path, serializer):
+        cassette_path = Path(cassette_path)
+        if not cassette_path.is_file():
+            raise CassetteNotFoundError()
+
+        with record_stats.measure(self.recorder, RecordPhase.load):
+            try:
+                return record_cache.load(
+                    record_file_path=cassette_path,
+                    parse=lambda data: deserialize(data, DedupSerializer(serializer)),
+                    kind=f"vcr.{id(serializer)}",
+                )
+            except UnicodeDecodeError as error:
+                raise CassetteDecodeError(
+                    "Can't read Cassette, Encoding is broken"
+                ) from error
+
+    def save_cassette(self, cassette_path, cassette_dict, serializer):
+        with record_stats.measure(self.recorder, RecordPhase.serialize):
+            data = serialize(cassette_dict, DedupSerializer(serializer))
+        cassette_path = Path(cassette_path).resolve()
+        with record_stats.measure(self.recorder, RecordPhase.persist):
+            record_writer.write(record_file_path=cassette_path, data=data)
+
+
+class VCRRecordingPersister(VCRFilesystemPersister):
+    """Ignores the existing cassette so it is recorded again, then only rewritten if it changed."""
+
+    def load_cassette(self, cassette_path, serializer):
+        raise CassetteNotFoundError()
@@ -0,0 +1,38 @@
+# IMPORT STANDARD
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+BENCHMARK_PATH = Path(__file__).parents[2] / "benchmarks"
+
+
+def test_bench_recorders_smoke():
+    # The fixtures run outside of pytest there, with the stand-in options
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "bench_recorders.py",
+            "--interactions",
+            "1",
+            "--body-sizes",
+            "1KB",
+            "--rows",
+            "100",
+            "--rounds",
+            "1",
+            "--no-memory",
+        ],
+        cwd=BENCHMARK_PATH,
+        capture_output=True,
+        text=True,
+        timeout=300,
+        check=False,
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    assert json.loads(completed.stdout)["cases"]
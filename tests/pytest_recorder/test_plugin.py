@@ -0,0 +1,96 @@
+# IMPORT STANDARD
+import pstats
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+
+pytest_plugins = ["pytester"]
+
+
+def test_marker_requests_recorder_fixture(pytester):
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.record_time(tick=False)
+        def test_marked():
+            pass
+
+        def test_unmarked():
+            pass
+        """
+    )
+
+    result = pytester.runpytest("--setup-plan")
+
+    result.stdout.fnmatch_lines(
+        [
+            "*::test_marked (fixtures used: *record_time*",
+            "*::test_unmarked*",
+        ]
+    )
+    result.stdout.no_fnmatch_line("*::test_unmarked (fixtures used: *record_*")
+
+
+def test_record_profile_writes_reports(pytester):
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def body_function():
+            return sum(range(10))
+
+        @pytest.mark.record_time(tick=False)
+        def test_profiled(record):
+            body_function()
+            record.add_verify({"key": "value"})
+
+        def test_unprofiled():
+            body_function()
+        """
+    )
+
+    result = pytester.runpytest(
+        "--record=all", "--record-profile", "--record-profile-dir=profile"
+    )
+
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["*recorder profile*", "1 tests profiled in *"])
+    profile_path = pytester.path / "profile"
+    assert sorted(path.name for path in profile_path.iterdir()) == [
+        "session.alloc.txt",
+        "session.pstats",
+        "test_record_profile_writes_reports.py_test_profiled.alloc.txt",
+        "test_record_profile_writes_reports.py_test_profiled.pstats",
+    ]
+    stats = pstats.Stats(str(profile_path / "session.pstats"))
+    function_name_set = {name for _, _, name in stats.stats}
+    assert "record_time_context_manager" in function_name_set
+    assert "body_function" not in function_name_set
+
+
+def test_record_profile_body(pytester):
+    pytester.makepyfile(
+        """
+        import pytest
+
+        def body_function():
+            return sum(range(10))
+
+        @pytest.mark.record_time(tick=False)
+        def test_profiled():
+            body_function()
+        """
+    )
+
+    result = pytester.runpytest(
+        "--record=all",
+        "--record-profile",
+        "--record-profile-body",
+        "--record-profile-dir=profile",
+    )
+
+    result.assert_outcomes(passed=1)
+    stats = pstats.Stats(str(pytester.path / "profile" / "session.pstats"))
+    assert "body_function" in {name for _, _, name in stats.stats}
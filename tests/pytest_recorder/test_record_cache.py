@@ -0,0 +1,56 @@
+# IMPORT STANDARD
+import os
+
+# IMPORT THIRD-PARTY
+import yaml
+
+# IMPORT INTERNAL
+from pytest_recorder.record_cache import RecordCache
+
+
+def test_record_cache_parses_records_once(tmp_path):
+    record_cache = RecordCache()
+    record_cache.configure(max_bytes=1024)
+    record_file_path = tmp_path / "test_cache.yaml"
+    record_file_path.write_text("interactions:\n- url: a\n", encoding="utf-8")
+
+    data = record_cache.load(record_file_path=record_file_path, parse=yaml.safe_load)
+
+    assert record_cache.load(record_file_path, parse=yaml.safe_load) is data
+
+    mutable_data = record_cache.load(
+        record_file_path, parse=yaml.safe_load, mutable=True
+    )
+    mutable_data["interactions"].clear()
+
+    assert record_cache.load(record_file_path, parse=yaml.safe_load) == {
+        "interactions": [{"url": "a"}]
+    }
+    assert record_cache.to_dict() == {
+        "hits": 3,
+        "misses": 1,
+        "parsed_bytes": record_file_path.stat().st_size,
+    }
+
+    record_file_path.write_text("interactions: []\n", encoding="utf-8")
+    os.utime(record_file_path, ns=(0, 0))
+
+    assert record_cache.load(record_file_path, parse=yaml.safe_load) == {
+        "interactions": []
+    }
+    assert record_cache.to_dict()["misses"] == 2
+
+
+def test_record_cache_drops_least_recently_used(tmp_path):
+    record_cache = RecordCache()
+    record_cache.configure(max_bytes=10)
+    for name in "abc":
+        (tmp_path / name).write_text("12345", encoding="utf-8")
+
+    for name in "abac":
+        record_cache.load(record_file_path=tmp_path / name, parse=str)
+    record_cache.load(record_file_path=tmp_path / "a", parse=str)
+    record_cache.load(record_file_path=tmp_path / "b", parse=str)
+
+    assert record_cache.to_dict()["hits"] == 2
+    assert record_cache.to_dict()["misses"] == 4
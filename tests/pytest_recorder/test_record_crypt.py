@@ -0,0 +1,154 @@
+# IMPORT STANDARD
+import base64
+import os
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_crypt import (
+    HEADER_SIZE,
+    KEY_ENV_VAR,
+    MAGIC,
+    TAG_SIZE,
+    RecordCipher,
+    parse_key,
+    record_cipher,
+)
+from pytest_recorder.record_io import RecordWriter, RecordWriteStatus
+
+pytest_plugins = ["pytester"]
+
+KEY = bytes(range(32))
+
+TEST_MODULE = """
+import datetime
+
+import pytest
+
+@pytest.mark.record_time
+def test_time():
+    assert datetime.date.today().year
+
+def test_object(record):
+    record.add_verify(["licensed", "data"])
+"""
+
+
+@pytest.fixture(name="cipher")
+def cipher_fixture():
+    cipher = RecordCipher()
+    cipher.configure(key=KEY, encrypt=True, chunk_size=16)
+    return cipher
+
+
+@pytest.fixture(name="encrypted_writer")
+def encrypted_writer_fixture():
+    record_cipher.configure(key=KEY, encrypt=True)
+    yield RecordWriter()
+    record_cipher.configure()
+
+
+def test_parse_key():
+    assert parse_key(KEY.hex()) == KEY
+    assert parse_key(base64.b64encode(KEY).decode() + "\n") == KEY
+    assert parse_key(base64.urlsafe_b64encode(b"\xfb" * 16).decode()) == b"\xfb" * 16
+    with pytest.raises(AttributeError):
+        parse_key("not a key")
+    with pytest.raises(AttributeError):
+        RecordCipher().configure(encrypt=True)
+
+
+@pytest.mark.parametrize("size", [0, 1, 16, 50])
+def test_encrypt_round_trip(tmp_path, cipher, size):
+    data = os.urandom(size)
+    record_file_path = tmp_path / "test.yaml"
+    record_file_path.write_bytes(cipher.encrypt(data))
+
+    chunk_count = max(1, -(-size // 16))
+    assert record_file_path.stat().st_size == HEADER_SIZE + size + chunk_count * 16
+    assert record_file_path.read_bytes().startswith(MAGIC)
+    assert cipher.read_bytes(record_file_path) == data
+    with record_file_path.open(mode="rb") as file:
+        assert b"".join(cipher.iter_decrypt(file)) == data
+        assert (
+            cipher.read_chunk(file, index=chunk_count - 1)
+            == data[(chunk_count - 1) * 16 :]
+        )
+        with pytest.raises(IndexError):
+            cipher.read_chunk(file, index=chunk_count)
+
+
+def test_encrypted_record_tampering(tmp_path, cipher):
+    data = cipher.encrypt(b"a" * 40)
+    record_file_path = tmp_path / "test.yaml"
+
+    # A flipped byte, a dropped last chunk, a key change are all detected
+    for altered in [
+        data[:-1] + bytes([data[-1] ^ 1]),
+        data[: HEADER_SIZE + 2 * (16 + TAG_SIZE)],
+        data[: HEADER_SIZE + 3],
+    ]:
+        record_file_path.write_bytes(altered)
+        with pytest.raises(RuntimeError):
+            cipher.read_bytes(record_file_path)
+
+    record_file_path.write_bytes(data)
+    other_cipher = RecordCipher()
+    other_cipher.configure(key=bytes(32))
+    with pytest.raises(RuntimeError, match="wrong key"):
+        other_cipher.read_bytes(record_file_path)
+    with pytest.raises(RuntimeError, match=KEY_ENV_VAR):
+        RecordCipher().read_bytes(record_file_path)
+
+
+def test_plain_record_read(tmp_path):
+    record_file_path = tmp_path / "test.json"
+    record_file_path.write_bytes(b'{"a":\r\n1}')
+
+    assert RecordCipher().read_text(record_file_path) == '{"a":\n1}'
+    assert RecordCipher().read_text(record_file_path, newline="\n") == '{"a":\r\n1}'
+
+
+def test_encrypted_writer_unchanged(tmp_path, encrypted_writer):
+    record_file_path = tmp_path / "test.json"
+    record_file_path.write_text('{"tick": true}')
+
+    # A plain record is encrypted even if its content didn't change
+    encrypted_writer.write(record_file_path=record_file_path, data='{"tick": true}')
+    encrypted_data = record_file_path.read_bytes()
+    encrypted_writer.write(record_file_path=record_file_path, data='{"tick": true}')
+
+    assert encrypted_data.startswith(MAGIC)
+    assert record_file_path.read_bytes() == encrypted_data
+    assert record_cipher.read_text(record_file_path) == '{"tick": true}'
+    assert encrypted_writer.status_count == {
+        RecordWriteStatus.updated: 1,
+        RecordWriteStatus.unchanged: 1,
+    }
+
+
+def test_encrypted_records(pytester, monkeypatch):
+    pytester.makepyfile(test_crypt=TEST_MODULE)
+    monkeypatch.setenv(KEY_ENV_VAR, base64.b64encode(KEY).decode())
+
+    pytester.runpytest_subprocess("--record=all", "--record-encrypt").assert_outcomes(
+        passed=2
+    )
+    record_file_path_list = sorted((pytester.path / "record").rglob("*.json"))
+    assert len(record_file_path_list) == 2
+    for record_file_path in record_file_path_list:
+        assert record_file_path.read_bytes().startswith(MAGIC)
+        assert b"licensed" not in record_file_path.read_bytes()
+
+    pytester.runpytest_subprocess().assert_outcomes(passed=2)
+
+    key_file_path = pytester.path / "record.key"
+    key_file_path.write_text(KEY.hex())
+    monkeypatch.delenv(KEY_ENV_VAR)
+    pytester.runpytest_subprocess(f"--record-key-file={key_file_path}").assert_outcomes(
+        passed=2
+    )
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(passed=1, errors=2)
+    result.stdout.fnmatch_lines(["*RuntimeError: Decrypting the records needs a key*"])
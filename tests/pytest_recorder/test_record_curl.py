@@ -0,0 +1,314 @@
+# IMPORT STANDARD
+import http.server
+import threading
+
+# IMPORT THIRD-PARTY
+import pytest
+import yaml
+
+# IMPORT INTERNAL
+from pytest_recorder.record_curl_response import MockResponse
+
+pytest_plugins = ["pytester"]
+
+CURL_MULTI_TEST_MODULE = """
+from io import BytesIO
+
+import pycurl
+import pytest
+
+@pytest.mark.record_curl
+def test_multi():
+    multi = pycurl.CurlMulti()
+    buffer_map = {{}}
+    header_list = []
+    for path in ["/a", "/b", "/c"]:
+        curl = pycurl.Curl()
+        buffer_map[path] = BytesIO()
+        curl.setopt(pycurl.URL, "{url}" + path)
+        curl.setopt(curl.WRITEFUNCTION, buffer_map[path].write)
+        curl.setopt(pycurl.HEADERFUNCTION, header_list.append)
+        multi.add_handle(curl)
+
+    done_list = []
+    num_handles = len(buffer_map)
+    while num_handles:
+        ret, num_handles = multi.perform()
+        if ret == pycurl.E_CALL_MULTI_PERFORM:
+            continue
+        _, ok_list, err_list = multi.info_read()
+        assert not err_list
+        for curl in ok_list:
+            assert curl.getinfo(pycurl.RESPONSE_CODE) == 200
+            multi.remove_handle(curl)
+            done_list.append(curl)
+        if num_handles:
+            multi.select(1.0)
+    _, ok_list, _ = multi.info_read()
+    done_list += ok_list
+
+    assert len(done_list) == 3
+    assert {{path: buffer.getvalue() for path, buffer in buffer_map.items()}} == {{
+        path: path.encode() * 10000 for path in buffer_map
+    }}
+    assert header_list.count(b"\\r\\n") == 3
+"""
+
+STREAM_TEST_MODULE = """
+import asyncio
+
+import curl_cffi.requests
+import pytest
+
+@pytest.mark.record_curl
+def test_stream():
+    with curl_cffi.requests.Session() as session:
+        response = session.get("{url}/csv", stream=True)
+        line_list = list(response.iter_lines())
+        response.close()
+    assert line_list == [b"/csv"] * 10000
+
+@pytest.mark.record_curl
+def test_astream():
+    async def download():
+        async with curl_cffi.requests.AsyncSession() as session:
+            response = await session.get("{url}/csv", stream=True)
+            chunk_list = [chunk async for chunk in response.aiter_content()]
+            await response.aclose()
+            return b"".join(chunk_list)
+
+    assert asyncio.run(download()) == b"/csv\\n" * 10000
+"""
+
+
+def interaction_of(body, headers=None):
+    return {
+        "request": {"method": "GET", "uri": "http://a/", "headers": {}, "body": None},
+        "response": {
+            "status": {"code": 200, "message": "OK"},
+            "headers": headers or {},
+            "body": {"string": body, "encoding": "utf-8"},
+        },
+    }
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            line = self.path.encode()
+            body = (line + b"\n" if line == b"/csv" else line) * 10000
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_curl_multi(pytester, server):
+    pytest.importorskip("pycurl")
+    pytester.makepyfile(test_multi=CURL_MULTI_TEST_MODULE.format(url=server))
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+    pytester.runpytest_subprocess("--record-strict").assert_outcomes(passed=1)
+
+
+def test_mock_response_stream():
+    response = MockResponse(interaction_of("é\nà\n".encode() * 3))
+
+    assert "text" not in vars(response)
+    assert b"".join(response.iter_content(chunk_size=5)) == response.content
+    assert "".join(response.iter_content(chunk_size=1, decode_unicode=True)) == (
+        "é\nà\n" * 3
+    )
+    assert list(response.iter_lines(chunk_size=3)) == ["é".encode(), "à".encode()] * 3
+    assert response.text == "é\nà\n" * 3
+    assert "text" in vars(response)
+
+
+def test_mock_response_encoding():
+    response = MockResponse(
+        interaction_of(
+            "é".encode("latin-1"), headers={"Content-Type": "text/csv; charset=latin-1"}
+        )
+    )
+
+    assert response.encoding == "latin-1"
+    assert response.text == "é"
+
+
+def test_stream(pytester, server):
+    pytester.makepyfile(test_stream=STREAM_TEST_MODULE.format(url=server))
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=2)
+    pytester.runpytest_subprocess("--record-strict").assert_outcomes(passed=2)
+
+
+SHARED_CASSETTE_TEST_MODULE = """
+import curl_cffi.requests
+import pytest
+
+@pytest.mark.record_curl(scope="module")
+def test_mutate():
+    response = curl_cffi.requests.get("{url}/a")
+    response.headers["content-length"] = "0"
+    response.headers["X-Test"] = "mutated"
+
+@pytest.mark.record_curl(scope="module")
+def test_check():
+    headers = curl_cffi.requests.get("{url}/a").headers
+    assert headers["content-length"] == "20000"
+    assert "X-Test" not in headers
+"""
+
+
+def test_mock_response_headers_are_not_shared(pytester, server):
+    pytester.makepyfile(test_shared=SHARED_CASSETTE_TEST_MODULE.format(url=server))
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=2)
+    # Both tests replay the interaction of the cassette parsed once
+    pytester.runpytest_subprocess(
+        "--record-strict", "--record-cache-size=1"
+    ).assert_outcomes(passed=2)
+
+
+REDACT_TEST_MODULE = """
+import os
+import re
+from io import BytesIO
+
+import curl_cffi.requests
+import pycurl
+import pytest
+
+@pytest.fixture
+def vcr_config():
+    return {{
+        "redact_body": [
+            ("/a", "/A"),
+            re.compile(r"/c(sv)?\\n"),
+            ("?pycurl", "?PYCURL"),
+        ]
+    }}
+
+def body_of(recorded, redacted):
+    return redacted if os.environ.get("REDACTED") else recorded
+
+@pytest.mark.record_curl
+def test_redact():
+    with curl_cffi.requests.Session() as session:
+        assert session.get("{url}/a").content == body_of(b"/a", b"/A") * 10000
+        response = session.get("{url}/csv", stream=True)
+        assert b"".join(response.iter_content()) == (
+            body_of(b"/csv\\n", b"[REDACTED]") * 10000
+        )
+        response.close()
+
+    buffer = BytesIO()
+    curl = pycurl.Curl()
+    curl.setopt(pycurl.URL, "{url}/a?pycurl")
+    curl.setopt(pycurl.WRITEDATA, buffer)
+    curl.perform()
+    curl.close()
+    assert buffer.getvalue() == body_of(b"/a?pycurl", b"/A?PYCURL") * 10000
+"""
+
+
+def test_redact_body(pytester, server, monkeypatch):
+    pytest.importorskip("pycurl")
+    pytester.makepyfile(test_redact=REDACT_TEST_MODULE.format(url=server))
+
+    # The test gets the bodies as sent, the cassette keeps them redacted
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+    cassette = yaml.safe_load(
+        (
+            pytester.path / "record" / "curl" / "test_redact" / "test_redact_curl.yaml"
+        ).read_text()
+    )
+    assert [
+        interaction["response"]["body"]["string"]
+        for interaction in cassette["interactions"]
+    ] == [body * 10000 for body in [b"/A", b"[REDACTED]", b"/A?PYCURL"]]
+
+    monkeypatch.setenv("REDACTED", "1")
+    pytester.runpytest_subprocess("--record-strict").assert_outcomes(passed=1)
+
+
+NO_VCR_TEST_MODULE = """
+import sys
+
+import curl_cffi.requests
+import pytest
+
+@pytest.mark.record_curl(vcr=False)
+def test_no_vcr():
+    assert "vcr" not in sys.modules
+    assert curl_cffi.requests.Session().get("{url}/a").content == b"/a" * 10000
+"""
+
+
+def test_record_without_vcr(pytester, server):
+    pytester.makepyfile(test_no_vcr=NO_VCR_TEST_MODULE.format(url=server))
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+    assert (
+        pytester.path / "record" / "curl" / "test_no_vcr" / "test_no_vcr_curl.yaml"
+    ).is_file()
+    pytester.runpytest_subprocess("--record-strict").assert_outcomes(passed=1)
+
+
+INTERCEPTOR_TEST_MODULE = """
+from concurrent.futures import ThreadPoolExecutor
+
+import curl_cffi.requests
+import pytest
+
+request_list = []
+
+@pytest.mark.record_curl
+def test_module_function():
+    request_list.append(curl_cffi.requests.Session.request)
+    assert curl_cffi.requests.get("{url}/a").content == b"/a" * 10000
+
+@pytest.mark.record_curl
+def test_thread():
+    request_list.append(curl_cffi.requests.Session.request)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        content_list = list(
+            executor.map(
+                lambda path: curl_cffi.requests.get("{url}" + path).content,
+                ["/b", "/c"],
+            )
+        )
+    assert content_list == [b"/b" * 10000, b"/c" * 10000]
+
+def test_unmarked():
+    assert curl_cffi.requests.Session.request is request_list[0]
+    assert curl_cffi.requests.Session.request is request_list[1]
+    assert curl_cffi.requests.get("{url}/d").content == b"/d" * 10000
+"""
+
+
+def test_session_wide_interceptors(pytester, server):
+    pytester.makepyfile(test_intercept=INTERCEPTOR_TEST_MODULE.format(url=server))
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=3)
+    record_path = pytester.path / "record" / "curl" / "test_intercept"
+    cassette = yaml.safe_load(
+        (record_path / "test_module_function_curl.yaml").read_text()
+    )
+    assert len(cassette["interactions"]) == 1
+    cassette = yaml.safe_load((record_path / "test_thread_curl.yaml").read_text())
+    assert len(cassette["interactions"]) == 2
+
+    pytester.runpytest_subprocess(
+        "--record-strict", "-k", "not unmarked"
+    ).assert_outcomes(passed=2)
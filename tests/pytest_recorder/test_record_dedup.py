@@ -0,0 +1,97 @@
+# IMPORT STANDARD
+import http.server
+import threading
+
+# IMPORT THIRD-PARTY
+import pytest
+import yaml
+
+# IMPORT INTERNAL
+from pytest_recorder.record_dedup import InteractionList, RecordDedup
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import pytest
+import {client}
+
+@pytest.mark.{marker}
+def test_polling():
+    for path in ["/poll"] * 5 + ["/done", "/poll"]:
+        assert {request} == path.encode()
+"""
+CLIENT_MAP = {
+    "record_http": ("urllib3", "urllib3.request('GET', '{url}' + path).data", "http"),
+    "record_curl": (
+        "curl_cffi.requests",
+        "curl_cffi.requests.Session().get('{url}' + path).content",
+        "curl",
+    ),
+}
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            body = self.path.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_collapse_and_expand():
+    record_dedup = RecordDedup()
+    interaction_list = [{"url": "a"}] * 3 + [{"url": "b"}, {"url": "a"}, {"url": "a"}]
+
+    entry_list = record_dedup.collapse(interaction_list)
+    expanded_list = record_dedup.expand(entry_list)
+
+    assert entry_list == [
+        {"url": "a", "repeat": 3},
+        {"url": "b"},
+        {"same_as": 0, "repeat": 2},
+    ]
+    assert isinstance(expanded_list, InteractionList)
+    assert list(expanded_list) == interaction_list
+    assert len(expanded_list) == 6
+    assert expanded_list[3] == {"url": "b"}
+    assert expanded_list[-1] is expanded_list[0]
+    assert interaction_list[0] == {"url": "a"}
+
+
+def test_expand_keeps_plain_records():
+    record_dedup = RecordDedup()
+    record_dedup.configure(enabled=False)
+    interaction_list = [{"url": "a"}, {"url": "a"}]
+
+    assert record_dedup.collapse(interaction_list) == interaction_list
+    assert record_dedup.expand(interaction_list) is interaction_list
+
+
+@pytest.mark.parametrize("marker", ["record_http", "record_curl"])
+def test_repeated_interactions_are_collapsed(pytester, server, marker):
+    client, request, recorder = CLIENT_MAP[marker]
+    pytester.makepyfile(
+        test_dedup=TEST_MODULE.format(
+            client=client, marker=marker, request=request.format(url=server)
+        )
+    )
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+    pytester.runpytest_subprocess().assert_outcomes(passed=1)
+
+    record_file_path = next((pytester.path / "record" / recorder).glob("*/*.yaml"))
+    entry_list = yaml.safe_load(record_file_path.read_text())["interactions"]
+    assert [entry.get("repeat", 1) for entry in entry_list] == [5, 1, 1]
+    assert entry_list[2] == {"same_as": 0}
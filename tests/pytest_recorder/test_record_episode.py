@@ -0,0 +1,250 @@
+# IMPORT STANDARD
+import ftplib
+import http.server
+import io
+import socket
+import socketserver
+import threading
+import urllib.request
+from collections import Counter
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_episode import EpisodeCounter
+from pytest_recorder.record_ftp import FTPCassette
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import pytest
+import {client}
+
+@pytest.mark.{marker}
+def test_episodes():
+    for path in {path_list!r}:
+        {request}
+"""
+CLIENT_MAP = {
+    "record_http": ("urllib3", "urllib3.request('GET', '{url}' + path)"),
+    "record_curl": ("curl_cffi.requests", "curl_cffi.requests.get('{url}' + path)"),
+}
+
+
+@pytest.fixture(name="ftp_server")
+def ftp_server_fixture():
+    command_list = []
+
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write(f"{line}\r\n".encode())
+
+        def handle(self):
+            command_list.append("connect")
+            self.reply("220 Ready")
+            logged_in = False
+            for raw_line in self.rfile:
+                command, _, argument = raw_line.decode().strip().partition(" ")
+                command_list.append(command)
+                if command == "USER":
+                    self.reply("331 Password required")
+                elif command == "PASS":
+                    logged_in = True
+                    self.reply("230 Logged in")
+                elif command == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                elif not logged_in:
+                    self.reply("530 Not logged in")
+                elif command == "CWD":
+                    self.reply(f"250 {argument}")
+                elif command == "PWD":
+                    self.reply('257 "/dir"')
+                elif command == "TYPE":
+                    self.reply("200 Type set")
+                elif command == "PASV":
+                    data_server = socket.create_server(("127.0.0.1", 0))
+                    data_server.settimeout(5)
+                    port = data_server.getsockname()[1]
+                    self.reply(f"227 Passive (127,0,0,1,{port >> 8},{port & 255})")
+                elif command == "NLST":
+                    self.reply("150 Listing")
+                    connection, _ = data_server.accept()
+                    with connection:
+                        connection.sendall(b"a.txt\r\nb.txt\r\n")
+                    data_server.close()
+                    self.reply("226 Done")
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1], command_list
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    path_counter = Counter()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            path_counter[self.path] += 1
+            body = self.path.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", path_counter
+    server.shutdown()
+    server.server_close()
+
+
+def test_episode_counter():
+    counter = EpisodeCounter()
+    counter.configure(enabled=True)
+    counter.add(recorder="http", replayed=True)
+    counter.add(recorder="http", replayed=False, count=2)
+    counter.add(recorder="ftp", replayed=True, count=3)
+
+    assert counter.count_map() == {
+        "ftp": {"replayed": 3, "recorded": 0},
+        "http": {"replayed": 1, "recorded": 2},
+    }
+    assert counter.summary() == (
+        "new episodes : 4 network calls avoided "
+        "(ftp 3 replayed / 0 recorded, http 1 replayed / 2 recorded)"
+    )
+
+
+@pytest.mark.parametrize("marker", ["record_http", "record_curl"])
+def test_new_episodes_only_request_missing_interactions(pytester, server, marker):
+    url, path_counter = server
+    client, request = CLIENT_MAP[marker]
+
+    def write_test_module(path_list):
+        pytester.makepyfile(
+            test_episodes=TEST_MODULE.format(
+                client=client,
+                marker=marker,
+                path_list=path_list,
+                request=request.format(url=url),
+            )
+        )
+
+    write_test_module(["/a"])
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+    write_test_module(["/a", "/b"])
+    result = pytester.runpytest_subprocess("--record=all", "--record-new-episodes")
+    result.assert_outcomes(passed=1)
+    pytester.runpytest_subprocess().assert_outcomes(passed=1)
+
+    assert path_counter == {"/a": 1, "/b": 1}
+    result.stdout.fnmatch_lines(["*new episodes : 1 network calls avoided*"])
+
+
+def test_ftp_new_episodes(tmp_path, monkeypatch):
+    url_counter = Counter()
+
+    def urlopen(url, *args, **kwargs):
+        url_counter[url] += 1
+        return io.BytesIO(url.encode())
+
+    monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+    cassette_path = tmp_path / "test_ftp.yaml"
+
+    with FTPCassette(cassette_path=cassette_path, record_mode="all"):
+        urllib.request.urlopen("ftp://host/a").read()
+    with FTPCassette(cassette_path=cassette_path, record_mode="new_episodes"):
+        assert urllib.request.urlopen("ftp://host/a").read() == b"ftp://host/a"
+        urllib.request.urlopen("ftp://host/b").read()
+    with FTPCassette(cassette_path=cassette_path, record_mode="none") as cassette:
+        assert urllib.request.urlopen("ftp://host/b").read() == b"ftp://host/b"
+
+    assert url_counter == {"ftp://host/a": 1, "ftp://host/b": 1}
+    assert [entry["url"] for entry in cassette.interactions] == [
+        "ftp://host/a",
+        "ftp://host/b",
+    ]
+
+
+def ftp_session(port, pwd=False):
+    ftp = ftplib.FTP()
+    ftp.connect("127.0.0.1", port)
+    ftp.login("user", "secret")
+    ftp.cwd("/dir")
+    assert ftp.nlst() == ["a.txt", "b.txt"]
+    if pwd:
+        assert ftp.pwd() == "/dir"
+    ftp.quit()
+    ftp.close()
+
+
+def test_ftp_new_episodes_replays_the_commands(tmp_path, ftp_server):
+    port, command_list = ftp_server
+    cassette_path = tmp_path / "test_ftp.yaml"
+
+    with FTPCassette(cassette_path=cassette_path, record_mode="all"):
+        ftp_session(port)
+    assert "NLST" in command_list
+
+    # Every command is replayed, the connection isn't even opened
+    command_list.clear()
+    with FTPCassette(cassette_path=cassette_path, record_mode="new_episodes"):
+        ftp_session(port)
+    assert not command_list
+
+    # A new command opens it, after the session commands replayed until then
+    with FTPCassette(cassette_path=cassette_path, record_mode="new_episodes"):
+        ftp_session(port, pwd=True)
+    assert command_list == ["connect", "USER", "PASS", "CWD", "PWD"]
+    with FTPCassette(cassette_path=cassette_path, record_mode="none") as cassette:
+        ftp_session(port, pwd=True)
+    assert [entry["command"] for entry in cassette.interactions] == [
+        "login",
+        "cwd",
+        "retrlines",
+        "pwd",
+        "quit",
+    ]
+
+
+def test_failed_teardown_without_request_removes_cassette(pytester, server):
+    url, _ = server
+    client, request = CLIENT_MAP["record_http"]
+    pytester.makepyfile(
+        test_module=TEST_MODULE.format(
+            client=client,
+            marker="record_http",
+            path_list=["/a"],
+            request=request.format(url=url),
+        )
+    )
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+    record_folder_path = pytester.path / "record" / "http" / "test_module"
+    assert list(record_folder_path.iterdir())
+
+    # The cassette fails to exit, after a test which sent no request
+    pytester.makepyfile(
+        test_module="""
+        import pytest
+
+        @pytest.mark.record_http
+        def test_episodes(record_http):
+            def fail():
+                raise OSError("disk full")
+
+            record_http._save = fail
+        """
+    )
+    result = pytester.runpytest_subprocess("--record=all")
+
+    result.assert_outcomes(passed=1, errors=1)
+    assert not list(record_folder_path.iterdir())
@@ -0,0 +1,170 @@
+# IMPORT STANDARD
+import re
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_filter import record_filter_of, vcr_config_of
+
+REDACT_CONFIG = {
+    "redact_body": [
+        ("1234", "ACCOUNT"),
+        (re.compile(r"token=(\w+)", re.IGNORECASE), b"token=XXX"),
+        "secret",
+        # Overlaps itself
+        ("xx", "y"),
+    ]
+}
+
+
+def censor(response):
+    response["body"]["string"] = "censored"
+    return response
+
+
+def test_record_filter_compiled_once():
+    vcr_config = {
+        "filter_headers": [("Authorization", "XXX")],
+        "before_record_response": [censor],
+    }
+
+    assert record_filter_of(vcr_config) is record_filter_of(dict(vcr_config))
+    assert record_filter_of({}) is not record_filter_of(vcr_config)
+    assert not record_filter_of({}).enabled
+    # Unhashable replacements are compiled all the same
+    assert record_filter_of({"filter_headers": [("a", ["b"])]}).enabled
+
+
+def test_filter_headers():
+    record_filter = record_filter_of(
+        {"filter_headers": [("Authorization", "XXX"), "user-agent"]}
+    )
+
+    assert record_filter.filter_headers(
+        {"authorization": "Bearer a", "User-Agent": "curl", "Accept": "*/*"}
+    ) == {"authorization": "XXX", "Accept": "*/*"}
+    assert record_filter.filter_headers(None) == {}
+
+
+def test_filter_uri():
+    record_filter = record_filter_of(
+        {"filter_query_parameters": [("apikey", "MOCK"), ("token", None)]}
+    )
+
+    assert (
+        record_filter.filter_uri("https://a.com/p?apikey=1&b=&token=2&b=3")
+        == "https://a.com/p?apikey=MOCK&b=&b=3"
+    )
+    # Left as is without a filtered parameter
+    assert record_filter.filter_uri("https://a.com/p?b=%2F&a") == (
+        "https://a.com/p?b=%2F&a"
+    )
+    assert record_filter.filter_uri("ftp://a.com/p") == "ftp://a.com/p"
+
+
+def test_filter_argument():
+    record_filter = record_filter_of(
+        {"filter_arguments": [("secret", "XXX"), ("secret_dir", "DIR"), ("", "Y")]}
+    )
+
+    assert record_filter.filter_argument("/secret_dir/secret") == "/DIR/XXX"
+    assert record_filter.filter_argument(21) == 21
+
+
+def test_filter_entry():
+    dropped_list = []
+
+    def drop_errors(response):
+        if response["status"]["code"] != 200:
+            dropped_list.append(response)
+            return None
+        return response["body"]["string"].replace("1234", "ACCOUNT")
+
+    record_filter = record_filter_of(
+        {
+            "filter_headers": [("Set-Cookie", None)],
+            "before_record_response": drop_errors,
+        }
+    )
+
+    def entry_of(code):
+        return {
+            "request": {"method": "GET", "uri": "https://a.com", "headers": {}},
+            "response": {
+                "status": {"code": code},
+                "headers": {"set-cookie": "a=1"},
+                "body": {"string": "account 1234"},
+            },
+        }
+
+    entry = record_filter.filter_entry(entry_of(200))
+    assert entry["response"]["headers"] == {}
+    assert entry["response"]["body"]["string"] == "account ACCOUNT"
+    assert record_filter.filter_entry(entry_of(500)) is None
+    assert len(dropped_list) == 1
+
+
+def test_redact_body():
+    record_filter = record_filter_of(REDACT_CONFIG)
+
+    assert record_filter.redacts
+    assert not record_filter_of({}).redacts
+    assert record_filter.redact_body(b"1234 TOKEN=ab1 secret 12345") == (
+        b"ACCOUNT token=XXX [REDACTED] ACCOUNT5"
+    )
+    assert record_filter.redact_body("é 1234") == "é ACCOUNT"
+    assert record_filter.redact_body(None) is None
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 5000])
+def test_body_redactor_chunks(chunk_size):
+    record_filter = record_filter_of(REDACT_CONFIG)
+    body = b"".join(
+        b"row %d 1234 token=%s secret %s\n" % (index, b"a" * index, b"x" * index)
+        for index in range(200)
+    )
+
+    redactor = record_filter.redactor()
+    redacted = b"".join(
+        redactor.feed(body[index : index + chunk_size])
+        for index in range(0, len(body), chunk_size)
+    )
+    assert redacted + redactor.finish() == record_filter.redact_body(body)
+    assert record_filter_of({}).redactor() is None
+
+
+def test_filter_entry_redacted():
+    body_list = []
+
+    def keep_body(response):
+        body_list.append(response["body"]["string"])
+        return response
+
+    record_filter = record_filter_of(
+        {**REDACT_CONFIG, "before_record_response": keep_body}
+    )
+
+    def entry_of():
+        return {
+            "request": {"method": "GET", "uri": "https://a.com", "headers": {}},
+            "response": {"status": {"code": 200}, "body": {"string": b"secret"}},
+        }
+
+    record_filter.filter_entry(entry_of())
+    record_filter.filter_entry(entry_of(), redacted=True)
+    # The hooks get the redacted body
+    assert body_list == [b"[REDACTED]", b"secret"]
+
+
+def test_vcr_config_of():
+    record_filter = record_filter_of(
+        {**REDACT_CONFIG, "before_record_response": censor}
+    )
+    vcr_config = vcr_config_of({**REDACT_CONFIG, "before_record_response": censor})
+
+    assert vcr_config == {
+        "before_record_response": [record_filter.redact_response, censor]
+    }
+    assert vcr_config_of({"match_on": ["uri"]}) == {"match_on": ["uri"]}
+    assert vcr_config_of({"redact_body": []}) == {}
@@ -0,0 +1,115 @@
+# IMPORT STANDARD
+import http.server
+import socket
+import threading
+from pathlib import Path
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_guard import (
+    RecordNetworkError,
+    allowed_host_set_of,
+    block_network,
+)
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import curl_cffi.requests
+import pytest
+
+@pytest.mark.record_curl
+def test_get():
+    assert curl_cffi.requests.Session().get('{url}' + PATH).status_code == 200
+"""
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            body = self.path.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_allowed_host_set_of():
+    assert allowed_host_set_of(vcr_config={}) == set()
+    assert allowed_host_set_of(
+        vcr_config={"ignore_hosts": ["example.com"], "ignore_localhost": True}
+    ) == {"example.com", "localhost", "127.0.0.1", "::1"}
+
+
+def test_block_network():
+    with block_network(
+        recorder="curl",
+        record_file_path=Path("test.yaml"),
+        allowed_host_set={"127.0.0.1"},
+    ):
+        with pytest.raises(RecordNetworkError, match="test.yaml"):
+            socket.getaddrinfo("example.com", 80)
+        with socket.socket() as sock:
+            with pytest.raises(RecordNetworkError):
+                sock.connect(("10.0.0.1", 80))
+            assert sock.connect_ex(("127.0.0.1", 1)) != 0
+
+    assert socket.getaddrinfo("127.0.0.1", 80)
+
+
+def test_strict_replay(pytester, server):
+    pytester.makepyfile(
+        test_strict="PATH = '/recorded'\n" + TEST_MODULE.format(url=server)
+    )
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+
+    pytester.makepyfile(test_strict="PATH = '/new'\n" + TEST_MODULE.format(url=server))
+    result = pytester.runpytest_subprocess()
+    result.assert_outcomes(passed=1)
+
+    result = pytester.runpytest_subprocess("--record-strict")
+    result.assert_outcomes(failed=1)
+    result.stdout.fnmatch_lines(["*RecordNetworkError: No recorded interaction*/new*"])
+
+
+HTTP_TEST_MODULE = """
+import curl_cffi.requests
+import pytest
+import urllib3
+
+from pytest_recorder.record_guard import RecordNetworkError
+
+@pytest.mark.record_http
+def test_get():
+    assert urllib3.request("GET", "{url}/recorded").status == 200
+"""
+
+
+def test_strict_replay_blocks_curl(pytester, server):
+    pytest.importorskip("curl_cffi")
+    pytester.makepyfile(test_strict=HTTP_TEST_MODULE.format(url=server))
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+
+    # libcurl doesn't go through the blocked socket module
+    pytester.makepyfile(
+        test_strict=HTTP_TEST_MODULE.format(url=server)
+        + """
+    with pytest.raises(RecordNetworkError, match="10.255.255.1"):
+        curl_cffi.requests.get("http://10.255.255.1/new", timeout=30)
+"""
+    )
+    result = pytester.runpytest_subprocess("--record-strict")
+
+    result.assert_outcomes(passed=1)
@@ -0,0 +1,74 @@
+# IMPORT STANDARD
+
+# IMPORT THIRD-PARTY
+
+# IMPORT INTERNAL
+from pytest_recorder.record_io import FsyncPolicy, RecordWriter, RecordWriteStatus
+
+
+def test_write_atomic_replaces_record(tmp_path):
+    record_file_path = tmp_path / "record" / "time" / "module" / "function.json"
+    record_writer = RecordWriter()
+
+    record_writer.write(record_file_path=record_file_path, data='{"tick": true}')
+    record_writer.write(record_file_path=record_file_path, data='{"tick": false}')
+
+    assert record_file_path.read_text(encoding="utf-8") == '{"tick": false}'
+    assert list(record_file_path.parent.iterdir()) == [record_file_path]
+
+
+def test_write_behind_drain(tmp_path):
+    record_writer = RecordWriter()
+    record_writer.configure(write_behind=True, workers=2, fsync=FsyncPolicy.file)
+
+    record_file_path_list = [tmp_path / f"function_{index}.json" for index in range(8)]
+    for index, record_file_path in enumerate(record_file_path_list):
+        for version in range(3):
+            record_writer.write(
+                record_file_path=record_file_path,
+                data=f"{index}-{version}",
+            )
+
+    error_list = record_writer.shutdown()
+
+    assert not error_list
+    assert not record_writer.write_behind
+    for index, record_file_path in enumerate(record_file_path_list):
+        assert record_file_path.read_text(encoding="utf-8") == f"{index}-2"
+
+
+def test_write_behind_error(tmp_path):
+    record_folder_path = tmp_path / "not_a_folder"
+    record_folder_path.write_text("", encoding="utf-8")
+
+    record_writer = RecordWriter()
+    record_writer.configure(write_behind=True, workers=1)
+    record_writer.write(record_file_path=record_folder_path / "function.json", data="")
+
+    error_list = record_writer.shutdown()
+
+    assert len(error_list) == 1
+    assert error_list[0][0] == record_folder_path / "function.json"
+
+
+def test_write_if_changed(tmp_path):
+    record_file_path = tmp_path / "function.json"
+    record_writer = RecordWriter()
+
+    record_writer.write(record_file_path=record_file_path, data="[1, 2]")
+    mtime_ns = record_file_path.stat().st_mtime_ns
+    record_writer.write(record_file_path=record_file_path, data="[1, 2]")
+
+    assert record_file_path.stat().st_mtime_ns == mtime_ns
+
+    record_writer.write(record_file_path=record_file_path, data="[1, 3]")
+    record_writer.remove(record_file_path=record_file_path)
+    record_writer.remove(record_file_path=record_file_path)
+
+    assert not record_file_path.exists()
+    assert record_writer.status_count == {
+        RecordWriteStatus.new: 1,
+        RecordWriteStatus.unchanged: 1,
+        RecordWriteStatus.updated: 1,
+        RecordWriteStatus.removed: 1,
+    }
@@ -0,0 +1,171 @@
+# IMPORT STANDARD
+import http.server
+import io
+import threading
+import time
+import urllib.request
+
+# IMPORT THIRD-PARTY
+import pytest
+import yaml
+
+# IMPORT INTERNAL
+from pytest_recorder.record_ftp import FTPCassette
+from pytest_recorder.record_latency import ReplayLatency, Timer, timing_of
+
+pytest_plugins = ["pytester"]
+
+DELAY = 0.3
+
+TEST_MODULE = """
+import asyncio
+import time
+
+import curl_cffi.requests
+import pytest
+import urllib3
+
+def check_elapsed(request, start, duration):
+    elapsed = time.perf_counter() - start
+    if request.config.getoption("--record-latency"):
+        assert duration * 0.9 <= elapsed < duration * 1.8
+    else:
+        assert elapsed < 0.1 or request.config.getoption("--record") != "none"
+
+@pytest.mark.record_curl
+def test_curl_gather(request):
+    async def gather():
+        async with curl_cffi.requests.AsyncSession() as session:
+            return await asyncio.gather(
+                *(session.get("{url}/slow" + str(i)) for i in range(3))
+            )
+
+    start = time.perf_counter()
+    response_list = asyncio.run(gather())
+    check_elapsed(request, start, {delay})
+    assert [response.content for response in response_list] == [
+        b"/slow0", b"/slow1", b"/slow2"
+    ]
+
+@pytest.mark.record_curl
+def test_curl_stream(request):
+    start = time.perf_counter()
+    response = curl_cffi.requests.get("{url}/stream", stream=True)
+    check_elapsed(request, start, {delay})
+    content = b"".join(response.iter_content())
+    check_elapsed(request, start, 2 * {delay})
+    assert content == b"ab"
+
+@pytest.mark.record_http
+def test_http(request):
+    start = time.perf_counter()
+    assert urllib3.request("GET", "{url}/slow").data == b"/slow"
+    check_elapsed(request, start, {delay})
+"""
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            time.sleep(DELAY)
+            if self.path == "/stream":
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"a")
+                self.wfile.flush()
+                time.sleep(DELAY)
+                self.wfile.write(b"b")
+                return
+
+            body = self.path.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_timing_of():
+    assert timing_of(ttfb=0.123456, duration=0.5) == {"ttfb": 0.1235, "duration": 0.5}
+    assert timing_of(ttfb=2, duration=1) == {"ttfb": 1, "duration": 1}
+
+    timer = Timer()
+    time.sleep(0.01)
+    timer.mark_first_byte()
+    time.sleep(0.01)
+    timing = timer.timing()
+    assert 0.01 <= timing["ttfb"] < timing["duration"]
+
+
+def test_replay_latency():
+    timing = {"ttfb": 0.1, "duration": 0.3}
+
+    assert ReplayLatency().delays_of(timing) == (0, 0)
+    assert ReplayLatency(factor=2).delays_of(None) == (0, 0)
+    assert ReplayLatency(factor=0.5).delays_of(timing) == pytest.approx((0.05, 0.1))
+
+    latency = ReplayLatency(factor=0.5)
+    start = time.perf_counter()
+    chunk_list = list(latency.pace([b"a" * 3, b"b", b"c" * 4], timing=timing, size=8))
+    assert chunk_list == [b"aaa", b"b", b"cccc"]
+    assert 0.09 <= time.perf_counter() - start < 0.2
+
+
+def test_ftp_latency(tmp_path, monkeypatch):
+    def urlopen(url, *args, **kwargs):
+        time.sleep(DELAY)
+        return io.BytesIO(url.encode())
+
+    monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+    cassette_path = tmp_path / "test_ftp.yaml"
+
+    with FTPCassette(cassette_path=cassette_path, record_mode="all", timed=True):
+        urllib.request.urlopen("ftp://host/a").read()
+    (interaction,) = yaml.safe_load(cassette_path.read_text())["interactions"]
+    assert interaction["timing"]["duration"] >= DELAY
+
+    with FTPCassette(
+        cassette_path=cassette_path,
+        record_mode="none",
+        latency=ReplayLatency(factor=0.5),
+    ):
+        start = time.perf_counter()
+        assert urllib.request.urlopen("ftp://host/a").read() == b"ftp://host/a"
+        assert DELAY * 0.45 <= time.perf_counter() - start < DELAY
+
+
+def test_replay_recorded_latency(pytester, server):
+    pytester.makepyfile(test_latency=TEST_MODULE.format(url=server, delay=DELAY))
+
+    pytester.runpytest_subprocess("--record=all", "--record-timing").assert_outcomes(
+        passed=3
+    )
+    cassette = yaml.safe_load(
+        (
+            pytester.path
+            / "record"
+            / "curl"
+            / "test_latency"
+            / "test_curl_stream_curl.yaml"
+        ).read_text()
+    )
+    timing = cassette["interactions"][0]["response"]["timing"]
+    assert DELAY <= timing["ttfb"] < 2 * DELAY <= timing["duration"]
+    (http_path,) = (pytester.path / "record" / "http" / "test_latency").iterdir()
+    cassette = yaml.safe_load(http_path.read_text())
+    assert cassette["interactions"][0]["response"]["timing"]["duration"] >= DELAY
+
+    pytester.runpytest_subprocess().assert_outcomes(passed=3)
+    pytester.runpytest_subprocess("--record-latency=1").assert_outcomes(passed=3)
@@ -0,0 +1,245 @@
+# IMPORT STANDARD
+import http.server
+import io
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# IMPORT THIRD-PARTY
+import pytest
+import yaml
+
+# IMPORT INTERNAL
+from pytest_recorder.record_ftp import FTPCassette
+from pytest_recorder.record_match import (
+    RequestIndex,
+    loose_match_on_of,
+    match_on_of,
+)
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import curl_cffi.requests
+import pytest
+
+@pytest.mark.record_curl
+def test_graphql():
+    session = curl_cffi.requests.Session()
+    for query in {query_list}:
+        response = session.post('{url}/graphql', json={{"query": query}})
+        assert response.content == query.encode()
+"""
+
+
+def interaction_of(method, uri, body=None, response=None):
+    return {
+        "request": {"method": method, "uri": uri, "headers": {}, "body": body},
+        "response": response,
+    }
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):  # pylint: disable=invalid-name
+            data = self.rfile.read(int(self.headers["Content-Length"]))
+            body = data.split(b'"')[3]
+            if body == b"{slow}":
+                time.sleep(0.5)
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_match_on_of():
+    assert match_on_of(vcr_config={}) == ("method", "uri", "body")
+    assert match_on_of(vcr_config={"match_on": ["method", "path"]}) == (
+        "method",
+        "path",
+    )
+    assert match_on_of(vcr_config={"match_on": ["method", "raw_body", "body"]}) == (
+        "method",
+        "body",
+    )
+    with pytest.warns(UserWarning, match="Unknown matchers : \\['url'\\]"):
+        assert match_on_of(vcr_config={"match_on": ["method", "url"]}) == (
+            "method",
+            "body",
+            "scheme",
+            "host",
+            "port",
+            "path",
+        )
+
+    assert loose_match_on_of(match_on=("method", "uri")) == (
+        "method",
+        "scheme",
+        "host",
+        "port",
+        "path",
+    )
+    assert loose_match_on_of(match_on=("method", "body")) == ("method", "body")
+
+
+def test_request_index():
+    interaction_list = [
+        interaction_of("POST", "http://a/q", {"query": "x"}, 1),
+        interaction_of("POST", "http://a/q", {"query": "y"}, 2),
+        interaction_of("POST", "http://a/q", {"query": "x"}, 3),
+        interaction_of("GET", "http://a/q?token=FILTERED", None, 4),
+    ]
+    request_index = RequestIndex(
+        interaction_list,
+        match_on_list=[("method", "uri", "body"), ("method", "path", "body")],
+    )
+
+    def response_of(method, uri, body=None):
+        interaction = request_index.find(interaction_of(method, uri, body)["request"])
+        return interaction and interaction["response"]
+
+    assert response_of("POST", "http://a/q", {"query": "y"}) == 2
+    assert response_of("POST", "http://a/q", {"query": "x"}) == 1
+    assert response_of("POST", "http://a/q", {"query": "x"}) == 3
+    assert response_of("POST", "http://a/q", {"query": "x"}) is None
+    assert response_of("GET", "http://a/q?token=secret") == 4
+    assert request_index.used_count == 4
+    assert request_index.next_unused() is None
+
+
+def test_request_index_repeats():
+    interaction_list = [
+        interaction_of("GET", "http://a/1", response=1),
+        interaction_of("GET", "http://a/2", response=2),
+        interaction_of("GET", "http://a/1", response=3),
+    ]
+    request_index = RequestIndex(
+        interaction_list, match_on_list=[("uri",)], allow_playback_repeats=True
+    )
+    request = interaction_of("GET", "http://a/1")["request"]
+
+    response_list = [request_index.find(request)["response"] for _ in range(3)]
+
+    assert response_list == [1, 3, 1]
+    assert request_index.next_unused()["response"] == 2
+
+
+def test_replay_bodies_in_any_order(pytester, server):
+    query_list = ["{a}", "{b}", "{c}", "{a}"]
+    pytester.makepyfile(
+        test_match=TEST_MODULE.format(url=server, query_list=query_list)
+    )
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+
+    pytester.makepyfile(
+        test_match=TEST_MODULE.format(url=server, query_list=query_list[::-1])
+    )
+    pytester.runpytest_subprocess("--record-strict").assert_outcomes(passed=1)
+
+
+CONCURRENT_TEST_MODULE = """
+import asyncio
+import curl_cffi.requests
+import pytest
+
+@pytest.mark.record_curl
+def test_gather():
+    async def gather():
+        async with curl_cffi.requests.AsyncSession() as session:
+            return await asyncio.gather(
+                *(
+                    session.post('{url}/graphql', json={{"query": query}})
+                    for query in {query_list}
+                )
+            )
+
+    response_list = asyncio.run(gather())
+    assert [response.content for response in response_list] == [
+        query.encode() for query in {query_list}
+    ]
+"""
+
+
+def test_request_index_threads():
+    interaction_list = [
+        interaction_of("GET", f"http://a/{i % 10}", response=i) for i in range(1000)
+    ]
+    request_index = RequestIndex(interaction_list, match_on_list=[("uri",)])
+
+    def find_all(key):
+        request = interaction_of("GET", f"http://a/{key}")["request"]
+        return [request_index.find(request)["response"] for _ in range(100)]
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        response_list_list = list(executor.map(find_all, range(10)))
+
+    for key, response_list in enumerate(response_list_list):
+        assert response_list == list(range(key, 1000, 10))
+    assert request_index.used_count == 1000
+
+
+def test_record_concurrent_requests_in_send_order(pytester, server):
+    query_list = ["{slow}", "{a}", "{b}"]
+    pytester.makepyfile(
+        test_gather=CONCURRENT_TEST_MODULE.format(url=server, query_list=query_list)
+    )
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=1)
+
+    cassette = yaml.safe_load(
+        (
+            pytester.path / "record" / "curl" / "test_gather" / "test_gather_curl.yaml"
+        ).read_text()
+    )
+    assert [
+        interaction["request"]["body"]["query"]
+        for interaction in cassette["interactions"]
+    ] == query_list
+
+    pytester.makepyfile(
+        test_gather=CONCURRENT_TEST_MODULE.format(
+            url=server, query_list=query_list[::-1]
+        )
+    )
+    pytester.runpytest_subprocess("--record-strict").assert_outcomes(passed=1)
+
+
+def test_ftp_records_concurrent_requests_in_send_order(tmp_path, monkeypatch):
+    sent = threading.Event()
+    done = threading.Event()
+
+    def urlopen(url, *args, **kwargs):
+        if url.endswith("slow"):
+            sent.set()
+            done.wait(timeout=5)
+        return io.BytesIO(url.encode())
+
+    monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+    cassette_path = tmp_path / "test_ftp.yaml"
+
+    with FTPCassette(cassette_path=cassette_path, record_mode="all"):
+        thread = threading.Thread(
+            target=lambda: urllib.request.urlopen("ftp://host/slow").read()
+        )
+        thread.start()
+        sent.wait(timeout=5)
+        urllib.request.urlopen("ftp://host/fast").read()
+        done.set()
+        thread.join()
+    with FTPCassette(cassette_path=cassette_path, record_mode="none") as cassette:
+        pass
+
+    assert [entry["url"] for entry in cassette.interactions] == [
+        "ftp://host/slow",
+        "ftp://host/fast",
+    ]
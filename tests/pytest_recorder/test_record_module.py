@@ -0,0 +1,132 @@
+# IMPORT STANDARD
+import http.server
+import threading
+from collections import Counter
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import pytest
+import {client}
+
+@pytest.mark.{marker}(scope="module")
+@pytest.mark.parametrize("path", ["/a", "/b"])
+def test_shared(path):
+    for url in ("{url}/auth", "{url}" + path):
+        assert {request} == url.rsplit("/", 1)[-1].encode()
+"""
+CLIENT_MAP = {
+    "record_http": ("urllib3", "urllib3.request('GET', url).data", "http"),
+    "record_curl": (
+        "curl_cffi.requests",
+        "curl_cffi.requests.get(url).content",
+        "curl",
+    ),
+}
+FTP_TEST_MODULE = """
+import io
+import urllib.request
+
+import pytest
+
+def urlopen(url, *args, **kwargs):
+    with open("urlopen.log", "a") as file:
+        file.write(url + "\\n")
+    return io.BytesIO(url.encode())
+
+urllib.request.urlopen = urlopen
+
+@pytest.mark.record_ftp(scope="module")
+@pytest.mark.parametrize("path", ["a", "b"])
+def test_shared(path):
+    for url in ("ftp://host/auth", "ftp://host/" + path):
+        assert urllib.request.urlopen(url).read() == url.encode()
+"""
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    path_counter = Counter()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            path_counter[self.path] += 1
+            body = self.path.lstrip("/").encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", path_counter
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("marker", ["record_http", "record_curl"])
+def test_module_scope_records_one_cassette(pytester, server, marker):
+    url, path_counter = server
+    client, request, recorder = CLIENT_MAP[marker]
+    pytester.makepyfile(
+        test_module=TEST_MODULE.format(
+            client=client, marker=marker, url=url, request=request
+        )
+    )
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=2)
+    pytester.runpytest_subprocess().assert_outcomes(passed=2)
+
+    assert path_counter == {"/auth": 1, "/a": 1, "/b": 1}
+    record_folder_path = pytester.path / "record" / recorder / "test_module"
+    assert [path.name for path in record_folder_path.iterdir()] == [
+        next(record_folder_path.glob("_module*.yaml")).name
+    ]
+
+
+def test_ftp_module_scope_records_one_cassette(pytester):
+    pytester.makepyfile(test_module=FTP_TEST_MODULE)
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=2)
+    log_path = pytester.path / "urlopen.log"
+    assert log_path.read_text().split() == [
+        "ftp://host/auth",
+        "ftp://host/a",
+        "ftp://host/b",
+    ]
+    log_path.unlink()
+    pytester.runpytest_subprocess().assert_outcomes(passed=2)
+
+    assert not log_path.exists()
+    record_folder_path = pytester.path / "record" / "ftp" / "test_module"
+    assert [path.name for path in record_folder_path.iterdir()] == ["_module_ftp.yaml"]
+
+
+def test_module_scope_records_one_cassette_with_record_dist(pytester, server):
+    pytest.importorskip("xdist")
+    url, path_counter = server
+    client, request, _ = CLIENT_MAP["record_http"]
+    pytester.makepyfile(
+        test_module=TEST_MODULE.format(
+            client=client, marker="record_http", url=url, request=request
+        )
+    )
+
+    result = pytester.runpytest_subprocess("--record=all", "-n", "2")
+    result.assert_outcomes(errors=2)
+    result.stdout.fnmatch_lines(["*scope='module' under pytest-xdist requires*"])
+
+    # Both tests run on one worker, which records the whole module
+    pytester.runpytest_subprocess(
+        "--record=all", "-n", "2", "--record-dist"
+    ).assert_outcomes(passed=2)
+    assert path_counter == {"/auth": 1, "/a": 1, "/b": 1}
+    pytester.runpytest_subprocess("-n", "2").assert_outcomes(passed=2)
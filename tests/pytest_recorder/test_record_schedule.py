@@ -0,0 +1,126 @@
+# IMPORT STANDARD
+import http.server
+import threading
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_schedule import RecordScope
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import pytest
+import urllib3
+
+class TestA:
+    @pytest.mark.record_http
+    def test_shared(self):
+        assert urllib3.request("GET", "{url}/shared").status == 200
+
+@pytest.mark.parametrize("index", range(8))
+def test_unrecorded(index):
+    pass
+
+class TestB:
+    @pytest.mark.record_http
+    def test_shared(self):
+        assert urllib3.request("GET", "{url}/shared").status == 200
+"""
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_record_scope(tmp_path):
+    module_folder_path = tmp_path / "tests" / "record"
+    (module_folder_path / "http" / "test_module").mkdir(parents=True)
+    (module_folder_path / "curl" / "test_module").mkdir(parents=True)
+    (module_folder_path / "http" / "test_module" / "test_x_urllib3_v2.yaml").write_text(
+        "12345"
+    )
+    (module_folder_path / "curl" / "test_module" / "test_x_curl.yaml").write_text("123")
+    record_scope = RecordScope(rootpath=tmp_path)
+
+    assert record_scope.scope_of("tests/test_module.py::TestA::test_x") == (
+        "tests/test_module.py::test_x"
+    )
+    assert record_scope.scope_of("tests/test_module.py::TestB::test_x") == (
+        "tests/test_module.py::test_x"
+    )
+    assert record_scope.scope_of("tests/test_module.py::test_y") == (
+        "tests/test_module.py::test_y"
+    )
+    assert record_scope.size_of("tests/test_module.py::test_x") == 8
+    assert record_scope.size_of("tests/test_module.py::test_y") == 0
+
+
+def test_record_scope_of_module_scoped_records(tmp_path):
+    (tmp_path / "test_marked.py").write_text(
+        '@pytest.mark.record_curl(scope="module")\ndef test_x(): pass\n'
+    )
+    (tmp_path / "test_recorded.py").write_text("")
+    record_folder_path = tmp_path / "record" / "ftp" / "test_recorded"
+    record_folder_path.mkdir(parents=True)
+    (record_folder_path / "_module_ftp.yaml").write_text("12345")
+    record_scope = RecordScope(rootpath=tmp_path)
+
+    assert record_scope.scope_of("test_marked.py::test_x[a]") == "test_marked.py"
+    assert record_scope.scope_of("test_recorded.py::test_y") == "test_recorded.py"
+    assert record_scope.size_of("test_recorded.py") == 5
+
+
+def test_record_dist_shares_records_on_one_worker(pytester, server):
+    pytest.importorskip("xdist")
+    pytester.makepyfile(test_schedule=TEST_MODULE.format(url=server))
+    pytester.runpytest_subprocess("--record=all", "-p", "no:xdist").assert_outcomes(
+        passed=10
+    )
+
+    result = pytester.runpytest_subprocess("-n", "2", "--record-dist", "--record-stats")
+
+    result.assert_outcomes(passed=10)
+    result.stdout.fnmatch_lines(["record cache : 1 hits, 1 parsed *"])
+
+
+def test_record_dist_sends_crashed_test_again(pytester):
+    pytest.importorskip("xdist")
+    pytester.makeconftest(
+        """
+        def pytest_handlecrashitem(crashitem, report, sched):
+            sched.mark_test_pending(crashitem)
+            report.outcome = "rerun"
+        """
+    )
+    pytester.makepyfile(
+        test_crash=f"""
+        import os
+        from pathlib import Path
+
+        def test_crash():
+            flag_path = Path({str(pytester.path / "crashed")!r})
+            if not flag_path.exists():
+                flag_path.touch()
+                os._exit(1)
+        """
+    )
+
+    result = pytester.runpytest_subprocess("-n", "1", "--record-dist")
+
+    result.stdout.fnmatch_lines(["*= 1 passed, 1 rerun in *"])
@@ -0,0 +1,215 @@
+# IMPORT STANDARD
+import http.client
+import http.server
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# IMPORT THIRD-PARTY
+import pytest
+import urllib3
+import yaml
+
+# IMPORT INTERNAL
+from pytest_recorder.record_latency import ReplayLatency
+from pytest_recorder.record_server import RecordServer, body_of
+
+pytest_plugins = ["pytester"]
+
+CURL_CASSETTE = {
+    "interactions": [
+        {
+            "request": {
+                "method": "POST",
+                "uri": "https://api.example.com/graphql?token=FILTERED",
+                "headers": {},
+                "body": {"query": query},
+            },
+            "response": {
+                "status": {"code": 200, "message": "OK"},
+                "headers": {
+                    "Content-Type": "application/json",
+                    "Content-Encoding": "br",
+                },
+                "body": {"string": query.encode(), "encoding": "utf-8"},
+                "timing": {"ttfb": 0.2, "duration": 0.2},
+            },
+            "source_type": "curl_cffi_sync",
+        }
+        for query in ["{a}", "{b}", "{a}"]
+    ]
+}
+HTTP_CASSETTE = {
+    "interactions": [
+        {
+            "request": {
+                "method": "GET",
+                "uri": "https://example.com/page?b=2&a=1",
+                "headers": {},
+                "body": None,
+            },
+            "response": {
+                "status": {"code": 201, "message": "Created"},
+                "headers": {"Set-Cookie": ["a=1", "b=2"]},
+                "body": {"string": body},
+            },
+        }
+        for body in ["first", "second"]
+    ]
+}
+
+TEST_MODULE = """
+import curl_cffi.requests
+import pytest
+import urllib3
+
+@pytest.mark.record_curl
+def test_curl():
+    assert curl_cffi.requests.get("{url}/a").content == b"/a"
+
+def test_served(record_server):
+    response = urllib3.request("GET", record_server.url + "/a")
+    assert (response.status, response.data) == (200, b"/a")
+"""
+
+
+@pytest.fixture(name="record_path")
+def record_path_fixture(tmp_path):
+    for recorder, cassette in [("curl", CURL_CASSETTE), ("http", HTTP_CASSETTE)]:
+        cassette_path = tmp_path / "record" / recorder / "test_api" / "test.yaml"
+        cassette_path.parent.mkdir(parents=True)
+        cassette_path.write_text(yaml.safe_dump(cassette))
+
+    return tmp_path / "record"
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            body = self.path.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_body_of():
+    assert body_of(b'{"query": "{a}"}') == {"query": "{a}"}
+    assert body_of('{"query": "{a}"}') == {"query": "{a}"}
+    assert body_of(b"a=1") == "a=1"
+    assert body_of(b"") is None
+    assert body_of(b"\xff") == b"\xff"
+
+
+def test_record_server(record_path):
+    with RecordServer(path_list=[record_path]) as server:
+        pool = urllib3.PoolManager()
+
+        def post(query):
+            return pool.request(
+                "POST",
+                server.url + "/graphql?token=secret",
+                json={"query": query},
+            )
+
+        response = post("{b}")
+        assert (response.status, response.data) == (200, b"{b}")
+        assert response.headers["Content-Type"] == "application/json"
+        assert "Content-Encoding" not in response.headers
+        assert [post("{a}").data for _ in range(3)] == [b"{a}"] * 3
+
+        response = pool.request("GET", server.url + "/page?a=1&b=2")
+        assert (response.status, response.data) == (201, b"first")
+        assert response.headers.getlist("Set-Cookie") == ["a=1", "b=2"]
+        assert pool.request("GET", server.url + "/page?a=1&b=2").data == b"second"
+
+        assert pool.request("GET", server.url + "/missing").status == 404
+        assert (server.interaction_count, server.request_count) == (5, 7)
+        assert server.miss_count == 1
+
+
+def test_record_server_keep_alive_and_chunked(record_path):
+    with RecordServer(path_list=[record_path]) as server:
+        connection = http.client.HTTPConnection(*server.url[7:].split(":"))
+        for _ in range(3):
+            connection.request("GET", "/page?a=1&b=2")
+            assert connection.getresponse().read() in (b"first", b"second")
+        connection.request("POST", "/graphql", body=iter([b'{"query": ', b'"{b}"}']))
+        response = connection.getresponse()
+        assert (response.status, response.read()) == (200, b"{b}")
+        connection.close()
+
+
+def test_record_server_concurrent_requests(record_path):
+    with RecordServer(path_list=[record_path]) as server:
+        pool = urllib3.PoolManager(maxsize=10)
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            data_list = list(
+                executor.map(
+                    lambda _: pool.request("GET", server.url + "/page").data,
+                    range(500),
+                )
+            )
+
+    assert sorted(set(data_list)) == [b"first", b"second"]
+    assert server.request_count == 500
+
+
+def test_record_server_latency(record_path):
+    with RecordServer(
+        path_list=[record_path / "curl"], latency=ReplayLatency(factor=1)
+    ) as server:
+        pool = urllib3.PoolManager(maxsize=3)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(
+                executor.map(
+                    lambda query: pool.request(
+                        "POST", server.url + "/graphql", json={"query": query}
+                    ),
+                    ["{a}", "{b}", "{a}"],
+                )
+            )
+        assert 0.2 <= time.perf_counter() - start < 0.4
+
+
+def test_record_server_fixture(pytester, server):
+    pytester.makepyfile(test_api=TEST_MODULE.format(url=server))
+
+    pytester.runpytest_subprocess("--record=all").assert_outcomes(passed=2)
+
+
+def test_serve_command(record_path):
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pytest_recorder.record_server",
+            "serve",
+            str(record_path),
+            "--port",
+            "0",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        line = process.stdout.readline()
+        assert line.startswith("Serving 5 recorded interactions on http://127.0.0.1:")
+        url = line.split()[-1]
+        assert urllib3.request("GET", url + "/page").data == b"first"
+    finally:
+        process.terminate()
+        process.wait()
@@ -0,0 +1,92 @@
+# IMPORT STANDARD
+import json
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_stats import NULL_CONTEXT, RecordPhase, RecordStats
+
+pytest_plugins = ["pytester"]
+
+
+def test_record_stats_disabled():
+    record_stats = RecordStats()
+
+    def function():
+        return 1
+
+    assert record_stats.measure("http", RecordPhase.load) is NULL_CONTEXT
+    assert record_stats.wrap("http", RecordPhase.match, function) is function
+    assert not record_stats.to_dict(top=5)["totals"]
+
+
+def test_record_stats_per_test():
+    record_stats = RecordStats()
+    record_stats.configure(enabled=True)
+
+    record_stats.nodeid = "test_module.py::test_fast"
+    record_stats.add(recorder="curl", phase=RecordPhase.load, seconds=0.1)
+    record_stats.nodeid = "test_module.py::test_slow"
+    record_stats.add(recorder="curl", phase=RecordPhase.load, seconds=0.5)
+    record_stats.add(recorder="ftp", phase=RecordPhase.load, seconds=0.25)
+    with record_stats.measure("ftp", RecordPhase.persist):
+        pass
+
+    data = record_stats.to_dict(top=1)
+
+    assert data["totals"][0] == {
+        "recorder": "curl",
+        "phase": "load",
+        "calls": 2,
+        "seconds": 0.6,
+    }
+    assert data["tests"]["test_module.py::test_slow"]["ftp.load"] == 0.25
+    assert data["slowest"]["load"] == [("test_module.py::test_slow", 0.75)]
+    assert len(data["slowest"]["persist"]) == 1
+
+
+def test_record_stats_merge():
+    worker_stats = RecordStats()
+    worker_stats.configure(enabled=True)
+    worker_stats.nodeid = "test_module.py::test_a"
+    worker_stats.add(recorder="http", phase=RecordPhase.load, seconds=0.5)
+    record_stats = RecordStats()
+    record_stats.configure(enabled=True)
+    record_stats.nodeid = "test_module.py::test_b"
+    record_stats.add(recorder="http", phase=RecordPhase.load, seconds=0.25)
+
+    record_stats.merge(worker_stats.to_dict(top=0))
+
+    data = record_stats.to_dict(top=5)
+    assert data["totals"] == [
+        {"recorder": "http", "phase": "load", "calls": 2, "seconds": 0.75}
+    ]
+    assert data["slowest"]["load"] == [
+        ("test_module.py::test_a", 0.5),
+        ("test_module.py::test_b", 0.25),
+    ]
+
+
+def test_record_stats_json_dist(pytester):
+    pytest.importorskip("xdist")
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.record_time(tick=False)
+        @pytest.mark.parametrize("index", range(4))
+        def test_recorded(record, index):
+            record.add_verify({"index": index})
+        """
+    )
+
+    pytester.runpytest_subprocess(
+        "--record=all", "-n", "2", "--record-stats-json=stats.json"
+    ).assert_outcomes(passed=4)
+
+    data = json.loads((pytester.path / "stats.json").read_text())
+    assert len(data["tests"]) == 4
+    assert {
+        total["calls"] for total in data["totals"] if total["phase"] == "persist"
+    } == {4}
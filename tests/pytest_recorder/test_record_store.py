@@ -0,0 +1,290 @@
+# IMPORT STANDARD
+import http.server
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from hashlib import sha256
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_store import RecordStore, module_path_of
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import pytest
+
+@pytest.mark.record_time
+def test_a():
+    pass
+
+@pytest.mark.record_time
+def test_b():
+    pass
+"""
+
+
+class StandInStore:
+    """Content-addressed store in memory, tracking its concurrent requests."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.blob_map = {}
+        self.method_list = []
+        self.active_count = 0
+        self.max_active_count = 0
+        self.lock = threading.Lock()
+        store = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status, body=b""):
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _handle(self):
+                with store.lock:
+                    store.method_list.append(self.command)
+                    store.active_count += 1
+                    store.max_active_count = max(
+                        store.max_active_count, store.active_count
+                    )
+                time.sleep(delay)
+                try:
+                    digest = self.path.rsplit("/", 1)[-1]
+                    if self.command == "PUT":
+                        length = int(self.headers["Content-Length"])
+                        store.blob_map[digest] = self.rfile.read(length)
+                        self._reply(201)
+                    elif digest in store.blob_map:
+                        self._reply(200, store.blob_map[digest])
+                    else:
+                        self._reply(404)
+                finally:
+                    with store.lock:
+                        store.active_count -= 1
+
+            do_GET = do_HEAD = do_PUT = _handle
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/blobs"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(name="stand_in_store")
+def stand_in_store_fixture():
+    with StandInStore(delay=0.05) as store:
+        yield store
+
+
+def make_records(tmp_path, count):
+    module_path = tmp_path / "tests" / "test_api.py"
+    module_path.parent.mkdir()
+    module_path.touch()
+    record_file_path_list = []
+    for index in range(count):
+        recorder = "curl" if index % 2 else "http"
+        record_file_path = (
+            tmp_path / "tests" / "record" / recorder / "test_api" / f"test_{index}.yaml"
+        )
+        record_file_path.parent.mkdir(parents=True, exist_ok=True)
+        record_file_path.write_text(f"interactions: [{index}]\n", encoding="utf-8")
+        record_file_path_list.append(record_file_path)
+
+    return module_path, record_file_path_list
+
+
+def make_store(tmp_path, url, **kwargs):
+    record_store = RecordStore()
+    record_store.configure(
+        url=url,
+        manifest_path=tmp_path / "record_manifest.json",
+        cache_folder_path=tmp_path / ".record_store",
+        **kwargs,
+    )
+    return record_store
+
+
+def test_module_path_of(tmp_path):
+    assert module_path_of(
+        tmp_path / "tests" / "record" / "curl" / "test_api" / "test_a.yaml"
+    ) == (tmp_path / "tests" / "test_api.py")
+
+
+def test_record_store_push_and_fetch(tmp_path, stand_in_store):
+    module_path, record_file_path_list = make_records(tmp_path, count=8)
+
+    record_store = make_store(
+        tmp_path, stand_in_store.url, cache_max_bytes=1024**2, push=True
+    )
+    assert not record_store.push(module_path_list=[module_path])
+    record_store.write_manifest()
+
+    manifest = json.loads((tmp_path / "record_manifest.json").read_text())
+    assert manifest["version"] == 1
+    assert manifest["records"]["tests/record/http/test_api/test_0.yaml"] == (
+        sha256(b"interactions: [0]\n").hexdigest()
+    )
+    assert len(manifest["records"]) == len(stand_in_store.blob_map) == 8
+    assert record_store.to_dict()["count"]["pushed"] == 8
+
+    # A second push only checks the store has the records
+    stand_in_store.method_list.clear()
+    assert not record_store.push(module_path_list=[module_path])
+    assert set(stand_in_store.method_list) == {"HEAD"}
+
+    shutil.rmtree(tmp_path / "tests" / "record")
+    record_file_path_list[1].parent.mkdir(parents=True)
+    record_file_path_list[1].write_text("interactions: [1]\n", encoding="utf-8")
+    stand_in_store.max_active_count = 0
+
+    record_store = make_store(tmp_path, stand_in_store.url, cache_max_bytes=1024**2)
+    start = time.perf_counter()
+    assert not record_store.fetch(module_path_list=[module_path])
+    assert time.perf_counter() - start < 7 * 0.05
+    assert stand_in_store.max_active_count > 1
+    for index, record_file_path in enumerate(record_file_path_list):
+        assert record_file_path.read_text() == f"interactions: [{index}]\n"
+    assert record_store.to_dict()["count"] == {
+        "fetched": 7,
+        "cached": 0,
+        "unchanged": 1,
+        "kept": 0,
+        "pushed": 0,
+    }
+
+    # Fetched records are then read from the local cache
+    shutil.rmtree(tmp_path / "tests" / "record")
+    stand_in_store.method_list.clear()
+    assert not record_store.fetch(module_path_list=[module_path])
+    assert stand_in_store.method_list == ["GET"]
+    assert record_store.to_dict()["count"]["cached"] == 7
+    assert not record_store.fetch(module_path_list=[tmp_path / "test_other.py"])
+
+
+def test_record_store_errors(tmp_path, stand_in_store):
+    module_path, record_file_path_list = make_records(tmp_path, count=2)
+    record_store = make_store(tmp_path, stand_in_store.url, push=True)
+    record_store.push(module_path_list=[module_path])
+    record_store.write_manifest()
+
+    digest = sha256(b"interactions: [0]\n").hexdigest()
+    stand_in_store.blob_map[digest] = b"corrupted"
+    del stand_in_store.blob_map[sha256(b"interactions: [1]\n").hexdigest()]
+    shutil.rmtree(tmp_path / "tests" / "record")
+
+    error_list = record_store.fetch(module_path_list=[module_path])
+
+    assert {path for path, _ in error_list} == set(record_file_path_list)
+    assert "corrupted" in str(dict(error_list)[record_file_path_list[0]])
+    assert "HTTP 404" in str(dict(error_list)[record_file_path_list[1]])
+
+
+def test_record_store_keeps_records_newer_than_the_manifest(
+    tmp_path, stand_in_store, caplog
+):
+    module_path, record_file_path_list = make_records(tmp_path, count=2)
+    record_store = make_store(tmp_path, stand_in_store.url, push=True)
+    record_store.push(module_path_list=[module_path])
+    record_store.write_manifest()
+    manifest_mtime_ns = (tmp_path / "record_manifest.json").stat().st_mtime_ns
+    for record_file_path in record_file_path_list:
+        record_file_path.write_text("interactions: [new]\n", encoding="utf-8")
+    os.utime(record_file_path_list[1], ns=(0, 0))
+    os.utime(
+        record_file_path_list[0], ns=(manifest_mtime_ns + 1, manifest_mtime_ns + 1)
+    )
+
+    # With push the newer record is kept, to be pushed, the older one is fetched
+    assert not record_store.fetch(module_path_list=[module_path])
+    assert record_file_path_list[0].read_text() == "interactions: [new]\n"
+    assert record_file_path_list[1].read_text() == "interactions: [1]\n"
+    assert record_store.to_dict()["count"]["kept"] == 1
+
+    # Without push it is kept as well, and reported
+    record_store = make_store(tmp_path, stand_in_store.url)
+    with caplog.at_level(logging.WARNING):
+        assert not record_store.fetch(module_path_list=[module_path])
+    assert record_file_path_list[0].read_text() == "interactions: [new]\n"
+    assert record_store.to_dict()["count"]["kept"] == 1
+    assert "1 kept" in record_store.summary()
+    assert "Record newer than the manifest kept" in caplog.text
+
+
+def test_record_store_cache_drops_least_recently_used(tmp_path):
+    record_store = make_store(tmp_path, "http://store", cache_max_bytes=10)
+    cache_folder_path = tmp_path / ".record_store" / "ab"
+    cache_folder_path.mkdir(parents=True)
+    for name in ["abc", "abd", "abe"]:
+        (cache_folder_path / name).write_text("12345")
+        time.sleep(0.01)
+        if name == "abd":
+            (cache_folder_path / "abc").touch()
+
+    record_store.trim_cache()
+
+    assert sorted(path.name for path in cache_folder_path.iterdir()) == ["abc", "abe"]
+
+
+def test_record_store_session(pytester, stand_in_store):
+    pytester.makepyfile(test_api=TEST_MODULE)
+    option_list = ["--record-store", stand_in_store.url]
+
+    pytester.runpytest_subprocess(
+        "--record=all", "--record-store-push", *option_list
+    ).assert_outcomes(passed=2)
+    manifest = json.loads((pytester.path / "record_manifest.json").read_text())
+    assert sorted(manifest["records"]) == [
+        "record/time/test_api/test_a.json",
+        "record/time/test_api/test_b.json",
+    ]
+
+    shutil.rmtree(pytester.path / "record")
+    result = pytester.runpytest_subprocess(*option_list)
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines(["*record store : 2 fetched, 0 cached*"])
+    assert (pytester.path / "record" / "time" / "test_api" / "test_a.json").is_file()
+
+    stand_in_store.blob_map.clear()
+    shutil.rmtree(pytester.path / "record")
+    shutil.rmtree(pytester.path / ".record_store")
+    result = pytester.runpytest_subprocess(*option_list)
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
+    result.stdout.fnmatch_lines(["*record store errors*", "*HTTP 404*"])
+
+
+def test_record_store_dist_session(pytester, stand_in_store):
+    pytest.importorskip("xdist")
+    pytester.makepyfile(test_api=TEST_MODULE)
+    option_list = ["-n", "2", "--record-store", stand_in_store.url]
+
+    pytester.runpytest_subprocess(
+        "--record=all", "--record-store-push", *option_list
+    ).assert_outcomes(passed=2)
+    manifest = json.loads((pytester.path / "record_manifest.json").read_text())
+    assert len(manifest["records"]) == 2
+
+    # The controller fetches the records once, for both workers
+    shutil.rmtree(pytester.path / "record")
+    stand_in_store.method_list.clear()
+    result = pytester.runpytest_subprocess(*option_list)
+    result.assert_outcomes(passed=2)
+    assert stand_in_store.method_list == ["GET", "GET"]
@@ -0,0 +1,246 @@
+# IMPORT STANDARD
+import asyncio
+import ftplib
+import http.server
+import io
+import multiprocessing
+import threading
+import time
+import urllib.request
+from urllib.error import URLError
+
+# IMPORT THIRD-PARTY
+import pytest
+
+# IMPORT INTERNAL
+from pytest_recorder.record_ftp import FTPCassette
+from pytest_recorder.record_throttle import (
+    RecordThrottle,
+    parse_rate_limit,
+    record_throttle,
+)
+
+pytest_plugins = ["pytester"]
+
+TEST_MODULE = """
+import pytest
+import {client}
+
+@pytest.mark.{marker}
+def test_retry():
+    assert {request}.status{code} == 200
+"""
+CLIENT_MAP = {
+    "record_http": ("urllib3", "urllib3.request('GET', '{url}/')", ""),
+    "record_curl": ("curl_cffi.requests", "curl_cffi.requests.get('{url}/')", "_code"),
+}
+
+
+@pytest.fixture(name="server")
+def server_fixture():
+    hit_list = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # pylint: disable=invalid-name
+            hit_list.append(self.path)
+            status = 429 if len(hit_list) == 1 else 200
+            body = str(status).encode()
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", hit_list
+    server.shutdown()
+    server.server_close()
+
+
+def acquire_tokens(folder_path, count):
+    throttle = RecordThrottle()
+    throttle.configure(rate_limit_list=["host=20/1"], folder_path=folder_path)
+    for _ in range(count):
+        throttle.acquire("host")
+
+
+def test_parse_rate_limit():
+    assert parse_rate_limit("api.example.com=2") == ("api.example.com", 2.0, 2.0)
+    assert parse_rate_limit("*=0.5/3") == ("*", 0.5, 3.0)
+
+    with pytest.raises(ValueError):
+        parse_rate_limit("api.example.com")
+    with pytest.raises(ValueError):
+        parse_rate_limit("api.example.com=0")
+
+
+def test_token_bucket_is_shared_by_processes(tmp_path):
+    context = multiprocessing.get_context("spawn")
+    process_list = [
+        context.Process(target=acquire_tokens, args=(tmp_path, 5)) for _ in range(2)
+    ]
+
+    start = time.monotonic()
+    for process in process_list:
+        process.start()
+    for process in process_list:
+        process.join()
+
+    # 10 tokens at 20 per second, the first one being in the bucket already
+    assert all(process.exitcode == 0 for process in process_list)
+    assert time.monotonic() - start >= 9 / 20
+
+
+def test_acquire_async_waits_for_the_lock_out_of_the_event_loop(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    throttle = RecordThrottle()
+    throttle.configure(rate_limit_list=["host=20/1"], folder_path=tmp_path)
+    throttle.acquire("host")
+
+    async def run():
+        tick_list = []
+
+        async def tick():
+            while True:
+                tick_list.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(tick())
+        # Another open file of the bucket, as in another process, holds it 0.2 seconds
+        with open(tmp_path / "host.bucket", "a+", encoding="utf-8") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            timer = threading.Timer(0.2, fcntl.flock, (file, fcntl.LOCK_UN))
+            timer.start()
+            await throttle.acquire_async("host")
+            timer.join()
+        task.cancel()
+        return tick_list
+
+    assert len(asyncio.run(run())) >= 5
+
+
+def test_retry_delay_follows_retry_after():
+    throttle = RecordThrottle()
+    throttle.configure(retries=3, backoff=1.0, max_delay=10.0)
+
+    assert throttle.retry_delay(attempt=0, headers={"Retry-After": "2"}) == 2.0
+    assert throttle.retry_delay(attempt=0, headers={"Retry-After": "60"}) == 10.0
+    assert 2.0 <= throttle.retry_delay(attempt=2) <= 4.0
+
+
+@pytest.mark.parametrize("marker", ["record_http", "record_curl"])
+def test_transient_status_is_retried(pytester, server, marker):
+    url, hit_list = server
+    client, request, code = CLIENT_MAP[marker]
+    pytester.makepyfile(
+        test_throttle=TEST_MODULE.format(
+            client=client,
+            marker=marker,
+            request=request.format(url=url),
+            code=code,
+        )
+    )
+
+    result = pytester.runpytest_subprocess(
+        "--record=all", "--record-retries=2", "--record-rate-limit=*=100"
+    )
+    result.assert_outcomes(passed=1)
+    pytester.runpytest_subprocess().assert_outcomes(passed=1)
+
+    assert hit_list == ["/", "/"]
+
+
+def test_ftp_urlopen_is_retried(tmp_path, monkeypatch):
+    attempt_list = []
+
+    def urlopen(url, *args, **kwargs):
+        attempt_list.append(url)
+        if len(attempt_list) == 1:
+            raise URLError("timed out")
+        return io.BytesIO(b"data")
+
+    monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+    monkeypatch.setattr(record_throttle, "_retries", 1)
+    monkeypatch.setattr(record_throttle, "_backoff", 0.0)
+
+    with FTPCassette(cassette_path=tmp_path / "test_ftp.yaml", record_mode="all"):
+        assert urllib.request.urlopen("ftp://host/a").read() == b"data"
+
+    assert attempt_list == ["ftp://host/a", "ftp://host/a"]
+
+
+def test_ftp_retrbinary_retry_keeps_blocks(tmp_path, monkeypatch):
+    attempt_list = []
+
+    def retrbinary(ftp, cmd, callback, blocksize=8192, rest=None):
+        attempt_list.append(cmd)
+        callback(b"da")
+        # Passed on as it arrives
+        assert block_list == [b"da"]
+        if len(attempt_list) == 1:
+            raise ftplib.error_temp("426 Connection closed")
+        callback(b"ta")
+        return "226 Transfer complete."
+
+    monkeypatch.setattr(ftplib.FTP, "retrbinary", retrbinary)
+    monkeypatch.setattr(record_throttle, "_retries", 1)
+    monkeypatch.setattr(record_throttle, "_backoff", 0.0)
+
+    block_list = []
+    with FTPCassette(cassette_path=tmp_path / "test_ftp.yaml", record_mode="all"):
+        ftplib.FTP().retrbinary("RETR a", block_list.append)
+
+    # The blocks of the failed attempt aren't passed again
+    assert attempt_list == ["RETR a", "RETR a"]
+    assert block_list == [b"da", b"ta"]
+
+
+def test_ftp_retrieve_callback_errors_propagate(tmp_path, monkeypatch):
+    def retrieve(ftp, cmd, callback, *args, **kwargs):
+        callback(b"data" if cmd.startswith("RETR") else "data")
+        return "226 Transfer complete."
+
+    def callback(data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ftplib.FTP, "retrbinary", retrieve)
+    monkeypatch.setattr(ftplib.FTP, "retrlines", retrieve)
+
+    with FTPCassette(cassette_path=tmp_path / "test_ftp.yaml", record_mode="all"):
+        with pytest.raises(OSError, match="disk full"):
+            ftplib.FTP().retrbinary("RETR a", callback)
+        with pytest.raises(OSError, match="disk full"):
+            ftplib.FTP().retrlines("LIST", callback)
+
+
+REPLAYED_TEST_MODULE = """
+import pytest
+import urllib3
+
+@pytest.mark.record_http
+def test_replayed():
+    for _ in range(4):
+        assert urllib3.request("GET", "{url}/").status == 200
+"""
+
+
+def test_new_episodes_replayed_requests_are_not_throttled(pytester, server):
+    url, hit_list = server
+    pytester.makepyfile(test_replayed=REPLAYED_TEST_MODULE.format(url=url))
+    pytester.runpytest_subprocess("--record=all", "--record-retries=1").assert_outcomes(
+        passed=1
+    )
+    hit_count = len(hit_list)
+
+    # A token per second : the 4 requests would take 3 seconds if throttled
+    start = time.monotonic()
+    pytester.runpytest_subprocess(
+        "--record=all", "--record-new-episodes", "--record-rate-limit=*=1/1"
+    ).assert_outcomes(passed=1)
+
+    assert time.monotonic() - start < 3
+    assert len(hit_list) == hit_count